@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.agents.schema import (
+    AgentDecision,
+    ExecutionPlan,
+    ExecutionRow,
+    MarketRegime,
+    PositionTarget,
+    ResearchNote,
+    TickerSnapshot,
+)
+
+# Columnar (NumPy-backed) counterparts of the per-ticker pydantic schema. The agent
+# stage builds and passes these around; pydantic models are only materialized by
+# `to_model()` when JSON is written, so large universes don't pay per-row validation.
+
+
+def _index(tickers: np.ndarray) -> dict[str, int]:
+    return {t: i for i, t in enumerate(tickers.tolist())}
+
+
+@dataclass(frozen=True)
+class ResearchFrame:
+    as_of: str
+    tickers: np.ndarray  # object (str)
+    ret_20d: np.ndarray  # float64
+    vol_20d_ann: np.ndarray  # float64
+    trend: np.ndarray  # object: up|down|flat
+    regime_label: str
+    regime_confidence: float
+    regime_evidence: list[str]
+    summary: str
+    _pos: dict[str, int] = field(init=False, repr=False, compare=False)
+    # Optional LLM commentary (`agents.llm`); None in the deterministic mode
+    llm_model: str | None = None
+    llm_summary: str | None = None
+    llm_notes: np.ndarray | None = None  # object (str|None), aligned with `tickers`
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_pos", _index(self.tickers))
+
+    def lookup(self, tickers) -> np.ndarray:
+        """Row positions of `tickers` (-1 where a ticker is not in the note)."""
+        return np.array([self._pos.get(str(t), -1) for t in tickers], dtype=np.int64)
+
+    def vol_for(self, tickers) -> np.ndarray:
+        """20D annualized vol aligned to `tickers` (NaN where missing)."""
+        pos = self.lookup(tickers)
+        out = np.full(len(pos), np.nan)
+        out[pos >= 0] = self.vol_20d_ann[pos[pos >= 0]]
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {"ret_20d": self.ret_20d, "vol_20d_ann": self.vol_20d_ann, "trend": self.trend},
+            index=pd.Index(self.tickers, name="ticker"),
+        )
+
+    def to_model(self) -> ResearchNote:
+        return ResearchNote(
+            as_of=self.as_of,
+            regime=MarketRegime(
+                label=self.regime_label,
+                confidence=self.regime_confidence,
+                evidence=list(self.regime_evidence),
+            ),
+            universe=[
+                TickerSnapshot(ticker=t, ret_20d=r, vol_20d_ann=v, trend=tr, llm_note=n)
+                for t, r, v, tr, n in zip(
+                    self.tickers.tolist(),
+                    self.ret_20d.tolist(),
+                    self.vol_20d_ann.tolist(),
+                    self.trend.tolist(),
+                    self.llm_notes.tolist() if self.llm_notes is not None else [None] * len(self.tickers),
+                )
+            ],
+            summary=self.summary,
+            llm_model=self.llm_model,
+            llm_summary=self.llm_summary,
+        )
+
+
+@dataclass(frozen=True)
+class DecisionFrame:
+    as_of: str
+    tickers: np.ndarray  # object (str)
+    weight: np.ndarray  # float64
+    reason: np.ndarray  # object (str)
+    risk_notes: list[str]
+    constraints: dict[str, float]
+
+    def proposed(self) -> pd.Series:
+        return pd.Series(self.weight, index=self.tickers, dtype=float)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"ticker": self.tickers, "proposed": self.weight, "reason": self.reason})
+
+    def to_model(self) -> AgentDecision:
+        return AgentDecision(
+            as_of=self.as_of,
+            proposed_positions=[
+                PositionTarget(ticker=t, weight=w, reason=r)
+                for t, w, r in zip(self.tickers.tolist(), self.weight.tolist(), self.reason.tolist())
+            ],
+            risk_notes=list(self.risk_notes),
+            constraints=dict(self.constraints),
+        )
+
+
+@dataclass(frozen=True)
+class ExecutionFrame:
+    as_of: str
+    scale: float
+    gate_reason: str
+    tickers: np.ndarray  # object (str)
+    proposed_weight: np.ndarray  # float64
+    executed_weight: np.ndarray  # float64
+    status: np.ndarray  # object: accepted|rejected
+    row_reason: np.ndarray  # object (str): day-level reason + per-ticker gate notes
+    cash_weight: float
+    gross_exposure: float
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "ticker": self.tickers,
+                "proposed": self.proposed_weight,
+                "executed": self.executed_weight,
+                "status": self.status,
+                "gate_reason": self.row_reason,
+            }
+        )
+
+    def to_model(self) -> ExecutionPlan:
+        return ExecutionPlan(
+            as_of=self.as_of,
+            scale=self.scale,
+            gate_reason=self.gate_reason,
+            rows=[
+                ExecutionRow(
+                    ticker=t,
+                    proposed_weight=p,
+                    executed_weight=e,
+                    status=s,
+                    gate_reason=g,
+                )
+                for t, p, e, s, g in zip(
+                    self.tickers.tolist(),
+                    self.proposed_weight.tolist(),
+                    self.executed_weight.tolist(),
+                    self.status.tolist(),
+                    self.row_reason.tolist(),
+                )
+            ],
+            cash_weight=self.cash_weight,
+            gross_exposure=self.gross_exposure,
+        )
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import urllib.request
+import warnings
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+
+from tradeagentlab.agents.frames import ResearchFrame
+
+try:  # optional `llm` extra
+    from openai import AsyncOpenAI
+except ImportError:  # pragma: no cover - exercised when the extra isn't installed
+    AsyncOpenAI = None
+
+# Bump when the prompts change so cached answers for the old wording are not reused.
+PROMPT_VERSION = "research-v1"
+
+SYSTEM_PROMPT = (
+    "You are an equity research assistant. Use only the data provided. "
+    "Answer with a single JSON object and nothing else."
+)
+MARKET_PROMPT = (
+    "Write a 2-3 sentence market summary for the regime diagnostics below. "
+    'Reply as {"summary": "..."}.'
+)
+TICKER_PROMPT = (
+    "For each ticker below write one short sentence on its 20-day return, volatility and "
+    'trend. Reply as {"notes": {"<ticker>": "..."}} covering every ticker.'
+)
+
+
+@dataclass
+class LLMConfig:
+    enabled: bool = False
+    model: str = "gpt-4o-mini"
+    base_url: str | None = None  # OpenAI-compatible endpoint (e.g. the local stub)
+    api_key_env: str = "OPENAI_API_KEY"
+    batch_size: int = 25  # tickers per prompt (1 = one prompt per ticker)
+    max_concurrency: int = 4
+    timeout_s: float = 10.0  # per request; on timeout/error the deterministic note stands
+    temperature: float = 0.0
+    max_tokens: int = 800
+    cache_dir: str | None = ".cache/llm"  # null disables the response cache
+
+
+def _sha(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class ResponseCache:
+    """Persistent JSON cache keyed by sha256(model, prompt hash, data-snapshot hash)."""
+
+    def __init__(self, root: Path | None) -> None:
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, prompt: str, snapshot: dict) -> str:
+        return _sha([PROMPT_VERSION, model, _sha(prompt), _sha(snapshot)])
+
+    def _path(self, key: str) -> Path:
+        assert self.root is not None
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        if self.root is not None and (p := self._path(key)).exists():
+            self.hits += 1
+            return json.loads(p.read_text())
+        self.misses += 1
+        return None
+
+    def put(self, key: str, value: dict) -> None:
+        if self.root is None:
+            return
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f".{p.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(value))
+        os.replace(tmp, p)
+
+
+def _post_chat(url: str, body: dict, api_key: str, timeout: float) -> str:
+    """Plain-HTTP chat completion for OpenAI-compatible endpoints (no `openai` package)."""
+    req = urllib.request.Request(
+        url.rstrip("/") + "/chat/completions",
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"},
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())["choices"][0]["message"]["content"]
+
+
+class ChatClient:
+    """Async chat completions with bounded concurrency and a hard per-request timeout.
+
+    Uses `openai.AsyncOpenAI` when the `llm` extra is installed; otherwise (or for a
+    `base_url` without it) a stdlib HTTP call run in a worker thread.
+    """
+
+    def __init__(self, cfg: LLMConfig) -> None:
+        self.cfg = cfg
+        self.api_key = os.environ.get(cfg.api_key_env) or "not-needed"
+        self._client = (
+            AsyncOpenAI(api_key=self.api_key, base_url=cfg.base_url, max_retries=0, timeout=cfg.timeout_s)
+            if AsyncOpenAI is not None
+            else None
+        )
+        self._sem: asyncio.Semaphore | None = None
+
+    async def _complete(self, prompt: str) -> str:
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
+        if self._client is not None:
+            resp = await self._client.chat.completions.create(
+                model=self.cfg.model,
+                messages=messages,
+                temperature=self.cfg.temperature,
+                max_tokens=self.cfg.max_tokens,
+                response_format={"type": "json_object"},
+            )
+            return resp.choices[0].message.content or ""
+        body = {
+            "model": self.cfg.model,
+            "messages": messages,
+            "temperature": self.cfg.temperature,
+            "max_tokens": self.cfg.max_tokens,
+        }
+        url = self.cfg.base_url or "https://api.openai.com/v1"
+        return await asyncio.to_thread(_post_chat, url, body, self.api_key, self.cfg.timeout_s)
+
+    async def ask(self, prompt: str) -> dict | None:
+        """JSON answer to `prompt`, or None on timeout / transport / parse errors."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(max(1, self.cfg.max_concurrency))
+        async with self._sem:
+            try:
+                text = await asyncio.wait_for(self._complete(prompt), timeout=self.cfg.timeout_s)
+                out = json.loads(text)
+            except Exception:  # noqa: BLE001 - any failure falls back to the deterministic note
+                return None
+        return out if isinstance(out, dict) else None
+
+
+def _snapshots(note: ResearchFrame, batch_size: int) -> list[dict]:
+    """Market snapshot followed by per-chunk ticker snapshots (values rounded for stable hashing)."""
+    market = {
+        "as_of": note.as_of,
+        "regime": note.regime_label,
+        "confidence": round(note.regime_confidence, 4),
+        "evidence": list(note.regime_evidence),
+    }
+    rows = [
+        {"ticker": t, "ret_20d": round(r, 6), "vol_20d_ann": round(v, 6), "trend": tr}
+        for t, r, v, tr in zip(
+            note.tickers.tolist(), note.ret_20d.tolist(), note.vol_20d_ann.tolist(), note.trend.tolist()
+        )
+    ]
+    n = max(1, batch_size)
+    return [market] + [{"as_of": note.as_of, "tickers": rows[i : i + n]} for i in range(0, len(rows), n)]
+
+
+def _prompt(template: str, snapshot: dict) -> str:
+    return f"{template}\nDATA:\n{json.dumps(snapshot, sort_keys=True)}"
+
+
+async def _gather(client: ChatClient, cache: ResponseCache, jobs: list[tuple[str, str, dict]]) -> list:
+    async def one(template: str, snapshot: dict) -> dict | None:
+        key = cache.key(client.cfg.model, template, snapshot)
+        if (hit := cache.get(key)) is not None:
+            return hit
+        out = await client.ask(_prompt(template, snapshot))
+        if out is not None:
+            cache.put(key, out)
+        return out
+
+    return await asyncio.gather(*(one(t, s) for _, t, s in jobs))
+
+
+def _run(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside an event loop (e.g. a notebook): run on a private loop in a thread
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+def enrich_research_note(note: ResearchFrame, cfg: LLMConfig) -> ResearchFrame:
+    """Add LLM commentary to a deterministic research note.
+
+    One market prompt plus one prompt per `batch_size` tickers are sent concurrently (at
+    most `max_concurrency` in flight). Answers are cached on disk by prompt + snapshot
+    hash, so replays and re-runs of the same bar never call the endpoint twice. Requests
+    that time out or fail leave the deterministic fields as they are; the note is
+    returned unchanged if nothing came back.
+    """
+    if not cfg.enabled:
+        return note
+    snaps = _snapshots(note, cfg.batch_size)
+    jobs = [("market", MARKET_PROMPT, snaps[0])] + [("tickers", TICKER_PROMPT, s) for s in snaps[1:]]
+    cache = ResponseCache(Path(cfg.cache_dir) if cfg.cache_dir else None)
+    answers = _run(_gather(ChatClient(cfg), cache, jobs))
+
+    summary = answers[0].get("summary") if answers[0] else None
+    notes: dict[str, str] = {}
+    for a in answers[1:]:
+        if a and isinstance(a.get("notes"), dict):
+            notes.update({str(k): str(v) for k, v in a["notes"].items()})
+    if summary is None and not notes:
+        warnings.warn("LLM research unavailable; using the deterministic note", stacklevel=2)
+        return note
+    return replace(
+        note,
+        llm_model=cfg.model,
+        llm_summary=str(summary) if summary is not None else None,
+        llm_notes=np.array([notes.get(t) for t in note.tickers.tolist()], dtype=object),
+    )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Minimal OpenAI-compatible chat endpoint for tests and offline demos:
+#   POST /v1/chat/completions → deterministic JSON built from the prompt's DATA block.
+# Answers never depend on anything but the request, so cached and live runs agree.
+
+
+def _answer(prompt: str) -> dict:
+    data = json.loads(prompt.split("DATA:\n", 1)[1]) if "DATA:\n" in prompt else {}
+    if "tickers" in data:
+        return {
+            "notes": {
+                r["ticker"]: (
+                    f"{r['ticker']} is trending {r['trend']} "
+                    f"({r['ret_20d']:.2%} over 20D, vol {r['vol_20d_ann']:.2%})."
+                )
+                for r in data["tickers"]
+            }
+        }
+    return {"summary": f"Stub view as of {data.get('as_of', '?')}: regime {data.get('regime', 'unknown')}."}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay_s = 0.0  # per-request latency, to exercise client timeouts
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        self.server.requests += 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        prompt = next((m["content"] for m in reversed(body["messages"]) if m["role"] == "user"), "")
+        payload = {
+            "id": f"stub-{self.server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": json.dumps(_answer(prompt))},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+        out = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, delay_s: float = 0.0) -> ThreadingHTTPServer:
+    """Serve the stub in a daemon thread; `base_url` is `http://host:port/v1`.
+
+    `server.requests` counts completions served; call `server.shutdown()` when done.
+    """
+    handler = type("Handler", (StubHandler,), {"delay_s": delay_s})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local OpenAI-compatible stub for LLM research mode")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    args = ap.parse_args()
+    server = start_stub_server(args.host, args.port, args.delay)
+    print(f"LLM stub listening on http://{args.host}:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,126 @@
 from __future__ import annotations
 
-import json
+import os
 from pathlib import Path
 
 import pandas as pd
 
+from tradeagentlab.agents.llm import LLMConfig, enrich_research_note
 from tradeagentlab.agents.research import build_research_note
 from tradeagentlab.agents.risk_gate import build_execution_plan
 from tradeagentlab.agents.signal import propose_positions_from_momentum
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.features.shards import ComputeConfig
 
 
-def run_agent_decision(
+def _write_atomic(path: Path, text: str) -> None:
+    """Write via a temp file + rename so concurrent readers never see a partial file."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def build_agent_decision(
     prices: pd.DataFrame,
     proposed_weights: pd.DataFrame,
     risk_audit: pd.DataFrame | None,
-    out_dir: Path,
-    name: str,
     max_ticker_vol_ann: float = 0.35,
     vol_cap_mode: str = "scale",
+    freq: BarFrequency = DAILY,
+    llm: LLMConfig | None = None,
+    group_factor: pd.DataFrame | None = None,
+    compute: ComputeConfig | None = None,
 ) -> dict:
-    """Generate a research note + structured decision + risk-gated execution plan and save artifacts."""
-    out_dir.mkdir(parents=True, exist_ok=True)
-    agent_dir = out_dir / "agent"
-    agent_dir.mkdir(parents=True, exist_ok=True)
+    """Research note + structured decision + risk-gated execution plan (no file IO).
 
+    Values are columnar frames (`agents.frames`); pydantic models are only built when
+    `write_agent_artifacts` serializes them. With `llm.enabled` the research note also
+    carries LLM commentary; the decision itself stays deterministic.
+    """
     as_of = prices.index.max()
-    research = build_research_note(prices, as_of=as_of)
+    research = build_research_note(prices, as_of=as_of, freq=freq, compute=compute)
+    if llm is not None and llm.enabled:
+        research = enrich_research_note(research, llm)
     decision = propose_positions_from_momentum(research, proposed_weights.loc[as_of])
 
     # Build a risk-gated execution plan using the risk overlay scale
-    proposed = pd.Series({p.ticker: p.weight for p in decision.proposed_positions})
     execution = build_execution_plan(
         as_of=decision.as_of,
-        proposed=proposed,
+        proposed=decision.proposed(),
         risk_audit=risk_audit,
         research=research,
         max_ticker_vol_ann=max_ticker_vol_ann,
         vol_cap_mode=vol_cap_mode,
+        group_factor=group_factor.loc[as_of] if group_factor is not None else None,
     )
 
-    research_path = agent_dir / f"{name}_research.json"
-    decision_path = agent_dir / f"{name}_decision.json"
-    exec_path = agent_dir / f"{name}_execution.json"
-
-    research_path.write_text(research.model_dump_json(indent=2))
-    decision_path.write_text(decision.model_dump_json(indent=2))
-    exec_path.write_text(execution.model_dump_json(indent=2))
-
-    # also keep pointers
-    (agent_dir / "latest_research.json").write_text(research.model_dump_json(indent=2))
-    (agent_dir / "latest_decision.json").write_text(decision.model_dump_json(indent=2))
-    (agent_dir / "latest_execution.json").write_text(execution.model_dump_json(indent=2))
-
-    return {
-        "research": research,
-        "decision": decision,
-        "execution": execution,
-        "paths": {
-            "research": str(research_path),
-            "decision": str(decision_path),
-            "execution": str(exec_path),
-        },
+    return {"research": research, "decision": decision, "execution": execution}
+
+
+def write_agent_artifacts(
+    agent_out: dict,
+    out_dir: Path,
+    name: str,
+    write_latest: bool = True,
+) -> dict:
+    """Save research/decision/execution JSON (and the stress table, if any) under
+    `out_dir/agent` and return their paths."""
+    agent_dir = out_dir / "agent"
+    agent_dir.mkdir(parents=True, exist_ok=True)
+
+    docs = {
+        kind: agent_out[kind].to_model().model_dump_json(indent=2, exclude_none=True)
+        for kind in ("research", "decision", "execution")
     }
+
+    paths: dict[str, str] = {}
+    for kind, text in docs.items():
+        path = agent_dir / f"{name}_{kind}.json"
+        _write_atomic(path, text)
+        paths[kind] = str(path)
+        if write_latest:
+            # also keep pointers
+            _write_atomic(agent_dir / f"latest_{kind}.json", text)
+
+    stress = agent_out.get("stress")
+    if stress is not None:
+        text = stress.to_csv()
+        path = agent_dir / f"{name}_stress.csv"
+        _write_atomic(path, text)
+        paths["stress"] = str(path)
+        if write_latest:
+            _write_atomic(agent_dir / "latest_stress.csv", text)
+
+    return paths
+
+
+def run_agent_decision(
+    prices: pd.DataFrame,
+    proposed_weights: pd.DataFrame,
+    risk_audit: pd.DataFrame | None,
+    out_dir: Path,
+    name: str,
+    max_ticker_vol_ann: float = 0.35,
+    vol_cap_mode: str = "scale",
+    write_latest: bool = True,
+    freq: BarFrequency = DAILY,
+    llm: LLMConfig | None = None,
+    group_factor: pd.DataFrame | None = None,
+    compute: ComputeConfig | None = None,
+) -> dict:
+    """Generate a research note + structured decision + risk-gated execution plan and save artifacts."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    agent_out = build_agent_decision(
+        prices=prices,
+        proposed_weights=proposed_weights,
+        risk_audit=risk_audit,
+        max_ticker_vol_ann=max_ticker_vol_ann,
+        vol_cap_mode=vol_cap_mode,
+        freq=freq,
+        llm=llm,
+        group_factor=group_factor,
+        compute=compute,
+    )
+    agent_out["paths"] = write_agent_artifacts(agent_out, out_dir, name, write_latest=write_latest)
+    return agent_out
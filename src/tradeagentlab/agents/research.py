@@ -3,64 +3,95 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
-from tradeagentlab.agents.schema import MarketRegime, ResearchNote, TickerSnapshot
+from tradeagentlab.agents.frames import ResearchFrame
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.features.shards import (
+    ComputeConfig,
+    map_shards,
+    merge_moments,
+    returns_kernel,
+    ticker_stats_kernel,
+)
 
 
-def _trend_from_ret(ret: float, eps: float = 0.01) -> str:
-    if ret > eps:
-        return "up"
-    if ret < -eps:
-        return "down"
-    return "flat"
+def _trend_from_ret(ret: np.ndarray, eps: float = 0.01) -> np.ndarray:
+    return np.where(ret > eps, "up", np.where(ret < -eps, "down", "flat")).astype(object)
 
 
-def build_research_note(prices: pd.DataFrame, as_of: pd.Timestamp | None = None) -> ResearchNote:
+def build_research_note(
+    prices: pd.DataFrame,
+    as_of: pd.Timestamp | None = None,
+    freq: BarFrequency = DAILY,
+    compute: ComputeConfig | None = None,
+) -> ResearchFrame:
     """Deterministic research summary (no LLM required).
 
     Uses only price/vol/trend diagnostics; good enough for an auditable agent demo.
+    "20D" stats span 20 trading days of bars at `freq`. Returned columnar; call
+    `.to_model()` for the `ResearchNote` JSON schema. With `compute.shards > 1` the
+    per-ticker stats run on column shards; only the complete-row mask and the
+    universe mean/dispersion are merged.
     """
     if as_of is None:
         as_of = prices.index.max()
 
     px = prices.loc[:as_of].copy()
-    rets = px.pct_change().dropna()
+    n20 = freq.bars(20)
+    tickers = np.array([str(t) for t in px.columns], dtype=object)
 
-    snap: list[TickerSnapshot] = []
-    for t in px.columns:
-        r20 = float(px[t].pct_change(20).iloc[-1])
-        v20 = float(rets[t].rolling(20).std(ddof=0).iloc[-1] * np.sqrt(252))
-        snap.append(
-            TickerSnapshot(
-                ticker=t,
-                ret_20d=r20,
-                vol_20d_ann=v20,
-                trend=_trend_from_ret(r20),
-            )
+    if compute is not None and compute.sharded and len(tickers):
+        arr = px.to_numpy(dtype=float)
+        rets_shape = (max(0, len(arr) - 1), arr.shape[1])
+        out, parts = map_shards(returns_kernel, {"prices": arr}, {"rets": (rets_shape, float)}, compute)
+        # Rows with a NaN anywhere in the universe are dropped, as `dropna()` does unsharded
+        rows = np.flatnonzero(~np.any(parts, axis=0)) if parts else np.arange(0)
+        n = len(tickers)
+        out, parts = map_shards(
+            ticker_stats_kernel,
+            {"prices": arr, "rets": out["rets"]},
+            {"ret_n": ((n,), float), "vol_n": ((n,), float)},
+            compute,
+            rows=rows,
+            n=n20,
+            ann=freq.ann_factor,
         )
+        ret_20d, vol_20d = out["ret_n"], out["vol_n"]
+        mean_r, disp = merge_moments(parts)
+    else:
+        rets = px.pct_change().dropna()
+        ret_20d = px.pct_change(n20).iloc[-1].to_numpy(dtype=float)
+        vol_20d = rets.rolling(n20).std(ddof=0).iloc[-1].to_numpy(dtype=float) * freq.ann_factor
+        mean_r = float(np.mean(ret_20d)) if len(tickers) else 0.0
+        disp = float(np.std(ret_20d)) if len(tickers) else 0.0
+    trend = _trend_from_ret(ret_20d)
 
     # crude regime heuristic using SPY and dispersion
-    spy = next((s for s in snap if s.ticker == "SPY"), None)
-    mean_r = float(np.mean([s.ret_20d for s in snap])) if snap else 0.0
-    disp = float(np.std([s.ret_20d for s in snap])) if snap else 0.0
+    spy_pos = next((i for i, t in enumerate(tickers) if t == "SPY"), None)
+    spy_ret = float(ret_20d[spy_pos]) if spy_pos is not None else None
 
     evidence: list[str] = []
-    if spy is not None:
-        evidence.append(f"SPY 20D return: {spy.ret_20d:.2%}, vol20D: {spy.vol_20d_ann:.2%}")
+    if spy_ret is not None:
+        evidence.append(f"SPY 20D return: {spy_ret:.2%}, vol20D: {float(vol_20d[spy_pos]):.2%}")
     evidence.append(f"Universe mean 20D return: {mean_r:.2%}, dispersion: {disp:.2%}")
 
-    if spy is not None and spy.ret_20d > 0 and mean_r > 0:
-        regime = MarketRegime(label="risk-on", confidence=0.65, evidence=evidence)
+    if spy_ret is not None and spy_ret > 0 and mean_r > 0:
+        label, conf = "risk-on", 0.65
         summary = "Broad 20D momentum is positive; regime leaning risk-on."
-    elif spy is not None and spy.ret_20d < 0 and mean_r < 0:
-        regime = MarketRegime(label="risk-off", confidence=0.65, evidence=evidence)
+    elif spy_ret is not None and spy_ret < 0 and mean_r < 0:
+        label, conf = "risk-off", 0.65
         summary = "Broad 20D momentum is negative; regime leaning risk-off."
     else:
-        regime = MarketRegime(label="mixed", confidence=0.55, evidence=evidence)
+        label, conf = "mixed", 0.55
         summary = "Mixed 20D momentum; regime uncertain/mixed."
 
-    return ResearchNote(
-        as_of=str(as_of.date()),
-        regime=regime,
-        universe=snap,
+    return ResearchFrame(
+        as_of=str(as_of.date()) if freq.is_daily else as_of.isoformat(),
+        tickers=tickers,
+        ret_20d=ret_20d,
+        vol_20d_ann=vol_20d,
+        trend=trend,
+        regime_label=label,
+        regime_confidence=conf,
+        regime_evidence=evidence,
         summary=summary,
     )
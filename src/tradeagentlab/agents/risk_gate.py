@@ -1,30 +1,34 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
-from tradeagentlab.agents.schema import ExecutionPlan, ExecutionRow, ResearchNote
+from tradeagentlab.agents.frames import ExecutionFrame, ResearchFrame
 
 
 def build_execution_plan(
     as_of: str,
     proposed: pd.Series,
     risk_audit: pd.DataFrame,
-    research: ResearchNote | None = None,
+    research: ResearchFrame | None = None,
     max_ticker_vol_ann: float = 0.35,
     vol_cap_mode: str = "scale",  # scale|reject
-) -> ExecutionPlan:
+    group_factor: pd.Series | None = None,
+) -> ExecutionFrame:
     """Apply risk gates to proposed weights.
 
     Gates:
     1) Day-level overlay via `risk_audit.scale` (vol targeting / kill switch)
     2) Per-ticker volatility cap using ResearchNote 20D vol (optional)
+    3) Group caps via `group_factor` (the risk engine's per-ticker multiplier, optional)
 
     - If scale==0 => all executed weights are 0
     - If ticker vol > cap:
         - mode=reject => executed=0
         - mode=scale  => executed *= cap/vol
 
-    Returns an auditable execution plan (rows per ticker).
+    Returns an auditable execution plan (one column entry per ticker; `.to_model()` gives
+    the `ExecutionPlan` JSON schema).
     """
     if risk_audit is None or len(risk_audit) == 0:
         scale = 1.0
@@ -34,49 +38,45 @@ def build_execution_plan(
         scale = float(row.get("scale", 1.0))
         reason = str(row.get("reason", ""))
 
-    rows: list[ExecutionRow] = []
-    for ticker, w in proposed.items():
-        w = float(w)
+    tickers = np.array([str(t) for t in proposed.index], dtype=object)
+    w = proposed.to_numpy(dtype=float)
 
-        # Per-ticker volatility cap
-        vol = None
-        if research is not None:
-            snap = next((s for s in research.universe if s.ticker == str(ticker)), None)
-            if snap is not None:
-                vol = float(snap.vol_20d_ann)
-
-        per_ticker_factor = 1.0
-        per_ticker_note = ""
-        if vol is not None and vol > max_ticker_vol_ann:
-            if vol_cap_mode == "reject":
-                per_ticker_factor = 0.0
-                per_ticker_note = f" | VOL_CAP_REJECT: vol20D={vol:.2%} > {max_ticker_vol_ann:.2%}"
-            else:
-                per_ticker_factor = max_ticker_vol_ann / vol
-                per_ticker_note = (
-                    f" | VOL_CAP_SCALE: vol20D={vol:.2%} > {max_ticker_vol_ann:.2%} → factor={per_ticker_factor:.2f}"
-                )
-
-        exec_w = w * scale * per_ticker_factor
-        status = "accepted" if exec_w > 0 else "rejected"
-        rows.append(
-            ExecutionRow(
-                ticker=str(ticker),
-                proposed_weight=w,
-                executed_weight=float(exec_w),
-                status=status,
-                gate_reason=reason + per_ticker_note,
+    # Per-ticker volatility cap (NaN vol = not in the research note → no cap)
+    vol = research.vol_for(tickers) if research is not None else np.full(len(w), np.nan)
+    capped = vol > max_ticker_vol_ann
+    factor = np.ones(len(w))
+    notes = np.full(len(w), "", dtype=object)
+    if vol_cap_mode == "reject":
+        factor[capped] = 0.0
+        for i in np.flatnonzero(capped):
+            notes[i] = f" | VOL_CAP_REJECT: vol20D={vol[i]:.2%} > {max_ticker_vol_ann:.2%}"
+    else:
+        factor[capped] = max_ticker_vol_ann / vol[capped]
+        for i in np.flatnonzero(capped):
+            notes[i] = (
+                f" | VOL_CAP_SCALE: vol20D={vol[i]:.2%} > {max_ticker_vol_ann:.2%} → factor={factor[i]:.2f}"
             )
-        )
 
-    gross_exposure = float(sum(r.executed_weight for r in rows))
+    if group_factor is not None:
+        gf = group_factor.reindex(proposed.index).fillna(1.0).to_numpy(dtype=float)
+        for i in np.flatnonzero(gf < 1.0):
+            notes[i] += f" | GROUP_CAP: factor={gf[i]:.2f}"
+        factor = factor * gf
+
+    exec_w = w * scale * factor
+    # Python-float sum (left to right) keeps the JSON identical to the row-wise version
+    gross_exposure = float(sum(exec_w.tolist()))
     cash_weight = float(max(0.0, 1.0 - gross_exposure))
 
-    return ExecutionPlan(
+    return ExecutionFrame(
         as_of=as_of,
         scale=scale,
         gate_reason=reason,
-        rows=rows,
+        tickers=tickers,
+        proposed_weight=w,
+        executed_weight=exec_w,
+        status=np.where(exec_w > 0, "accepted", "rejected").astype(object),
+        row_reason=reason + notes,
         cash_weight=cash_weight,
         gross_exposure=gross_exposure,
     )
@@ -16,6 +16,7 @@ class TickerSnapshot(BaseModel):
     ret_20d: float
     vol_20d_ann: float
     trend: Literal["up", "down", "flat"]
+    llm_note: str | None = None  # LLM research mode only
 
 
 class ResearchNote(BaseModel):
@@ -23,6 +24,9 @@ class ResearchNote(BaseModel):
     regime: MarketRegime
     universe: list[TickerSnapshot]
     summary: str
+    # LLM research mode only (dumped with exclude_none, so deterministic notes are unchanged)
+    llm_model: str | None = None
+    llm_summary: str | None = None
 
 
 class PositionTarget(BaseModel):
@@ -1,38 +1,44 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
-from tradeagentlab.agents.schema import AgentDecision, PositionTarget, ResearchNote
+from tradeagentlab.agents.frames import DecisionFrame, ResearchFrame
 
 
 def propose_positions_from_momentum(
-    research: ResearchNote,
+    research: ResearchFrame,
     weights_today: pd.Series,
     max_positions: int = 10,
-) -> AgentDecision:
+) -> DecisionFrame:
     """Turn the current strategy weights into an auditable 'agent decision'.
 
     This is intentionally deterministic: the goal is to demonstrate *structure + auditability*.
     """
     w = weights_today[weights_today > 0].sort_values(ascending=False).head(max_positions)
+    tickers = np.array([str(t) for t in w.index], dtype=object)
 
-    positions: list[PositionTarget] = []
-    for ticker, weight in w.items():
-        snap = next((s for s in research.universe if s.ticker == ticker), None)
-        if snap is None:
-            reason = "Selected by momentum baseline."
+    pos = research.lookup(tickers)
+    reason = np.empty(len(tickers), dtype=object)
+    for i, j in enumerate(pos.tolist()):
+        if j < 0:
+            reason[i] = "Selected by momentum baseline."
         else:
-            reason = f"20D ret={snap.ret_20d:.2%}, trend={snap.trend}, vol20D={snap.vol_20d_ann:.2%}."
-        positions.append(PositionTarget(ticker=ticker, weight=float(weight), reason=reason))
+            reason[i] = (
+                f"20D ret={research.ret_20d[j]:.2%}, trend={research.trend[j]}, "
+                f"vol20D={research.vol_20d_ann[j]:.2%}."
+            )
 
     risk_notes = [
-        f"Regime: {research.regime.label} (conf={research.regime.confidence:.2f})",
+        f"Regime: {research.regime_label} (conf={research.regime_confidence:.2f})",
         "Final execution must pass hard risk gates (vol targeting, drawdown kill switch, position limits).",
     ]
 
-    return AgentDecision(
+    return DecisionFrame(
         as_of=research.as_of,
-        proposed_positions=positions,
+        tickers=tickers,
+        weight=w.to_numpy(dtype=float),
+        reason=reason,
         risk_notes=risk_notes,
         constraints={"max_positions": float(max_positions)},
     )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+ACCOUNTING_MODES = ("weights", "ledger")
+
+
+def run_ledger(
+    weights: pd.DataFrame,
+    prices: pd.DataFrame,
+    initial_cash: float,
+    transaction_cost_bps: float = 0.0,
+    lot_size: float = 1.0,
+    trade_mask: pd.DataFrame | None = None,
+) -> dict:
+    """Execute target weights as whole-lot share orders against a cash ledger.
+
+    At each close the pre-trade NAV (cash + held shares at the close) sizes the target
+    `trunc(w · NAV / (price · lot)) · lot` shares; the difference to the held shares is
+    filled at the close and charged `transaction_cost_bps` on its notional. Names without
+    a price yet keep their holding. Weights are interpreted like the weight-based path:
+    set at close t, held over t+1. With a boolean `trade_mask` (date × ticker, e.g. from
+    a rebalance policy) only the masked names are re-sized; the rest keep their shares.
+
+    Only the NAV recursion is sequential (one dot product per bar); fills, cash,
+    turnover, costs and realized weights are then computed on the whole date × ticker
+    panel at once.
+
+    Returns a dict with `shares`, `fills`, `cash`, `equity`, `portfolio_returns`,
+    `weights` (realized, post-trade), `turnover` and `cost` (both as a fraction of the
+    pre-trade NAV, in the same units as the weight-based audit) and `cost_cash`.
+    """
+    if lot_size <= 0:
+        raise ValueError("lot_size must be positive")
+    cols = weights.columns
+    px = prices.reindex(index=weights.index, columns=cols).ffill().to_numpy(dtype=float)
+    tradable = np.isfinite(px) & (px > 0)
+    pxz = np.where(tradable, px, 0.0)
+    lot_value = np.where(tradable, px * lot_size, np.inf)
+    w = weights.fillna(0.0).to_numpy(dtype=float)
+    if trade_mask is not None:
+        trade = trade_mask.reindex(index=weights.index, columns=cols, fill_value=False)
+        tradable = tradable & trade.to_numpy(dtype=bool)
+    rate = transaction_cost_bps / 1e4
+
+    T, N = w.shape
+    shares = np.zeros((T, N))
+    held = np.zeros(N)
+    cash = float(initial_cash)
+    for t in range(T):
+        nav = cash + held @ pxz[t]
+        target = np.where(tradable[t], np.trunc(w[t] * nav / lot_value[t]) * lot_size, held)
+        fill_value = (target - held) * pxz[t]
+        cash -= fill_value.sum() + np.abs(fill_value).sum() * rate
+        held = target
+        shares[t] = held
+
+    # Panel accounting from the share path
+    fills = np.diff(shares, axis=0, prepend=0.0)
+    fill_value = fills * pxz
+    traded = np.abs(fill_value).sum(axis=1)
+    cost_cash = traded * rate
+    cash_path = initial_cash - np.cumsum(fill_value.sum(axis=1) + cost_cash)
+    value = shares * pxz
+    equity = cash_path + value.sum(axis=1)
+    prev_shares = np.vstack([np.zeros((1, N)), shares[:-1]])
+    prev_cash = np.concatenate([[initial_cash], cash_path[:-1]])
+    nav_pre = prev_cash + (prev_shares * pxz).sum(axis=1)
+    prev_equity = np.concatenate([[initial_cash], equity[:-1]])
+
+    idx = weights.index
+    with np.errstate(divide="ignore", invalid="ignore"):
+        port_ret = np.where(prev_equity > 0, equity / prev_equity - 1.0, 0.0)
+        turnover = np.where(nav_pre > 0, traded / nav_pre, 0.0)
+        realized = np.where(equity[:, None] > 0, value / equity[:, None], 0.0)
+    return {
+        "shares": pd.DataFrame(shares, index=idx, columns=cols),
+        "fills": pd.DataFrame(fills, index=idx, columns=cols),
+        "cash": pd.Series(cash_path, index=idx, name="cash"),
+        "equity": pd.Series(equity, index=idx, name="equity"),
+        "portfolio_returns": pd.Series(port_ret, index=idx, name="portfolio_return"),
+        "weights": pd.DataFrame(realized, index=idx, columns=cols),
+        "turnover": pd.Series(turnover, index=idx, name="turnover"),
+        "cost": pd.Series(turnover * rate, index=idx, name="cost"),
+        "cost_cash": pd.Series(cost_cash, index=idx, name="cost_cash"),
+    }
+
+
+def ledger_summary(ledger: dict) -> dict:
+    """Headline ledger numbers for reports."""
+    fills = ledger["fills"]
+    return {
+        "final_equity": float(ledger["equity"].iloc[-1]),
+        "final_cash": float(ledger["cash"].iloc[-1]),
+        "min_cash": float(ledger["cash"].min()),
+        "fills": int((fills != 0).to_numpy().sum()),
+        "fill_days": int((fills != 0).any(axis=1).sum()),
+        "total_cost": float(ledger["cost_cash"].sum()),
+        "positions": int((ledger["shares"].iloc[-1] != 0).sum()),
+    }
@@ -1,16 +1,38 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
 import pandas as pd
 import yaml
 
+from tradeagentlab.agents.llm import LLMConfig
+from tradeagentlab.agents.orchestrator import run_agent_decision
+from tradeagentlab.backtest.ledger import ACCOUNTING_MODES, ledger_summary, run_ledger
+from tradeagentlab.data.bars import BarFrequency, bar_frequency
 from tradeagentlab.data.yf import load_prices
+from tradeagentlab.features.shards import ComputeConfig
 from tradeagentlab.features.tech import compute_momentum_signal
-from tradeagentlab.agents.orchestrator import run_agent_decision
+from tradeagentlab.portfolio.construction import build_weights
+from tradeagentlab.portfolio.optimizer import OptimizerConfig
+from tradeagentlab.portfolio.rebalance import RebalanceConfig, rebalance_mask, rebalance_summary
+from tradeagentlab.report.attribution import (
+    AttributionConfig,
+    build_factors,
+    compute_attribution,
+    read_attribution_config,
+)
 from tradeagentlab.report.basic import write_basic_report
-from tradeagentlab.risk.engine import RiskConfig, apply_risk
+from tradeagentlab.report.html import write_html_report
+from tradeagentlab.report.metrics import compute_metrics
+from tradeagentlab.results.store import config_hash, write_run_results
+from tradeagentlab.risk.engine import (
+    RiskConfig,
+    apply_risk,
+    apply_risk_rebalanced,
+    read_risk_config,
+)
+from tradeagentlab.risk.stress import StressConfig, load_historical_scenarios, stress_plan
 
 
 @dataclass
@@ -26,10 +48,31 @@ class BacktestConfig:
     agent: dict
     report_out_dir: str
     report_name: str
+    results_dir: str | None = ".cache/results"
+    report_format: str = "md"  # md|html|both|none
+    report_max_points: int = 2000
+    interval: str = "1d"
+    bars_per_day: float | None = None
+    construction: str = "equal"  # equal|min_variance|risk_parity|mean_variance
+    accounting: str = "weights"  # weights|ledger (integer shares + cash)
+    lot_size: float = 1.0  # ledger only: order granularity in shares
+    optimizer: OptimizerConfig = field(default_factory=OptimizerConfig)
+    rebalance: RebalanceConfig = field(default_factory=RebalanceConfig)
+    attribution: AttributionConfig = field(default_factory=AttributionConfig)
+    stress: StressConfig = field(default_factory=StressConfig)
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    compute: ComputeConfig = field(default_factory=ComputeConfig)
+
+    @property
+    def freq(self) -> BarFrequency:
+        return bar_frequency(self.interval, self.bars_per_day)
 
 
 def _read_config(path: Path) -> BacktestConfig:
-    obj = yaml.safe_load(path.read_text())
+    return _parse_config(yaml.safe_load(path.read_text()))
+
+
+def _parse_config(obj: dict) -> BacktestConfig:
     u = obj["universe"]
     s = obj["strategy"]
     p = obj["portfolio"]
@@ -37,13 +80,10 @@ def _read_config(path: Path) -> BacktestConfig:
     agent = obj.get("agent", {})
     r = obj.get("report", {})
 
-    risk = RiskConfig(
-        target_vol_ann=float(rk.get("target_vol_ann", 0.12)),
-        vol_lookback=int(rk.get("vol_lookback", 20)),
-        max_leverage=float(rk.get("max_leverage", 1.0)),
-        dd_kill=float(rk.get("dd_kill", 0.20)),
-        dd_recover=(float(rk["dd_recover"]) if "dd_recover" in rk and rk["dd_recover"] is not None else None),
-    )
+    risk = read_risk_config(rk, agent, dd_kill=0.20)
+    accounting = str(p.get("accounting", "weights"))
+    if accounting not in ACCOUNTING_MODES:
+        raise ValueError(f"Unknown portfolio.accounting {accounting!r} ({'|'.join(ACCOUNTING_MODES)})")
 
     return BacktestConfig(
         tickers=list(u["tickers"]),
@@ -54,46 +94,163 @@ def _read_config(path: Path) -> BacktestConfig:
         max_position_weight=float(p["max_position_weight"]),
         transaction_cost_bps=float(p.get("transaction_cost_bps", 0.0)),
         risk=risk,
-        agent=dict(agent),
+        agent={k: v for k, v in agent.items() if k != "llm"},
         report_out_dir=str(r.get("out_dir", "docs")),
         report_name=str(r.get("name", "run")),
+        # `report.results_dir: null` disables the columnar results dataset
+        results_dir=(str(r.get("results_dir", ".cache/results")) if r.get("results_dir", True) else None),
+        report_format=str(r.get("format", "md")),
+        report_max_points=int(r.get("max_points", 2000)),
+        interval=str(u.get("interval", "1d")),
+        bars_per_day=(float(u["bars_per_day"]) if u.get("bars_per_day") else None),
+        construction=str(p.get("construction", "equal")),
+        accounting=accounting,
+        lot_size=float(p.get("lot_size", 1.0)),
+        optimizer=OptimizerConfig(**(p.get("optimizer") or {})),
+        # `portfolio.rebalance`: calendar / no-trade band / min trade (default: every bar)
+        rebalance=RebalanceConfig(**(p.get("rebalance") or {})),
+        # `report.attribution` (opt-in: loads the size/sector factor ETFs)
+        attribution=read_attribution_config(r.get("attribution")),
+        # `risk.stress: null` (or `enabled: false`) skips the stress scenarios
+        stress=StressConfig(**(rk.get("stress") or {}) if rk.get("stress", True) else {"enabled": False}),
+        # `agent.llm` turns on LLM commentary in the research note (needs an endpoint)
+        llm=LLMConfig(**{"enabled": True, **(agent.get("llm") or {})}) if agent.get("llm") else LLMConfig(),
+        # `compute.shards > 1` splits per-ticker features/research into parallel column shards
+        compute=ComputeConfig(**(obj.get("compute") or {})),
     )
 
 
-def run_backtest(config_path: Path) -> None:
-    cfg = _read_config(config_path)
+def _strategy_hash(cfg: BacktestConfig) -> str:
+    # Reporting/output locations don't change results, so they are left out of the hash.
+    obj = asdict(cfg)
+    for k in (
+        "report_out_dir",
+        "report_name",
+        "results_dir",
+        "report_format",
+        "report_max_points",
+        "attribution",
+        "stress",
+        "llm",
+        "compute",
+    ):
+        obj.pop(k, None)
+    return config_hash(obj)
+
+
+def run_backtest(config_path: Path, run_id: str | None = None) -> None:
+    run_backtest_config(_read_config(config_path), run_id=run_id)
+
 
-    prices = load_prices(cfg.tickers, cfg.start, cfg.end)
+def run_backtest_config(cfg: BacktestConfig, run_id: str | None = None) -> str | None:
+    """Run one backtest from a parsed config; returns the results-store run id (if stored)."""
+    freq = cfg.freq
+
+    prices = load_prices(cfg.tickers, cfg.start, cfg.end, interval=cfg.interval)
     # prices: columns=tickers, index=Date
 
     # Benchmark (SPY) for comparison in reports
-    bench = load_prices(["SPY"], cfg.start, cfg.end)["SPY"].reindex(prices.index).ffill()
+    bench = load_prices(["SPY"], cfg.start, cfg.end, interval=cfg.interval)["SPY"]
+    bench = bench.reindex(prices.index).ffill()
 
-    signal = compute_momentum_signal(prices, lookback=cfg.lookback)
-    # naive: daily rebalance to equal-weight long tickers with positive momentum
+    signal = compute_momentum_signal(prices, lookback=freq.bars(cfg.lookback), compute=cfg.compute)
+    # naive: daily rebalance among long tickers with positive momentum
 
     rets = prices.pct_change().fillna(0.0)
     bench_ret = bench.pct_change().fillna(0.0)
 
-    # Build weights: equal-weight across tickers with signal==1
-    w = signal.div(signal.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
-    w = w.clip(upper=cfg.max_position_weight)
-    w = w.div(w.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
-
-    # Risk overlays (vol targeting + drawdown kill) and transaction costs
-    risk_out = apply_risk(
-        base_weights=w,
-        asset_returns=rets,
-        transaction_cost_bps=cfg.transaction_cost_bps,
-        cfg=cfg.risk,
+    # Rebalance policy: targets are only evaluated on rebalance bars (None = every bar)
+    rb = cfg.rebalance
+    schedule = rebalance_mask(prices.index, rb.calendar) if rb.active else None
+
+    # Build weights: equal-weight (default) or optimizer across tickers with signal==1
+    w = build_weights(
+        signal,
+        prices,
+        cfg.max_position_weight,
+        construction=cfg.construction,
+        optimizer=cfg.optimizer,
+        lookback=freq.bars(cfg.lookback),
+        freq=freq,
+        compute=cfg.compute,
+        rebalance=schedule,
     )
 
+    # Risk overlays (vol targeting + drawdown kill) and transaction costs. With a
+    # rebalance policy, positions drift between rebalance bars and risk gates that book.
+    if schedule is None:
+        risk_out = apply_risk(
+            base_weights=w,
+            asset_returns=rets,
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            cfg=cfg.risk,
+            freq=freq,
+        )
+    else:
+        risk_out = apply_risk_rebalanced(
+            base_weights=w,
+            asset_returns=rets,
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            cfg=cfg.risk,
+            rebalance=rb,
+            schedule=schedule,
+            freq=freq,
+        )
+
     w_exec = risk_out["weights"]
     port_ret = risk_out["portfolio_returns"]
     audit = risk_out["audit"]
+    turnover, cost = audit["turnover"], audit["cost"]
+
+    # Share-level execution: whole-lot orders, cash ledger, costs from actual fills
+    ledger = None
+    if cfg.accounting == "ledger":
+        ledger = run_ledger(
+            w_exec,
+            prices,
+            cfg.initial_cash,
+            cfg.transaction_cost_bps,
+            cfg.lot_size,
+            trade_mask=risk_out.get("trades"),
+        )
+        w_exec = ledger["weights"]
+        port_ret = ledger["portfolio_returns"]
+        turnover, cost = ledger["turnover"], ledger["cost"]
 
-    equity = (1.0 + port_ret).cumprod() * cfg.initial_cash
-    bench_equity = (1.0 + bench_ret).cumprod() * cfg.initial_cash
+    # One streaming metrics pass (equity, drawdown, rolling stats) shared with the report
+    metrics = compute_metrics(
+        port_ret,
+        bench_ret,
+        window=freq.bars(20),
+        beta_window=freq.bars(63),
+        ann=freq.periods_per_year,
+        unit=freq.unit,
+    )
+    equity = metrics.equity["strategy"] * cfg.initial_cash
+    bench_equity = metrics.equity["benchmark"] * cfg.initial_cash
+
+    # Multi-factor attribution (market, momentum, size spread, sector ETFs)
+    attribution = None
+    ac = cfg.attribution
+    if ac.enabled:
+        wanted = dict.fromkeys([*ac.size, *ac.sectors])
+        extra = [t for t in wanted if t not in prices.columns and t != "SPY"]
+        extra_px = (
+            load_prices(extra, cfg.start, cfg.end, interval=cfg.interval).reindex(prices.index).ffill()
+            if extra
+            else None
+        )
+        factors = build_factors(
+            prices,
+            bench_ret.rename("SPY"),
+            momentum_lookback=freq.bars(ac.momentum_lookback),
+            size=ac.size,
+            sectors=ac.sectors,
+            extra_prices=extra_px,
+        )
+        attribution = compute_attribution(
+            port_ret, factors, window=freq.bars(ac.window), ann=freq.periods_per_year
+        )
 
     # Agent artifacts (structured, auditable): propose BEFORE risk; execute AFTER risk.
     agent_out = run_agent_decision(
@@ -104,8 +261,25 @@ def run_backtest(config_path: Path) -> None:
         name=cfg.report_name,
         max_ticker_vol_ann=float(cfg.agent.get("max_ticker_vol_ann", 0.35)),
         vol_cap_mode=str(cfg.agent.get("vol_cap_mode", "scale")),
+        freq=freq,
+        llm=cfg.llm,
+        group_factor=risk_out.get("group_factor"),
+        compute=cfg.compute,
     )
 
+    # Stress the final plan: historical windows + synthetic shocks, overlays kept running
+    stress = None
+    if cfg.stress.enabled:
+        stress = stress_plan(
+            agent_out,
+            prices,
+            cfg.risk,
+            cfg.stress,
+            historical=load_historical_scenarios(cfg.tickers, cfg.stress.historical),
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            freq=freq,
+        )
+
     results = {
         "config": cfg,
         "prices": prices,
@@ -116,10 +290,39 @@ def run_backtest(config_path: Path) -> None:
         "benchmark_returns": bench_ret,
         "equity": equity,
         "benchmark_equity": bench_equity,
-        "turnover": audit["turnover"],
-        "cost": audit["cost"],
+        "turnover": turnover,
+        "cost": cost,
         "risk_audit": audit,
+        "risk_contrib": risk_out.get("risk_contrib"),
+        "metrics": metrics,
+        "attribution": attribution,
         "agent": agent_out,
+        "stress": stress,
+        "ledger": ledger_summary(ledger) if ledger is not None else None,
+        "rebalance": rebalance_summary(risk_out, schedule) if schedule is not None else None,
     }
 
-    write_basic_report(results, out_dir=Path(cfg.report_out_dir), name=cfg.report_name)
+    if cfg.report_format in ("md", "both"):
+        write_basic_report(results, out_dir=Path(cfg.report_out_dir), name=cfg.report_name)
+    if cfg.report_format in ("html", "both"):
+        write_html_report(
+            results,
+            out_dir=Path(cfg.report_out_dir),
+            name=cfg.report_name,
+            max_points=cfg.report_max_points,
+        )
+
+    # Columnar results dataset (feeds `tal leaderboard`)
+    if cfg.results_dir is not None:
+        h = _strategy_hash(cfg)
+        created = pd.Timestamp.now(tz="UTC")
+        run_id = run_id or f"{cfg.report_name}-{created:%Y%m%dT%H%M%S}-{h[:8]}"
+        write_run_results(
+            results,
+            run_id=run_id,
+            cfg_hash=h,
+            meta={"name": cfg.report_name, "created_at": created.isoformat(), "config": asdict(cfg)},
+            root=Path(cfg.results_dir),
+        )
+        return run_id
+    return None
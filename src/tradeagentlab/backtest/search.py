@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import itertools
+import math
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from tradeagentlab.backtest.runner import BacktestConfig, _read_config
+from tradeagentlab.backtest.stream import StreamingBacktest, check_streamable
+from tradeagentlab.data.yf import load_prices
+from tradeagentlab.report.metrics import SUMMARY_COLUMNS, MetricsEngine
+from tradeagentlab.risk.engine import RiskConfig
+
+# Parameters the streaming backtest consumes: top-level config fields + any RiskConfig field.
+STRATEGY_PARAMS = ("lookback", "max_position_weight", "transaction_cost_bps")
+METRICS = ("sharpe", "cagr", "mdd", "calmar")
+
+
+@dataclass
+class SearchConfig:
+    params: dict[str, list] = field(default_factory=dict)  # name → candidate values (grid)
+    n_candidates: int | None = None  # random sample of the grid (None = full grid)
+    eta: int = 3  # keep the best 1/eta at each rung; slices grow by eta
+    min_days: int = 126  # first rung slice (trading days)
+    metric: str = "sharpe"  # sharpe|cagr|mdd|calmar (higher is better)
+    validation_days: int = 252  # held-out tail for walk-forward validation
+    folds: int = 4  # consecutive out-of-sample windows in the tail
+    top_k: int = 3  # finalists validated
+    seed: int = 0
+
+
+def _read_search(path: Path) -> SearchConfig:
+    obj = yaml.safe_load(path.read_text()).get("search") or {}
+    cfg = SearchConfig(**obj)
+    unknown = [k for k in cfg.params if k not in STRATEGY_PARAMS and k not in RiskConfig.__dataclass_fields__]
+    if unknown:
+        raise ValueError(f"Unsupported search params {unknown}; use {STRATEGY_PARAMS} or RiskConfig fields")
+    if cfg.metric not in METRICS:
+        raise ValueError(f"Unknown metric {cfg.metric!r} ({'|'.join(METRICS)})")
+    return cfg
+
+
+def candidate_grid(sc: SearchConfig) -> list[dict]:
+    """All grid points (or a seeded random sample of `n_candidates`)."""
+    names = list(sc.params)
+    grid = [dict(zip(names, vals)) for vals in itertools.product(*(sc.params[n] for n in names))]
+    if sc.n_candidates is not None and sc.n_candidates < len(grid):
+        pick = np.random.default_rng(sc.seed).choice(len(grid), sc.n_candidates, replace=False)
+        grid = [grid[i] for i in sorted(pick)]
+    return grid
+
+
+def apply_params(cfg: BacktestConfig, params: dict) -> BacktestConfig:
+    top = {k: v for k, v in params.items() if k in STRATEGY_PARAMS}
+    risk = {k: v for k, v in params.items() if k not in STRATEGY_PARAMS}
+    return replace(cfg, **top, risk=replace(cfg.risk, **risk))
+
+
+def _score(summary_row: np.ndarray, metric: str) -> float:
+    s = dict(zip(SUMMARY_COLUMNS, summary_row.tolist()))
+    if metric == "calmar":
+        return s["cagr"] / abs(s["mdd"]) if s["mdd"] < 0 else 0.0
+    return float(s[metric])
+
+
+class _Candidate:
+    """One config's streaming backtest plus metrics, advanced slice by slice."""
+
+    def __init__(self, cid: int, params: dict, cfg: BacktestConfig) -> None:
+        freq = cfg.freq
+        self.cid = cid
+        self.params = params
+        self.engine = StreamingBacktest(
+            len(cfg.tickers),
+            lookback=freq.bars(cfg.lookback),
+            max_position_weight=cfg.max_position_weight,
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            risk=cfg.risk,
+            freq=freq,
+            tickers=cfg.tickers,
+        )
+        self.ann = freq.periods_per_year
+        self.metrics = MetricsEngine(1, ann=self.ann)
+        self.pos = 0  # bars consumed
+
+    def advance(self, px: np.ndarray, months: np.ndarray, to: int, extra: MetricsEngine | None = None) -> int:
+        """Extend to bar `to`; only the new bars are simulated. Returns the bars simulated."""
+        n = to - self.pos
+        if n <= 0:
+            return 0
+        ret = self.engine.update(px[self.pos : to])["portfolio_return"][:, None]
+        for m in (self.metrics, extra) if extra is not None else (self.metrics,):
+            m.update(ret, months[self.pos : to])
+        self.pos = to
+        return n
+
+
+def successive_halving(
+    cfg: BacktestConfig,
+    sc: SearchConfig,
+    prices: pd.DataFrame,
+) -> dict:
+    """Successive halving over growing time slices, then walk-forward validation.
+
+    The history is split into a search region and a held-out tail of `validation_days`.
+    All candidates run on the first `min_days` of the search region; the best 1/eta are
+    promoted to a slice eta× longer, and so on until the full search region. Promoted
+    candidates keep their `StreamingBacktest` state, so extending a slice only simulates
+    the new bars (signal history, vol window, equity/kill-switch state carry over).
+    The `top_k` survivors then continue through `folds` consecutive out-of-sample
+    windows of the tail and are ranked by their mean fold score.
+
+    Candidates are scored by the streaming engine, so configs using settings it does not
+    model (optimizer construction, rebalance policy, share ledger) are rejected.
+    """
+    check_streamable(cfg)
+    freq = cfg.freq
+    px = prices.to_numpy(dtype=float)
+    idx = prices.index
+    months = (idx.year * 12 + idx.month - 1).to_numpy()
+    n_val = freq.bars(sc.validation_days) if sc.validation_days else 0
+    n_search = len(idx) - n_val
+    first = freq.bars(sc.min_days)
+    if n_search < first:
+        raise ValueError(f"Need more than {sc.min_days} trading days before the validation tail")
+
+    grid = candidate_grid(sc) or [{}]
+    alive = [_Candidate(i, p, apply_params(cfg, p)) for i, p in enumerate(grid)]
+    n_rungs = max(1, math.ceil(math.log(n_search / first, sc.eta)) + 1) if n_search > first else 1
+
+    trajectory = []
+    bars_simulated = 0
+    rung = 0
+    while True:
+        # The last rung runs the survivors over the whole search region
+        last = rung == n_rungs - 1 or len(alive) <= sc.top_k
+        to = n_search if last else min(n_search, first * sc.eta**rung)
+        t0 = time.perf_counter()
+        for c in alive:
+            bars_simulated += c.advance(px, months, to)
+        secs = time.perf_counter() - t0
+        scores = np.array([_score(c.metrics.summary()[0], sc.metric) for c in alive])
+        order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")
+        keep = min(len(alive), sc.top_k) if last else max(sc.top_k, math.ceil(len(alive) / sc.eta))
+        promoted = {alive[i].cid for i in order[:keep]}
+        for c, s in zip(alive, scores):
+            trajectory.append(
+                {
+                    "rung": rung,
+                    "bars": to,
+                    "end": idx[to - 1],
+                    "candidate": c.cid,
+                    **c.params,
+                    sc.metric: s,
+                    "promoted": c.cid in promoted,
+                    "rung_seconds": secs,
+                }
+            )
+        alive = [alive[i] for i in order[:keep]]
+        if last:
+            break
+        rung += 1
+
+    # Walk-forward validation on the held-out tail (state continues from the search region)
+    folds = []
+    if n_val:
+        edges = np.linspace(n_search, len(idx), max(1, sc.folds) + 1).round().astype(int)
+        for k, (a, b) in enumerate(itertools.pairwise(edges)):
+            for c in alive:
+                fold_metrics = MetricsEngine(1, ann=c.ann)
+                bars_simulated += c.advance(px, months, b, extra=fold_metrics)
+                folds.append(
+                    {
+                        "fold": k,
+                        "start": idx[a],
+                        "end": idx[b - 1],
+                        "candidate": c.cid,
+                        sc.metric: _score(fold_metrics.summary()[0], sc.metric),
+                    }
+                )
+    traj = pd.DataFrame(trajectory)
+    fold_df = pd.DataFrame(folds)
+
+    final = traj[traj["rung"] == traj["rung"].max()].set_index("candidate")
+    winners = pd.DataFrame(
+        [{"candidate": c.cid, **c.params, f"search_{sc.metric}": final[sc.metric].get(c.cid)} for c in alive]
+    ).set_index("candidate")
+    if len(fold_df):
+        per = fold_df.pivot(index="candidate", columns="fold", values=sc.metric)
+        winners[f"wf_{sc.metric}_mean"] = per.mean(axis=1)
+        winners[f"wf_{sc.metric}_min"] = per.min(axis=1)
+        winners = winners.sort_values(f"wf_{sc.metric}_mean", ascending=False)
+
+    return {
+        "trajectory": traj,
+        "folds": fold_df,
+        "winners": winners,
+        "n_candidates": len(grid),
+        "bars_simulated": bars_simulated,
+        "bars_exhaustive": len(grid) * n_search + len(alive) * n_val,
+        "search_end": idx[n_search - 1],
+    }
+
+
+def run_search(config_path: Path) -> Path:
+    """`tal search`: successive-halving search over the config's `search.params`.
+
+    Writes `<out_dir>/<name>_search_trajectory.csv`, `<name>_search_folds.csv` and a
+    markdown summary `<name>_search.md`.
+    """
+    cfg = _read_config(config_path)
+    sc = _read_search(config_path)
+    prices = load_prices(cfg.tickers, cfg.start, cfg.end, interval=cfg.interval)
+    out = successive_halving(cfg, sc, prices)
+
+    out_dir = Path(cfg.report_out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    traj_path = out_dir / f"{cfg.report_name}_search_trajectory.csv"
+    out["trajectory"].to_csv(traj_path, index=False)
+    out["folds"].to_csv(out_dir / f"{cfg.report_name}_search_folds.csv", index=False)
+
+    m = sc.metric
+    rungs = (
+        out["trajectory"]
+        .groupby("rung")
+        .agg(bars=("bars", "first"), end=("end", "first"), candidates=("candidate", "size"), best=(m, "max"))
+        .rename(columns={"best": f"best_{m}"})
+    )
+    saved = 1.0 - out["bars_simulated"] / max(out["bars_exhaustive"], 1)
+    md = f"""# TradeAgentLab Search: {cfg.report_name}
+
+- Candidates: **{out["n_candidates"]}** ({", ".join(f"`{k}`" for k in sc.params) or "no params"}), eta={sc.eta}, metric=`{m}`
+- Search region ends {out["search_end"]:%Y-%m-%d}; walk-forward on the last {sc.validation_days} trading days in {sc.folds} folds
+- Bars simulated: **{out["bars_simulated"]:,}** vs {out["bars_exhaustive"]:,} for the exhaustive grid ({saved:.0%} saved)
+- Trajectory: `{traj_path.as_posix()}`
+
+## Rungs
+{rungs.to_markdown(floatfmt=".4f")}
+
+## Walk-forward validated winners
+{out["winners"].to_markdown(floatfmt=".4f")}
+
+## Notes
+- Scores are on the whole slice so far; promoted candidates extend their slice without re-simulating it.
+- Validation windows continue each finalist's state out of sample (no refit between folds).
+"""
+    path = out_dir / f"{cfg.report_name}_search.md"
+    path.write_text(md)
+    return path
@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.report.metrics import SUMMARY_COLUMNS, MetricsEngine, _rolling_sums
+from tradeagentlab.risk.covariance import EWMACovariance
+from tradeagentlab.risk.engine import RiskConfig, cross_sectional_overlays
+
+if TYPE_CHECKING:
+    from tradeagentlab.backtest.runner import BacktestConfig
+
+_TIME_COLUMNS = ("timestamp", "datetime", "Datetime", "Date", "date", "__index_level_0__")
+
+OUTPUT_COLUMNS = [
+    "portfolio_return",
+    "base_return",
+    "scale",
+    "vol_est_ann",
+    "drawdown",
+    "killed",
+    "turnover",
+    "cost",
+    "exposure",
+]
+
+
+def _ffill(block: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down the rows of `block`, seeded with the previous row `last`."""
+    s = np.concatenate([last[None, :], block], axis=0)
+    pos = np.where(np.isnan(s), 0, np.arange(len(s))[:, None])
+    np.maximum.accumulate(pos, axis=0, out=pos)
+    return s[pos, np.arange(s.shape[1])][1:]
+
+
+class StreamingBacktest:
+    """Incremental version of the baseline backtest (momentum → capped equal weight → risk).
+
+    Feed time-ordered price blocks of any size to `update`; signal history, last prices,
+    previous weights, the vol-target window, pre-cost equity/peak and the kill-switch
+    state are carried between blocks, so results equal one in-memory `apply_risk` run
+    while memory stays bounded by the block size. The per-bar `reason` strings of the
+    in-memory audit are not produced (numeric audit columns only). Group caps need
+    `tickers` to resolve group members.
+    """
+
+    def __init__(
+        self,
+        n_assets: int,
+        lookback: int,
+        max_position_weight: float,
+        transaction_cost_bps: float,
+        risk: RiskConfig,
+        freq: BarFrequency = DAILY,
+        tickers: list[str] | None = None,
+    ) -> None:
+        if risk.groups and tickers is None:
+            raise ValueError("Group caps need the ticker names (pass `tickers`)")
+        self.tickers = list(tickers) if tickers is not None else [str(i) for i in range(n_assets)]
+        self.lookback = lookback  # bars
+        self.max_position_weight = max_position_weight
+        self.cost_rate = transaction_cost_bps / 1e4
+        self.risk = risk
+        self.freq = freq
+        self.vol_window = freq.bars(risk.vol_lookback)
+        if risk.vol_model not in ("realized", "ewma"):
+            raise ValueError(f"Unknown vol_model {risk.vol_model!r} (realized|ewma)")
+        self.cov = (
+            EWMACovariance(n_assets, freq.bars(risk.cov_halflife), risk.cov_shrinkage)
+            if risk.vol_model == "ewma"
+            else None
+        )
+
+        n = n_assets
+        self.last_px = np.full(n, np.nan)
+        self.px_hist = np.empty((0, n))  # last `lookback` (ffilled) price rows
+        self.w_prev = np.zeros(n)  # base weights of the previous bar
+        self.ws_prev: np.ndarray | None = None  # scaled weights of the previous bar
+        self.base_tail = np.empty((0, 1))  # last vol_window-1 base returns
+        self.ticker_vol_window = freq.bars(risk.ticker_vol_lookback)
+        self.ret_tail = np.empty((0, n))  # last ticker_vol_window-1 asset returns (vol cap)
+        self.scale_prev = 0.0
+        self.equity = 1.0  # pre-cost scaled equity (drawdown kill switch input)
+        self.peak = 0.0
+        self.live = True
+        self.n_bars = 0
+
+    def update(self, px_block: np.ndarray) -> dict[str, np.ndarray]:
+        """Advance by one block of raw prices (rows=bars, cols=assets, NaN allowed)."""
+        px = _ffill(np.asarray(px_block, dtype=float), self.last_px)
+        t = len(px)
+        if t == 0:
+            return {c: np.empty(0) for c in OUTPUT_COLUMNS}
+
+        # Asset returns (first bar of the stream → 0)
+        prev_px = np.concatenate([self.last_px[None, :], px[:-1]], axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rets = np.nan_to_num(px / prev_px - 1.0, nan=0.0, posinf=0.0, neginf=0.0)
+
+        # Momentum signal: lookback-bar return > 0
+        hist = np.concatenate([self.px_hist, px], axis=0)
+        rows = np.arange(len(self.px_hist), len(hist)) - self.lookback
+        base_px = np.full_like(px, np.nan)
+        ok = rows >= 0
+        base_px[ok] = hist[rows[ok]]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sig = (px / base_px - 1.0) > 0
+
+        # Equal weight across longs, capped, renormalized
+        cnt = sig.sum(axis=1, keepdims=True)
+        w = np.where(cnt > 0, sig / np.maximum(cnt, 1), 0.0)
+        w = np.minimum(w, self.max_position_weight)
+        tot = w.sum(axis=1, keepdims=True)
+        w = np.where(tot > 0, w / np.where(tot > 0, tot, 1.0), 0.0)
+
+        # Per-ticker vol cap / group caps (same overlays as `apply_risk`)
+        cfg = self.risk
+        if cfg.ticker_vol_cap is not None or cfg.groups:
+            asset_vol = None
+            if cfg.ticker_vol_cap is not None:
+                n = self.ticker_vol_window
+                s1 = _rolling_sums(self.ret_tail, rets, n)
+                s2 = _rolling_sums(self.ret_tail**2, rets**2, n)
+                asset_vol = np.sqrt(np.maximum(s2 / n - (s1 / n) ** 2, 0.0)) * self.freq.ann_factor
+                if n > 1:
+                    self.ret_tail = np.concatenate([self.ret_tail, rets])[-(n - 1) :]
+            w, _, _ = cross_sectional_overlays(w, asset_vol, cfg, self.tickers)
+
+        # Unscaled strategy returns and their vol estimate (rolling realized or ex-ante EWMA)
+        w_lag = np.concatenate([self.w_prev[None, :], w[:-1]], axis=0)
+        base = (w_lag * rets).sum(axis=1)
+        vw = self.vol_window
+        if self.cov is not None:
+            var = np.full(t, np.nan)
+            for i in range(t):
+                self.cov.update(rets[i])
+                if self.cov.n_obs >= vw:
+                    var[i] = max(self.cov.portfolio_var(w[i]), 0.0)
+        else:
+            s1 = _rolling_sums(self.base_tail, base[:, None], vw)[:, 0]
+            s2 = _rolling_sums(self.base_tail**2, (base**2)[:, None], vw)[:, 0]
+            var = np.maximum(s2 / vw - (s1 / vw) ** 2, 0.0)
+        vol_est = np.sqrt(var) * self.freq.ann_factor
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            raw_scale = cfg.target_vol_ann / vol_est
+            scale = np.clip(raw_scale, 0.0, cfg.max_leverage)
+            if cfg.max_gross is not None:
+                gross = np.abs(w).sum(axis=1)
+                scale = np.minimum(scale, np.where(gross > 0, cfg.max_gross / gross, np.inf))
+        scale = np.nan_to_num(scale, nan=0.0)
+
+        # Drawdown of the pre-cost scaled equity + sequential kill switch
+        scale_lag = np.concatenate([[self.scale_prev], scale[:-1]])
+        eq = self.equity * np.cumprod(1.0 + scale_lag * base)
+        peak = np.maximum.accumulate(np.concatenate([[self.peak], eq]))[1:]
+        dd = eq / peak - 1.0
+        killed = np.zeros(t, dtype=bool)
+        live = self.live
+        for i, d in enumerate(dd.tolist()):
+            if not live:
+                if cfg.dd_recover is not None and d > -cfg.dd_recover:
+                    live = True
+                else:
+                    killed[i] = True
+                    continue
+            if d <= -cfg.dd_kill:
+                live = False
+                killed[i] = True
+        scale2 = np.where(killed, 0.0, scale)
+
+        # Executed weights, turnover, costs, net returns
+        ws = w * scale2[:, None]
+        first = self.ws_prev is None
+        ws_prev = np.zeros_like(self.w_prev) if first else self.ws_prev
+        ws_lag = np.concatenate([ws_prev[None, :], ws[:-1]], axis=0)
+        turnover = np.abs(ws - ws_lag).sum(axis=1)
+        if first:
+            turnover[0] = 0.0  # matches `diff()` on the first row
+        cost = turnover * self.cost_rate
+        port = (ws_lag * rets).sum(axis=1) - cost
+
+        # Carry state
+        self.last_px = px[-1]
+        self.px_hist = hist[-self.lookback :] if self.lookback > 0 else hist[:0]
+        self.w_prev = w[-1]
+        self.ws_prev = ws[-1]
+        if vw > 1:
+            self.base_tail = np.concatenate([self.base_tail, base[:, None]])[-(vw - 1) :]
+        self.scale_prev = float(scale[-1])
+        self.equity, self.peak = float(eq[-1]), float(peak[-1])
+        self.live = live
+        self.n_bars += t
+
+        return {
+            "portfolio_return": port,
+            "base_return": base,
+            "scale": scale2,
+            "vol_est_ann": vol_est,
+            "drawdown": dd,
+            "killed": killed,
+            "turnover": turnover,
+            "cost": cost,
+            "exposure": ws.sum(axis=1),
+        }
+
+
+def iter_price_chunks(
+    path: Path,
+    tickers: list[str],
+    chunk_rows: int = 250_000,
+    time_col: str | None = None,
+    price_col: str = "close",
+) -> Iterator[pd.DataFrame]:
+    """Yield time-ordered wide price blocks (index=timestamp, columns=tickers) from Parquet.
+
+    Accepts a file or a directory of files (read in sorted path order), in either layout:
+    - long: `timestamp, ticker, close` rows (bars of one timestamp may span batches; the
+      trailing timestamp of each batch is held back until it is complete)
+    - wide: a timestamp column plus one price column per ticker
+    Only `chunk_rows` rows (plus one Parquet page set) are materialized at a time.
+    """
+    files = sorted(Path(path).rglob("*.parquet")) if Path(path).is_dir() else [Path(path)]
+    if not files:
+        raise FileNotFoundError(f"No Parquet files under {path}")
+    names = pq.read_schema(files[0]).names
+    tcol = time_col or next((c for c in _TIME_COLUMNS if c in names), None)
+    if tcol is None:
+        raise ValueError(f"No timestamp column found in {path} (looked for {_TIME_COLUMNS})")
+
+    def _batches(columns: list[str]) -> Iterator[pa.RecordBatch]:
+        # pre_buffer=False: read column chunks on demand instead of caching whole row groups
+        for f in files:
+            yield from pq.ParquetFile(f, pre_buffer=False).iter_batches(
+                batch_size=chunk_rows, columns=columns
+            )
+
+    if "ticker" not in names:
+        for batch in _batches([tcol, *tickers]):
+            df = batch.to_pandas().set_index(tcol)
+            df.index = pd.to_datetime(df.index)
+            yield df.reindex(columns=tickers)
+        return
+
+    def _wide(df: pd.DataFrame) -> pd.DataFrame:
+        out = df.pivot_table(index=tcol, columns="ticker", values=price_col, aggfunc="last")
+        out.index = pd.to_datetime(out.index)
+        return out.reindex(columns=tickers)
+
+    carry: pd.DataFrame | None = None
+    for batch in _batches([tcol, "ticker", price_col]):
+        df = batch.to_pandas()
+        if carry is not None:
+            df = pd.concat([carry, df], ignore_index=True)
+        last = df[tcol].iloc[-1]
+        done = df[tcol] != last
+        carry = df[~done]
+        if done.any():
+            yield _wide(df[done])
+    if carry is not None and len(carry):
+        yield _wide(carry)
+
+
+def run_streaming_backtest(
+    data_path: Path,
+    tickers: list[str],
+    lookback: int,
+    max_position_weight: float,
+    transaction_cost_bps: float,
+    risk: RiskConfig,
+    freq: BarFrequency = DAILY,
+    out_path: Path | None = None,
+    chunk_rows: int = 250_000,
+    benchmark: str | None = "SPY",
+) -> dict:
+    """Stream a (possibly multi-GB) local Parquet price history through `StreamingBacktest`.
+
+    Per-bar outputs are appended to `out_path` (Parquet) as they are produced and summary
+    statistics are accumulated with `MetricsEngine`, so memory use is O(chunk) regardless
+    of history length. `lookback` and the risk window are in trading days (see `freq`).
+    """
+    engine = StreamingBacktest(
+        len(tickers),
+        lookback=freq.bars(lookback),
+        max_position_weight=max_position_weight,
+        transaction_cost_bps=transaction_cost_bps,
+        risk=risk,
+        freq=freq,
+        tickers=tickers,
+    )
+    bench_idx = tickers.index(benchmark) if benchmark in tickers else None
+    cols = ["strategy"] + (["benchmark"] if bench_idx is not None else [])
+    metrics = MetricsEngine(
+        len(cols),
+        bench_col=(1 if bench_idx is not None else None),
+        window=freq.bars(20),
+        beta_window=freq.bars(63),
+        ann=freq.periods_per_year,
+    )
+
+    writer: pq.ParquetWriter | None = None
+    bench_last = np.nan
+    first_ts = last_ts = None
+    try:
+        for chunk in iter_price_chunks(data_path, tickers, chunk_rows=chunk_rows):
+            if chunk.empty:
+                continue
+            out = engine.update(chunk.to_numpy(dtype=float))
+            idx = chunk.index
+            first_ts = first_ts if first_ts is not None else idx[0]
+            last_ts = idx[-1]
+
+            vals = [out["portfolio_return"]]
+            if bench_idx is not None:
+                bp = pd.Series(chunk.iloc[:, bench_idx].to_numpy(dtype=float)).ffill().to_numpy()
+                prev = np.concatenate([[bench_last], bp[:-1]])
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    vals.append(np.nan_to_num(bp / prev - 1.0, nan=0.0))
+                bench_last = bp[-1] if not math.isnan(bp[-1]) else bench_last
+            metrics.update(np.column_stack(vals), (idx.year * 12 + idx.month - 1).to_numpy())
+
+            if out_path is not None:
+                table = pa.table({"timestamp": idx.to_numpy(), **out})
+                if writer is None:
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    summary = pd.DataFrame(metrics.summary(), index=cols, columns=SUMMARY_COLUMNS)
+    return {
+        "summary": summary,
+        "n_bars": engine.n_bars,
+        "start": first_ts,
+        "end": last_ts,
+        "path": out_path,
+    }
+
+
+def check_streamable(cfg: BacktestConfig) -> None:
+    """Reject config settings the streaming engine does not model.
+
+    It replays equal-weight momentum with daily targets and weight-based accounting, so a
+    config using another construction, a rebalance policy or the share ledger would
+    silently run as a different strategy.
+    """
+    unsupported = [
+        *([f"portfolio.construction={cfg.construction!r}"] if cfg.construction != "equal" else []),
+        *(["portfolio.rebalance"] if cfg.rebalance.active else []),
+        *([f"portfolio.accounting={cfg.accounting!r}"] if cfg.accounting != "weights" else []),
+    ]
+    if unsupported:
+        raise ValueError(
+            f"Streaming evaluation does not support {', '.join(unsupported)}; use `tal backtest`"
+        )
+
+
+def run_stream_backtest(config_path: Path, data_path: Path, chunk_rows: int = 250_000) -> Path:
+    """`tal stream`: backtest config over a local Parquet price history, written incrementally.
+
+    Writes `<out_dir>/<name>_stream.parquet` (per-bar audit) and a short markdown summary.
+    """
+    from tradeagentlab.backtest.runner import _read_config
+
+    cfg = _read_config(config_path)
+    check_streamable(cfg)
+    out_dir = Path(cfg.report_out_dir)
+    out = run_streaming_backtest(
+        data_path,
+        tickers=cfg.tickers,
+        lookback=cfg.lookback,
+        max_position_weight=cfg.max_position_weight,
+        transaction_cost_bps=cfg.transaction_cost_bps,
+        risk=cfg.risk,
+        freq=cfg.freq,
+        out_path=out_dir / f"{cfg.report_name}_stream.parquet",
+        chunk_rows=chunk_rows,
+    )
+
+    summ = out["summary"].drop(columns=["n"]).rename(index={"benchmark": "SPY (benchmark)"})
+    md = f"""# TradeAgentLab Streaming Backtest: {cfg.report_name}
+
+- Data: `{Path(data_path).as_posix()}` ({cfg.interval} bars, {cfg.freq.bars_per_day:g} per day)
+- Bars processed: **{out["n_bars"]:,}** ({out["start"]} → {out["end"]})
+- Per-bar audit: `{Path(out["path"]).as_posix()}`
+
+## Summary
+{summ.to_markdown(floatfmt=".4f")}
+
+## Notes
+- Same strategy/risk logic as `tal backtest`, evaluated chunk by chunk with carried state.
+- This is a research backtest, not investment advice.
+"""
+    path = out_dir / f"{cfg.report_name}_stream_report.md"
+    path.write_text(md)
+    return path
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from tradeagentlab.backtest.runner import _parse_config, run_backtest_config
+from tradeagentlab.backtest.search import _read_search, apply_params, candidate_grid
+from tradeagentlab.results.store import RESULTS_DIR, config_hash
+
+QUEUE_PATH = Path(".cache/sweep.db")
+STATUSES = ("queued", "running", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    name TEXT NOT NULL,
+    config TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    run_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+
+class WorkQueue:
+    """SQLite job queue with leases, bounded retries and idempotent enqueue.
+
+    - A job is one backtest: the parsed config (stored in the queue, so workers don't
+      need the YAML file) plus parameter overrides. Its key hashes both; enqueueing the
+      same job twice is a no-op.
+    - `claim` hands the oldest queued job to a worker under a lease; workers renew it
+      while running. A job whose lease expires (dead or hung worker) is queued again,
+      or marked failed once it has used `max_attempts`.
+    - All state changes are single `BEGIN IMMEDIATE` transactions, so any number of
+      processes can share the file. Several hosts can share it on a filesystem with
+      working POSIX locks (the rollback journal is used rather than WAL for that reason).
+    """
+
+    def __init__(self, path: Path = QUEUE_PATH, timeout: float = 60.0) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    @contextmanager
+    def _tx(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def enqueue(self, jobs: list[tuple[dict, dict]], max_attempts: int = 3) -> int:
+        """Add `(config dict, params)` jobs; returns how many were new."""
+        now = time.time()
+        rows = []
+        for obj, params in jobs:
+            key = config_hash({"config": obj, "params": params})
+            name = str((obj.get("report") or {}).get("name", "run"))
+            # default=str: unquoted YAML dates (start: 2018-01-01) are stored as strings
+            config = json.dumps(obj, default=str)
+            rows.append((key, f"{name}-{key[:8]}", config, json.dumps(params), max_attempts, now))
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (key, name, config, params, max_attempts, enqueued_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return db.total_changes - before
+
+    def claim(self, worker: str, lease_s: float) -> dict | None:
+        """Lease the oldest queued job to `worker` (expired leases are recycled first)."""
+        now = time.time()
+        with self._tx() as db:
+            db.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,"
+                " error = 'lease expired (' || worker || ')', worker = NULL, lease_until = NULL"
+                " WHERE status = 'running' AND lease_until < ?",
+                (now,),
+            )
+            row = db.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, started_at = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_s, now, row["id"]),
+            )
+            return dict(db.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def renew(self, job_id: int, worker: str, lease_s: float) -> bool:
+        """Extend a running job's lease; False if the worker no longer holds it."""
+        cur = self._db.execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time() + lease_s, job_id, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: int, run_id: str | None) -> None:
+        # Results are written under a deterministic run id, so a job finished twice (lease
+        # lost mid-run) simply overwrites the same partition; the first completion wins here.
+        self._db.execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, run_id = ?, lease_until = NULL"
+            " WHERE id = ? AND status != 'done'",
+            (time.time(), run_id, job_id),
+        )
+
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        """Queue the job again, or mark it failed once its attempts are used up."""
+        self._db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,"
+            " error = ?, worker = NULL, lease_until = NULL, finished_at = ?"
+            " WHERE id = ? AND worker = ? AND status = 'running'",
+            (error, time.time(), job_id, worker),
+        )
+
+    def pending(self) -> int:
+        """Jobs still queued or running."""
+        return self._db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+
+    def jobs(self) -> pd.DataFrame:
+        return pd.read_sql_query(
+            "SELECT id, key, name, params, status, attempts, max_attempts, worker, lease_until,"
+            " enqueued_at, started_at, finished_at, run_id, error FROM jobs ORDER BY id",
+            self._db,
+        )
+
+    def stats(self, window_s: float = 300.0) -> dict:
+        """Progress counts, throughput (overall and over the last `window_s`) and ETA."""
+        jobs = self.jobs()
+        counts = {s: int((jobs["status"] == s).sum()) for s in STATUSES}
+        done = jobs[jobs["status"] == "done"]
+        now = time.time()
+        elapsed = (done["finished_at"].max() - jobs["started_at"].min()) if len(done) else float("nan")
+        overall = len(done) / elapsed * 60 if len(done) and elapsed > 0 else float("nan")
+        recent = int((done["finished_at"] > now - window_s).sum()) / window_s * 60
+        rate = recent or overall
+        left = counts["queued"] + counts["running"]
+        running = jobs[jobs["status"] == "running"]
+        per_worker = jobs.dropna(subset=["worker"]).assign(
+            done=lambda d: d["status"] == "done", running=lambda d: d["status"] == "running"
+        )
+        workers = per_worker.groupby("worker")[["done", "running"]].sum()
+        return {
+            "jobs": len(jobs),
+            **counts,
+            "jobs_per_min": overall,
+            "recent_jobs_per_min": recent,
+            "eta_min": 0.0 if not left else (left / rate if rate > 0 else float("nan")),
+            "stale_leases": int((running["lease_until"] < now).sum()),
+            "workers": workers,
+            "failures": jobs.loc[jobs["status"] == "failed", ["id", "name", "attempts", "error"]],
+        }
+
+
+def sweep_jobs(config_paths: list[Path], grid: bool = False) -> list[tuple[dict, dict]]:
+    """One job per config, or (with `grid`) one per point of its `search.params` grid."""
+    jobs = []
+    for path in config_paths:
+        obj = yaml.safe_load(Path(path).read_text())
+        params = (candidate_grid(_read_search(Path(path))) or [{}]) if grid else [{}]
+        jobs += [(obj, p) for p in params]
+    return jobs
+
+
+def run_sweep_job(job: dict) -> str | None:
+    """Run one queued backtest; results only (no report files), under a stable run id.
+
+    The stored run is a job's only output, so `report.results_dir: null` falls back to
+    the default results dataset.
+    """
+    cfg = apply_params(_parse_config(json.loads(job["config"])), json.loads(job["params"]))
+    results_dir = cfg.results_dir or str(RESULTS_DIR)
+    cfg = replace(cfg, report_format="none", report_name=job["name"], results_dir=results_dir)
+    return run_backtest_config(cfg, run_id=job["name"])
+
+
+def _keep_leased(path: Path, job_id: int, worker: str, lease_s: float, stop: threading.Event) -> None:
+    q = WorkQueue(path)
+    try:
+        while not stop.wait(lease_s / 3) and q.renew(job_id, worker, lease_s):
+            pass
+    finally:
+        q.close()
+
+
+def run_worker(
+    queue_path: Path = QUEUE_PATH,
+    worker: str | None = None,
+    lease_s: float = 300.0,
+    poll_s: float = 2.0,
+    max_jobs: int | None = None,
+    wait: bool = False,
+    runner: Callable[[dict], str | None] = run_sweep_job,
+) -> int:
+    """Drain the queue: claim, run (lease renewed in the background), record; repeat.
+
+    Exits when nothing is queued or running (or after `max_jobs`); with `wait` it keeps
+    polling for new jobs. Failed jobs are re-queued until their attempts are used up.
+    Returns the number of jobs this worker completed.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    q = WorkQueue(queue_path)
+    done = 0
+    try:
+        while max_jobs is None or done < max_jobs:
+            job = q.claim(worker, lease_s)
+            if job is None:
+                if not wait and q.pending() == 0:
+                    break
+                time.sleep(poll_s)
+                continue
+            stop = threading.Event()
+            hb = threading.Thread(
+                target=_keep_leased, args=(queue_path, job["id"], worker, lease_s, stop), daemon=True
+            )
+            hb.start()
+            try:
+                run_id = runner(job)
+            except Exception as e:  # noqa: BLE001 - recorded on the job and retried
+                q.fail(job["id"], worker, f"{type(e).__name__}: {e}")
+            else:
+                q.complete(job["id"], run_id)
+                done += 1
+            finally:
+                stop.set()
+                hb.join()
+    finally:
+        q.close()
+    return done
+
+
+def run_workers(queue_path: Path = QUEUE_PATH, processes: int = 1, **kw) -> None:
+    """Run `processes` local workers against the queue and wait for them to exit."""
+    if processes <= 1:
+        run_worker(queue_path, **kw)
+        return
+    procs = [mp.Process(target=run_worker, args=(queue_path,), kwargs=kw) for _ in range(processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+def sweep_status_md(queue_path: Path = QUEUE_PATH) -> str:
+    q = WorkQueue(queue_path)
+    try:
+        s = q.stats()
+    finally:
+        q.close()
+    eta = f"{s['eta_min']:.1f} min" if s["eta_min"] == s["eta_min"] else "n/a"
+    md = (
+        f"# Sweep: {Path(queue_path).as_posix()}\n\n"
+        f"- Jobs: **{s['jobs']}** — {s['queued']} queued, {s['running']} running, "
+        f"{s['done']} done, {s['failed']} failed ({s['stale_leases']} expired leases)\n"
+        f"- Throughput: **{s['jobs_per_min']:.2f} jobs/min** overall, "
+        f"{s['recent_jobs_per_min']:.2f} jobs/min over the last 5 min; ETA {eta}\n"
+    )
+    if len(s["workers"]):
+        md += f"\n## Workers\n{s['workers'].to_markdown()}\n"
+    if len(s["failures"]):
+        md += f"\n## Failed jobs\n{s['failures'].to_markdown(index=False)}\n"
+    return md
@@ -4,7 +4,14 @@ import argparse
 from pathlib import Path
 
 from tradeagentlab.backtest.runner import run_backtest
+from tradeagentlab.backtest.search import run_search
+from tradeagentlab.backtest.stream import run_stream_backtest
+from tradeagentlab.backtest.sweep import WorkQueue, run_workers, sweep_jobs, sweep_status_md
+from tradeagentlab.data.cache import PriceCache, parse_size, prewarm
+from tradeagentlab.paper.batch import run_paper_batch
+from tradeagentlab.paper.replay import run_replay
 from tradeagentlab.paper.run import run_paper
+from tradeagentlab.results.leaderboard import build_leaderboard
 
 
 def main() -> None:
@@ -14,12 +21,152 @@ def main() -> None:
     p_bt = sub.add_parser("backtest", help="Run a backtest from a YAML config")
     p_bt.add_argument("--config", required=True, type=str)
 
+    p_st = sub.add_parser(
+        "stream", help="Backtest over a local (intraday) Parquet price history in bounded memory"
+    )
+    p_st.add_argument("--config", required=True, type=str)
+    p_st.add_argument("--data", required=True, type=str, help="Parquet file or directory (time-ordered)")
+    p_st.add_argument("--chunk-rows", type=int, default=250_000)
+
+    p_se = sub.add_parser(
+        "search", help="Successive-halving search over `search.params`, walk-forward validated"
+    )
+    p_se.add_argument("--config", required=True, type=str)
+
     p_paper = sub.add_parser("paper", help="Run a paper-trading decision and write daily artifacts")
     p_paper.add_argument("--config", required=True, type=str)
 
+    p_pb = sub.add_parser(
+        "paper-batch", help="Run paper decisions for many configs, loading shared prices once"
+    )
+    p_pb.add_argument("--configs", required=True, nargs="+", type=str)
+    p_pb.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPUs)")
+
+    p_rp = sub.add_parser(
+        "replay", help="Replay cached bars through the paper pipeline; report latency/throughput/memory"
+    )
+    p_rp.add_argument("--config", required=True, type=str)
+    p_rp.add_argument("--start", type=str, default=None, help="First bar to replay (default: last --bars)")
+    p_rp.add_argument("--bars", type=int, default=100)
+    p_rp.add_argument("--rate", type=float, default=0.0, help="Feed rate in bars/second (0 = unthrottled)")
+    p_rp.add_argument("--write-artifacts", action="store_true", help="Write paper artifacts per bar")
+    p_rp.add_argument("--no-trace-memory", action="store_true", help="Skip tracemalloc (lower overhead)")
+
+    p_lb = sub.add_parser("leaderboard", help="Rank stored backtest runs (CAGR/Sharpe/MDD/beta/...)")
+    p_lb.add_argument("--results-dir", type=str, default=".cache/results")
+    p_lb.add_argument("--sort", type=str, default="sharpe")
+    p_lb.add_argument("--ascending", action="store_true")
+    p_lb.add_argument("--top", type=int, default=20)
+    p_lb.add_argument("--name", type=str, default=None, help="Only runs whose name contains this")
+    p_lb.add_argument(
+        "--filter", action="append", default=[], help="e.g. --filter 'sharpe>0.5' (repeatable)"
+    )
+    p_lb.add_argument("--csv", type=str, default=None, help="Also write the full table to CSV")
+
+    p_sw = sub.add_parser("sweep", help="Distributed backtest sweep through a shared SQLite job queue")
+    p_sw.add_argument("--queue", type=str, default=".cache/sweep.db", help="Queue database (shared path)")
+    sw = p_sw.add_subparsers(dest="sweep_cmd", required=True)
+    p_sq = sw.add_parser("enqueue", help="Add one job per config (or per `search.params` grid point)")
+    p_sq.add_argument("--configs", required=True, nargs="+", type=str)
+    p_sq.add_argument("--grid", action="store_true", help="Expand each config's `search.params` grid")
+    p_sq.add_argument("--max-attempts", type=int, default=3)
+    p_sk = sw.add_parser("worker", help="Run workers that drain the queue (results only, no reports)")
+    p_sk.add_argument("--processes", type=int, default=1, help="Local worker processes")
+    p_sk.add_argument("--lease", type=float, default=300.0, help="Lease seconds (renewed while running)")
+    p_sk.add_argument("--max-jobs", type=int, default=None, help="Per worker")
+    p_sk.add_argument("--wait", action="store_true", help="Keep polling for new jobs when idle")
+    sw.add_parser("status", help="Progress, throughput, workers and failures")
+
+    p_ca = sub.add_parser("cache", help="Inspect and maintain the market-data cache")
+    p_ca.add_argument("--cache-dir", type=str, default=".cache/marketdata")
+    ca = p_ca.add_subparsers(dest="cache_cmd", required=True)
+    ca.add_parser("stats", help="Size, hit rate and per-ticker coverage")
+    p_ev = ca.add_parser("evict", help="Delete least-recently used files down to a size budget")
+    p_ev.add_argument("--max-size", required=True, type=str, help="e.g. 500MB, 2GB")
+    ca.add_parser("compact", help="Merge overlapping files and drop files covered by another")
+    p_ve = ca.add_parser("verify", help="Check files against their sha256 checksums")
+    p_ve.add_argument("--fix", action="store_true", help="Drop bad files/entries, adopt untracked files")
+    p_pw = ca.add_parser("prewarm", help="Fetch the data the given configs will load")
+    p_pw.add_argument("--configs", required=True, nargs="+", type=str)
+
     args = parser.parse_args()
 
     if args.cmd == "backtest":
         run_backtest(Path(args.config))
+    elif args.cmd == "stream":
+        run_stream_backtest(Path(args.config), Path(args.data), chunk_rows=args.chunk_rows)
+    elif args.cmd == "search":
+        print(run_search(Path(args.config)).read_text())
     elif args.cmd == "paper":
         run_paper(Path(args.config))
+    elif args.cmd == "paper-batch":
+        run_paper_batch([Path(c) for c in args.configs], workers=args.workers)
+    elif args.cmd == "replay":
+        path = run_replay(
+            Path(args.config),
+            start=args.start,
+            bars=args.bars,
+            rate=args.rate,
+            write_artifacts=args.write_artifacts,
+            trace_memory=not args.no_trace_memory,
+        )
+        print(path.read_text())
+    elif args.cmd == "sweep":
+        _sweep(args)
+    elif args.cmd == "cache":
+        _cache(args)
+    elif args.cmd == "leaderboard":
+        board = build_leaderboard(
+            Path(args.results_dir),
+            filters=args.filter,
+            name_contains=args.name,
+            sort_by=args.sort,
+            ascending=args.ascending,
+            top=None if args.csv else args.top,
+        )
+        if args.csv:
+            board.to_csv(args.csv)
+            board = board.head(args.top)
+        print(board.to_markdown(floatfmt=".4f") if len(board) else "(no runs)")
+
+
+def _sweep(args: argparse.Namespace) -> None:
+    queue = Path(args.queue)
+    if args.sweep_cmd == "enqueue":
+        jobs = sweep_jobs([Path(c) for c in args.configs], grid=args.grid)
+        q = WorkQueue(queue)
+        added = q.enqueue(jobs, max_attempts=args.max_attempts)
+        q.close()
+        print(f"Enqueued {added} new jobs ({len(jobs) - added} already queued) in {queue}")
+    elif args.sweep_cmd == "worker":
+        run_workers(queue, args.processes, lease_s=args.lease, max_jobs=args.max_jobs, wait=args.wait)
+        print(sweep_status_md(queue))
+    elif args.sweep_cmd == "status":
+        print(sweep_status_md(queue))
+
+
+def _cache(args: argparse.Namespace) -> None:
+    if args.cache_cmd == "prewarm":
+        print(prewarm([Path(c) for c in args.configs]).to_markdown(index=False))
+        return
+    cache = PriceCache(Path(args.cache_dir))
+    if args.cache_cmd == "stats":
+        s = cache.stats()
+        print(
+            f"{s['files']} files, {s['bytes'] / 2**20:.1f} MB ({s['untracked']} untracked); "
+            f"hits {s['hits']} + {s['superset_hits']} superset, misses {s['misses']} "
+            f"(hit rate {s['hit_rate']:.1%})\n".replace("nan%", "n/a")
+        )
+        print(s["tickers"].to_markdown(index=False) if len(s["tickers"]) else "(empty cache)")
+    elif args.cache_cmd == "evict":
+        removed = cache.evict(parse_size(args.max_size))
+        print(f"Evicted {len(removed)} files" + "".join(f"\n- {n}" for n in removed))
+    elif args.cache_cmd == "compact":
+        out = cache.compact()
+        print(f"Merged into {len(out['merged'])} files, dropped {len(out['dropped'])} redundant files")
+    elif args.cache_cmd == "verify":
+        report = cache.verify(fix=args.fix)
+        bad = report[report["status"] != "ok"]
+        print(f"{len(report) - len(bad)}/{len(report)} files ok")
+        if len(bad):
+            print(bad.to_markdown(index=False))
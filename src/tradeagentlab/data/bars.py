@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+# Regular-session bars per US trading day for common yfinance-style intervals.
+_BARS_PER_DAY = {
+    "1d": 1.0,
+    "1h": 7.0,  # 09:30-16:00 → 7 hourly bars (last one partial)
+    "60m": 7.0,
+    "30m": 13.0,
+    "15m": 26.0,
+    "5m": 78.0,
+    "2m": 195.0,
+    "1m": 390.0,
+}
+
+
+@dataclass(frozen=True)
+class BarFrequency:
+    """Bar size → annualization and day-based window conversion.
+
+    Config windows (`lookback`, `vol_lookback`, research 20D stats) are expressed in
+    trading days; `bars()` turns them into bar counts for the active interval.
+    """
+
+    interval: str = "1d"
+    bars_per_day: float = 1.0
+    trading_days: int = 252
+
+    @property
+    def periods_per_year(self) -> float:
+        return self.bars_per_day * self.trading_days
+
+    @property
+    def ann_factor(self) -> float:
+        """Multiply a per-bar std by this to annualize it."""
+        return math.sqrt(self.periods_per_year)
+
+    @property
+    def is_daily(self) -> bool:
+        return self.bars_per_day == 1.0
+
+    @property
+    def unit(self) -> str:
+        """Short label for windows in report titles (`20D` daily, `140 bars` intraday)."""
+        return "D" if self.is_daily else " bars"
+
+    def bars(self, days: float) -> int:
+        return max(1, round(days * self.bars_per_day))
+
+
+DAILY = BarFrequency()
+
+
+def bar_frequency(interval: str = "1d", bars_per_day: float | None = None) -> BarFrequency:
+    """Build a `BarFrequency` from a yfinance-style interval (`1d`, `1h`, `5m`, ...)."""
+    if bars_per_day is None:
+        if interval not in _BARS_PER_DAY:
+            raise ValueError(f"Unknown interval {interval!r}; set bars_per_day explicitly")
+        bars_per_day = _BARS_PER_DAY[interval]
+    return BarFrequency(interval=interval, bars_per_day=float(bars_per_day))
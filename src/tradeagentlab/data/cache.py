@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+import warnings
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+try:  # POSIX advisory locks; on other platforms manifest updates are best-effort
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+MANIFEST = "manifest.json"
+_INTERVAL = re.compile(r"^\d+(m|h|d|wk|mo)$")
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def parse_size(text: str | int) -> int:
+    """`500MB`, `2G`, `10k` or a plain byte count → bytes."""
+    m = re.fullmatch(r"\s*([\d.]+)\s*([kmgt]?)i?b?\s*", str(text).lower())
+    if not m:
+        raise ValueError(f"Bad size {text!r} (e.g. 500MB, 2GB)")
+    return int(float(m.group(1)) * 1024 ** " kmgt".index(m.group(2) or " "))
+
+
+class PriceCache:
+    """Parquet price cache with a manifest of coverage, checksums and access stats.
+
+    One file per `load_prices` request (same names as before, so existing caches stay
+    valid). The manifest (`manifest.json`) records each file's tickers, requested
+    `[start, end)` range, interval, size, sha256 and last access, plus global hit/miss
+    counters. A request not cached under its own key is served from the smallest file
+    whose tickers and range cover it ("superset" hit), so overlapping requests don't
+    multiply downloads. Files hold the panel before forward-filling (`raw` in the
+    manifest): a subset keeps only the rows its own tickers traded, as a fresh download
+    would. Files written before that (or adopted) only serve their own key. Manifest
+    updates take an exclusive lock.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    # ---- keys & manifest -------------------------------------------------
+
+    @staticmethod
+    def key(tickers: list[str], start: str, end: str, interval: str = "1d") -> str:
+        key = f"{'-'.join(tickers)}_{start}_{end}".replace(":", "-")
+        if interval != "1d":
+            key = f"{key}_{interval}"
+        if len(key) > 120:
+            # Large (e.g. batch-union) universes would exceed filename limits.
+            key = f"{len(tickers)}tickers_{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+        return f"prices_{key}.parquet"
+
+    @contextmanager
+    def _manifest(self, write: bool = True):
+        """Yield the manifest dict under an exclusive lock; saved atomically on exit."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with (self.root / ".manifest.lock").open("a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                path = self.root / MANIFEST
+                m = json.loads(path.read_text()) if path.exists() else {}
+                m.setdefault("hits", 0)
+                m.setdefault("superset_hits", 0)
+                m.setdefault("misses", 0)
+                m.setdefault("files", {})
+                yield m
+                if write:
+                    tmp = self.root / f".{MANIFEST}.{os.getpid()}.tmp"
+                    tmp.write_text(json.dumps(m, indent=1, sort_keys=True))
+                    os.replace(tmp, path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def entries(self) -> dict[str, dict]:
+        with self._manifest(write=False) as m:
+            return m["files"]
+
+    def _entry(
+        self, name: str, tickers: list[str], start: str, end: str, interval: str | None, raw: bool = True
+    ) -> dict:
+        path = self.root / name
+        now = time.time()
+        return {
+            "tickers": list(tickers),
+            "start": start,
+            "end": end,
+            "interval": interval,
+            "bytes": path.stat().st_size,
+            "sha256": _sha256(path),
+            "created": now,
+            "last_access": now,
+            "hits": 0,
+            "raw": raw,
+        }
+
+    def _adopt(self, name: str) -> dict | None:
+        """Manifest entry for a file written before the manifest existed (None if unreadable)."""
+        try:
+            df = pd.read_parquet(self.root / name)
+        except Exception:  # noqa: BLE001 - corrupt files are reported by `verify`
+            return None
+        idx = pd.to_datetime(df.index)
+        parts = name.removeprefix("prices_").removesuffix(".parquet").split("_")
+        interval = parts.pop() if len(parts) == 4 and _INTERVAL.match(parts[-1]) else "1d"
+        if len(parts) == 3:
+            start, end = parts[1], parts[2]
+        else:
+            # Hashed key: the requested range is unknown, so use the data's own span
+            if len(idx) == 0:
+                return None
+            start, end = str(idx[0].date()), str((idx[-1] + pd.Timedelta(days=1)).date())
+            interval = "1d" if len(idx) < 2 or pd.Series(idx).diff().median() >= pd.Timedelta(hours=20) else None
+        return self._entry(name, [str(c) for c in df.columns], start, end, interval, raw=False)
+
+    # ---- read / write ----------------------------------------------------
+
+    def find(
+        self, tickers: list[str], start: str, end: str, interval: str = "1d", raw: bool = False
+    ) -> str | None:
+        """File that can serve the request: its own key, else the smallest covering raw file.
+
+        With `raw`, the own-key file must be raw too (callers that slice the panel).
+        """
+        name = self.key(tickers, start, end, interval)
+        entries = self.entries()
+        if (self.root / name).exists() and (not raw or entries.get(name, {}).get("raw", False)):
+            return name
+        want = set(tickers)
+        s, e = pd.Timestamp(start), pd.Timestamp(end)
+        covering = [
+            (f["bytes"], n)
+            for n, f in entries.items()
+            if f["interval"] == interval
+            and f.get("raw", False)
+            and want <= set(f["tickers"])
+            and pd.Timestamp(f["start"]) <= s
+            and pd.Timestamp(f["end"]) >= e
+            and (self.root / n).exists()
+        ]
+        return min(covering)[1] if covering else None
+
+    def get(
+        self, tickers: list[str], start: str, end: str, interval: str = "1d", raw: bool = False
+    ) -> pd.DataFrame | None:
+        """Cached prices for the request, or None (counted as a miss). See `find` for `raw`."""
+        name = self.find(tickers, start, end, interval, raw)
+        if name is None:
+            return self._miss()
+        exact = name == self.key(tickers, start, end, interval)
+        try:
+            df = pd.read_parquet(self.root / name, columns=None if exact else list(tickers))
+        except Exception as e:  # noqa: BLE001 - a damaged file is refetched, not fatal
+            warnings.warn(f"unreadable cache file {name} ({e}); run `tal cache verify --fix`", stacklevel=3)
+            return self._miss()
+        df.index = pd.to_datetime(df.index)
+        if not exact:
+            lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+            if df.index.tz is not None:
+                lo, hi = lo.tz_localize(df.index.tz), hi.tz_localize(df.index.tz)
+            df = df[(df.index >= lo) & (df.index < hi)].dropna(how="all")
+        with self._manifest() as m:
+            f = m["files"].get(name) or self._adopt(name)
+            if f is not None:
+                f["hits"] += 1
+                f["last_access"] = time.time()
+                m["files"][name] = f
+            m["hits" if exact else "superset_hits"] += 1
+        return df
+
+    def _miss(self) -> None:
+        with self._manifest() as m:
+            m["misses"] += 1
+
+    def put(self, tickers: list[str], start: str, end: str, interval: str, df: pd.DataFrame) -> Path:
+        """Store a downloaded panel; `df` must not be forward-filled (see the class docstring)."""
+        name = self.key(tickers, start, end, interval)
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / name
+        tmp = self.root / f".{name}.{os.getpid()}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        with self._manifest() as m:
+            m["files"][name] = self._entry(name, tickers, start, end, interval)
+        return path
+
+    def _remove(self, m: dict, name: str) -> int:
+        f = m["files"].pop(name, None)
+        path = self.root / name
+        size = path.stat().st_size if path.exists() else 0
+        path.unlink(missing_ok=True)
+        return size or (f or {}).get("bytes", 0)
+
+    # ---- maintenance -----------------------------------------------------
+
+    def stats(self) -> dict:
+        """Totals, hit rate and per-ticker coverage (DataFrame under `tickers`)."""
+        with self._manifest(write=False) as m:
+            files = m["files"]
+            rows = [
+                {"ticker": t, "file": n, "start": f["start"], "end": f["end"], "interval": f["interval"],
+                 "bytes": f["bytes"]}
+                for n, f in files.items()
+                for t in f["tickers"]
+            ]
+            served = m["hits"] + m["superset_hits"]
+            total = served + m["misses"]
+            untracked = [p.name for p in self.root.glob("prices_*.parquet") if p.name not in files]
+            out = {
+                "files": len(files),
+                "bytes": sum(f["bytes"] for f in files.values()),
+                "untracked": len(untracked),
+                "hits": m["hits"],
+                "superset_hits": m["superset_hits"],
+                "misses": m["misses"],
+                "hit_rate": served / total if total else float("nan"),
+            }
+        cov = pd.DataFrame(rows, columns=["ticker", "file", "start", "end", "interval", "bytes"])
+        out["tickers"] = (
+            cov.groupby(["ticker", "interval"], dropna=False)
+            .agg(files=("file", "nunique"), first=("start", "min"), last=("end", "max"), bytes=("bytes", "sum"))
+            .sort_values("bytes", ascending=False)
+            .reset_index()
+        )
+        return out
+
+    def evict(self, max_bytes: int) -> list[str]:
+        """Delete least-recently used files until the cache fits in `max_bytes`."""
+        removed = []
+        with self._manifest() as m:
+            total = sum(f["bytes"] for f in m["files"].values())
+            for name, _ in sorted(m["files"].items(), key=lambda kv: kv[1]["last_access"]):
+                if total <= max_bytes:
+                    break
+                total -= self._remove(m, name)
+                removed.append(name)
+        return removed
+
+    def compact(self) -> dict[str, list[str]]:
+        """Merge overlapping files of the same tickers, then drop files another one covers.
+
+        Same-ticker files whose ranges overlap or touch are rewritten as one file (newer
+        rows win). A file is redundant when another raw file of the same interval has all
+        its tickers and a range that contains it; requests for it are then served from
+        that file. Files with different ticker sets are never merged.
+        """
+        merged, dropped = [], []
+        with self._manifest() as m:
+            files = m["files"]
+            # 1) merge overlapping ranges of identical ticker sets
+            groups: dict[tuple, list[str]] = {}
+            for n, f in files.items():
+                key = (f["interval"], tuple(sorted(f["tickers"])), f.get("raw", False))
+                groups.setdefault(key, []).append(n)
+            for (interval, _, raw), names in groups.items():
+                names.sort(key=lambda n: (files[n]["start"], files[n]["end"]))
+                run = [names[0]]
+                for n in [*names[1:], None]:
+                    if n is not None and pd.Timestamp(files[n]["start"]) <= max(
+                        pd.Timestamp(files[r]["end"]) for r in run
+                    ):
+                        run.append(n)
+                        continue
+                    if len(run) > 1:
+                        merged.append(self._merge(m, run, interval, raw))
+                    run = [n]
+            # 2) drop files covered by another (largest files are kept first)
+            order = sorted(
+                files,
+                key=lambda n: (-len(files[n]["tickers"]), files[n]["start"], files[n]["end"], -files[n]["created"]),
+            )
+            kept: list[str] = []
+            for n in order:
+                f = files[n]
+                cover = next(
+                    (
+                        k
+                        for k in kept
+                        if files[k]["interval"] == f["interval"]
+                        and files[k].get("raw", False)
+                        and set(f["tickers"]) <= set(files[k]["tickers"])
+                        and pd.Timestamp(files[k]["start"]) <= pd.Timestamp(f["start"])
+                        and pd.Timestamp(files[k]["end"]) >= pd.Timestamp(f["end"])
+                    ),
+                    None,
+                )
+                if cover is None:
+                    kept.append(n)
+                else:
+                    self._remove(m, n)
+                    dropped.append(n)
+        return {"merged": merged, "dropped": dropped}
+
+    def _merge(self, m: dict, names: list[str], interval: str | None, raw: bool) -> str:
+        files = m["files"]
+        tickers = files[names[0]]["tickers"]
+        by_age = sorted(names, key=lambda n: files[n]["created"])
+        df = pd.concat([pd.read_parquet(self.root / n)[tickers] for n in by_age])
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        start = min((files[n]["start"] for n in names), key=pd.Timestamp)
+        end = max((files[n]["end"] for n in names), key=pd.Timestamp)
+        name = self.key(tickers, start, end, interval or "1d")
+        tmp = self.root / f".{name}.{os.getpid()}.tmp"
+        df.to_parquet(tmp)
+        hits = sum(files[n]["hits"] for n in names)
+        last = max(files[n]["last_access"] for n in names)
+        for n in names:
+            if n != name:
+                self._remove(m, n)
+        os.replace(tmp, self.root / name)
+        entry = self._entry(name, tickers, start, end, interval, raw)
+        files[name] = {**entry, "hits": hits, "last_access": last}
+        return name
+
+    def verify(self, fix: bool = False) -> pd.DataFrame:
+        """Check every file against its manifest checksum; `fix` repairs the manifest.
+
+        Statuses: `ok`, `missing` (in the manifest, not on disk), `checksum` (contents
+        changed), `unreadable`, `untracked` (on disk, not in the manifest). With `fix`,
+        missing entries are dropped, bad files deleted and readable untracked files
+        adopted.
+        """
+        rows = []
+        with self._manifest(write=fix) as m:
+            files = m["files"]
+            for name in sorted(files):
+                path = self.root / name
+                if not path.exists():
+                    status = "missing"
+                elif _sha256(path) != files[name]["sha256"]:
+                    status = "checksum"
+                else:
+                    status = "ok"
+                rows.append({"file": name, "status": status})
+                if fix and status != "ok":
+                    self._remove(m, name)
+            for path in sorted(self.root.glob("prices_*.parquet")):
+                if path.name in files or any(r["file"] == path.name for r in rows):
+                    continue
+                entry = self._adopt(path.name)
+                rows.append({"file": path.name, "status": "untracked" if entry else "unreadable"})
+                if fix:
+                    if entry is not None:
+                        files[path.name] = entry
+                    else:
+                        path.unlink()
+        return pd.DataFrame(rows, columns=["file", "status"])
+
+
+def prewarm(config_paths: list[Path]) -> pd.DataFrame:
+    """Fetch everything the configs' runs will load, so scheduled runs start warm.
+
+    Per bar interval, one panel covers the union of the universes, SPY and attribution
+    tickers over the union date range (open-ended configs run to today, as `tal paper`
+    does); per-config requests are then served from it. Historical stress windows are
+    fetched for the same union. Warms the default cache (`.cache/marketdata`).
+    """
+    from tradeagentlab.data import yf
+    from tradeagentlab.paper.run import _paper_end, _read_config
+    from tradeagentlab.report.attribution import read_attribution_config
+    from tradeagentlab.risk.stress import load_historical_scenarios
+
+    cache = PriceCache(yf.CACHE_DIR)
+    plans: dict[str, dict] = {}
+    for path in config_paths:
+        cfg = _read_config(Path(path))
+        r = yaml.safe_load(Path(path).read_text()).get("report") or {}
+        ac = read_attribution_config(r.get("attribution"))
+        extra = [*ac.size, *ac.sectors] if ac.enabled else []
+        p = plans.setdefault(cfg.interval, {"tickers": {}, "start": [], "end": [], "windows": {}})
+        p["tickers"].update(dict.fromkeys([*cfg.tickers, "SPY", *extra]))
+        p["start"].append(pd.Timestamp(cfg.start))
+        p["end"].append(pd.Timestamp(_paper_end(cfg)))
+        if cfg.stress.enabled:
+            p["windows"].update(dict.fromkeys(cfg.stress.historical))
+
+    rows = []
+    for interval, p in plans.items():
+        tickers = list(p["tickers"])
+        start, end = str(min(p["start"]).date()), str(max(p["end"]).date())
+        status = "cached" if cache.find(tickers, start, end, interval) else "fetched"
+        px = yf.load_prices(tickers, start, end, interval=interval)
+        rows.append({"interval": interval, "tickers": len(tickers), "start": start, "end": end,
+                     "rows": len(px), "status": status})
+        if p["windows"]:
+            scen = load_historical_scenarios(tickers, list(p["windows"]))
+            rows.append({"interval": "stress", "tickers": len(tickers), "start": "", "end": "",
+                         "rows": sum(len(s.returns) for s in scen), "status": f"{len(scen)} windows"})
+    return pd.DataFrame(rows)
@@ -5,24 +5,32 @@ from pathlib import Path
 import pandas as pd
 import yfinance as yf
 
+from tradeagentlab.data.cache import PriceCache
+
 CACHE_DIR = Path(".cache/marketdata")
 
 
-def load_prices(tickers: list[str], start: str, end: str) -> pd.DataFrame:
-    """Load adjusted close prices from Yahoo Finance, cached as Parquet."""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    key = f"{'-'.join(tickers)}_{start}_{end}".replace(":", "-")
-    path = CACHE_DIR / f"prices_{key}.parquet"
+def load_prices(
+    tickers: list[str], start: str, end: str, interval: str = "1d", ffill: bool = True
+) -> pd.DataFrame:
+    """Load adjusted close prices from Yahoo Finance, cached as Parquet.
 
-    if path.exists():
-        df = pd.read_parquet(path)
-        df.index = pd.to_datetime(df.index)
-        return df
+    `interval` is passed through to yfinance (`1d`, `1h`, `5m`, ...); intraday bars are
+    cached under their own keys. Requests covered by an existing (wider) cache file are
+    served from it; see `PriceCache`. Rows are the bars on which any requested ticker
+    traded; gaps are forward-filled unless `ffill=False` (callers that slice the panel
+    into smaller universes fill after slicing).
+    """
+    cache = PriceCache(CACHE_DIR)
+    cached = cache.get(tickers, start, end, interval, raw=not ffill)
+    if cached is not None:
+        return cached.ffill() if ffill else cached
 
     data = yf.download(
         tickers=tickers,
         start=start,
         end=end,
+        interval=interval,
         auto_adjust=True,
         progress=False,
         group_by="column",
@@ -35,6 +43,6 @@ def load_prices(tickers: list[str], start: str, end: str) -> pd.DataFrame:
     else:
         px = data[["Close"]].rename(columns={"Close": tickers[0]})
 
-    px = px.dropna(how="all").ffill()
-    px.to_parquet(path)
-    return px
+    px = px.dropna(how="all")
+    cache.put(tickers, start, end, interval, px)
+    return px.ffill() if ffill else px
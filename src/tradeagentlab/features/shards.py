@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import atexit
+import itertools
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+EXECUTORS = ("thread", "process")
+
+
+@dataclass
+class ComputeConfig:
+    shards: int = 1  # column shards of the ticker universe (1 = unsharded)
+    executor: str = "thread"  # thread (numpy releases the GIL) | process (shared memory)
+    workers: int | None = None  # pool size (default: one per shard)
+
+    def __post_init__(self) -> None:
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"Unknown compute.executor {self.executor!r} ({'|'.join(EXECUTORS)})")
+
+    @property
+    def sharded(self) -> bool:
+        return self.shards > 1
+
+
+def column_shards(n: int, shards: int) -> list[slice]:
+    """Contiguous, near-equal column slices (never more slices than columns)."""
+    edges = np.linspace(0, n, min(max(1, shards), max(1, n)) + 1).round().astype(int)
+    return [slice(a, b) for a, b in itertools.pairwise(edges)]
+
+
+_POOLS: dict[tuple[str, int], Executor] = {}
+
+
+def _pool(kind: str, workers: int) -> Executor:
+    """Long-lived pools, so per-bar callers (paper replay) don't pay process start-up."""
+    key = (kind, workers)
+    if key not in _POOLS:
+        _POOLS[key] = (ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor)(workers)
+    return _POOLS[key]
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    for pool in _POOLS.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _POOLS.clear()
+
+
+def _run_attached(kernel: Callable, specs: dict, cols: slice, kw: dict):
+    """Process-pool task: attach the shared buffers, run `kernel` on one column shard."""
+    handles = {k: shared_memory.SharedMemory(name=name) for k, (name, _, _) in specs.items()}
+    try:
+        views = {
+            k: np.ndarray(shape, dtype=dtype, buffer=handles[k].buf)[..., cols]
+            for k, (_, shape, dtype) in specs.items()
+        }
+        out = kernel(views, **kw)
+        del views  # release buffer exports before closing the mappings
+        return out
+    finally:
+        for h in handles.values():
+            h.close()
+
+
+def map_shards(
+    kernel: Callable[..., object],
+    arrays: dict[str, np.ndarray],
+    outputs: dict[str, tuple[tuple[int, ...], type]],
+    compute: ComputeConfig,
+    **kw,
+) -> tuple[dict[str, np.ndarray], list]:
+    """Run `kernel(views, **kw)` on every column shard of `arrays` (last axis = tickers).
+
+    `views` holds the shard's slices of the inputs and of freshly allocated `outputs`
+    (name → (shape, dtype)), which the kernel fills in place. Threads share the arrays
+    directly; processes attach to `SharedMemory` copies, so no shard data is pickled.
+    Returns the filled outputs and the kernels' return values (partial cross-sectional
+    reductions for the caller to merge), in shard order.
+
+    Shards run concurrently; how much that shortens wall time depends on the cores
+    available (and, for threads, on numpy releasing the GIL inside the kernel).
+    """
+    n = next(iter(arrays.values())).shape[-1]
+    slices = column_shards(n, compute.shards)
+    pool = _pool(compute.executor, compute.workers or len(slices))
+
+    if compute.executor == "thread":
+        out = {k: np.empty(shape, dtype=dtype) for k, (shape, dtype) in outputs.items()}
+        bufs = {**arrays, **out}
+        futs = [pool.submit(kernel, {k: a[..., s] for k, a in bufs.items()}, **kw) for s in slices]
+        return out, [f.result() for f in futs]
+
+    shms: list[shared_memory.SharedMemory] = []
+    specs: dict[str, tuple[str, tuple[int, ...], str]] = {}
+    try:
+        for k, (shape, dtype) in {
+            **{k: (a.shape, a.dtype) for k, a in arrays.items()},
+            **outputs,
+        }.items():
+            dt = np.dtype(dtype)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dt.itemsize))
+            shms.append(shm)
+            specs[k] = (shm.name, tuple(shape), dt.str)
+            if k in arrays:
+                np.ndarray(shape, dtype=dt, buffer=shm.buf)[...] = arrays[k]
+        futs = [pool.submit(_run_attached, kernel, specs, s, kw) for s in slices]
+        partials = [f.result() for f in futs]
+        out = {
+            k: np.ndarray(specs[k][1], dtype=specs[k][2], buffer=shm.buf).copy()
+            for k, shm in zip(specs, shms)
+            if k in outputs
+        }
+        return out, partials
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+# ---- per-ticker kernels (top-level so process pools can pickle them) ----------
+
+
+def momentum_kernel(v: dict[str, np.ndarray], lookback: int) -> np.ndarray:
+    """Signal = lookback return > 0; returns the shard's per-row signal counts."""
+    px, sig = v["prices"], v["signal"]
+    sig[:lookback] = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sig[lookback:] = (px[lookback:] / px[:-lookback] - 1.0) > 0
+    return sig.sum(axis=1)
+
+
+def count_kernel(v: dict[str, np.ndarray]) -> np.ndarray:
+    return v["signal"].sum(axis=1, dtype=float)
+
+
+def clip_kernel(v: dict[str, np.ndarray], counts: np.ndarray, cap: float) -> np.ndarray:
+    """w = min(signal / count, cap); returns the shard's per-row weight sums."""
+    w = v["weights"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(v["signal"], counts[:, None], out=w)
+    np.nan_to_num(w, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    np.minimum(w, cap, out=w)
+    return w.sum(axis=1)
+
+
+def scale_kernel(v: dict[str, np.ndarray], totals: np.ndarray) -> None:
+    """Renormalize: scaled = weights / row total."""
+    w = v["scaled"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(v["weights"], totals[:, None], out=w)
+    np.nan_to_num(w, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def returns_kernel(v: dict[str, np.ndarray]) -> np.ndarray:
+    """1-bar returns into `rets`; returns the shard's rows with any NaN."""
+    px, r = v["prices"], v["rets"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(px[1:], px[:-1], out=r)
+    r -= 1.0
+    return np.isnan(r).any(axis=1)
+
+
+def ticker_stats_kernel(
+    v: dict[str, np.ndarray], rows: np.ndarray, n: int, ann: float
+) -> tuple[int, float, float]:
+    """Last-bar `n`-bar return and vol (over the last `n` complete rows of `rets`).
+
+    Returns (count, mean, M2) of the shard's returns for the dispersion merge.
+    """
+    px, r = v["prices"], v["rets"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v["ret_n"][:] = px[-1] / px[-1 - n] - 1.0 if len(px) > n else np.nan
+    v["vol_n"][:] = r[rows[-n:]].std(axis=0) * ann if len(rows) >= n else np.nan
+    x = v["ret_n"]
+    mean = float(x.mean()) if len(x) else 0.0
+    return len(x), mean, float(((x - mean) ** 2).sum())
+
+
+def merge_moments(parts: list[tuple[int, float, float]]) -> tuple[float, float]:
+    """Universe mean and population std from per-shard (count, mean, M2) partials."""
+    n, mean, m2 = 0, 0.0, 0.0
+    for nb, mb, m2b in parts:
+        if nb == 0:
+            continue
+        d = mb - mean
+        tot = n + nb
+        mean += d * nb / tot
+        m2 += m2b + d * d * n * nb / tot
+        n = tot
+    return (mean, float(np.sqrt(m2 / n))) if n else (0.0, 0.0)
@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
+from tradeagentlab.features.shards import ComputeConfig, map_shards, momentum_kernel
 
-def compute_momentum_signal(prices: pd.DataFrame, lookback: int = 20) -> pd.DataFrame:
+
+def compute_momentum_signal(
+    prices: pd.DataFrame, lookback: int = 20, compute: ComputeConfig | None = None
+) -> pd.DataFrame:
     """Binary long signal based on lookback returns (toy baseline).
 
-    For each day: long tickers with positive lookback return.
+    For each day: long tickers with positive lookback return. With `compute.shards > 1`
+    the tickers are split into column shards computed in parallel.
     """
+    if compute is not None and compute.sharded:
+        out, _ = map_shards(
+            momentum_kernel,
+            {"prices": prices.to_numpy(dtype=float)},
+            {"signal": (prices.shape, np.int64)},
+            compute,
+            lookback=lookback,
+        )
+        return pd.DataFrame(out["signal"], index=prices.index, columns=prices.columns)
     mom = prices.pct_change(lookback)
     sig = (mom > 0).astype(int)
     return sig
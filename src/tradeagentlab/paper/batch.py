@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from tradeagentlab.data.yf import load_prices
+from tradeagentlab.paper.run import (
+    PaperConfig,
+    _paper_end,
+    _read_config,
+    compute_paper_decision,
+    write_paper_artifacts,
+)
+from tradeagentlab.risk.stress import Scenario, load_historical_scenarios
+
+# Union price panel (not forward-filled) and stress windows, installed once per worker
+# process by `_init_worker`.
+_PANEL: pd.DataFrame | None = None
+_SCENARIOS: list[Scenario] = []
+
+
+def _init_worker(panel: pd.DataFrame, scenarios: list[Scenario] | None = None) -> None:
+    global _PANEL, _SCENARIOS
+    _PANEL = panel
+    _SCENARIOS = scenarios or []
+
+
+def _account_prices(panel: pd.DataFrame, cfg: PaperConfig) -> pd.DataFrame:
+    """Slice one account's universe/date range out of the unfilled union panel (yfinance
+    `end` is exclusive). Only bars one of its own tickers traded are kept, then gaps are
+    forward-filled, so the account sees the same prices as a single `tal paper` run."""
+    idx = panel.index
+    mask = (idx >= pd.Timestamp(cfg.start)) & (idx < pd.Timestamp(_paper_end(cfg)))
+    return panel.loc[mask, cfg.tickers].dropna(how="all").ffill()
+
+
+def _decide(cfg: PaperConfig) -> dict:
+    assert _PANEL is not None, "worker not initialised"
+    return compute_paper_decision(cfg, _account_prices(_PANEL, cfg), _SCENARIOS)
+
+
+def _account_names(config_paths: list[Path], cfgs: list[PaperConfig]) -> list[str]:
+    # `paper.account` if configured, else the config file stem.
+    names = [c.account or p.stem for p, c in zip(config_paths, cfgs)]
+    dupes = sorted({n for n in names if names.count(n) > 1})
+    if dupes:
+        raise ValueError(f"Duplicate paper accounts in batch: {dupes} (set `paper.account` per config)")
+    return names
+
+
+def run_paper_batch(config_paths: list[Path], workers: int | None = None) -> list[Path]:
+    """Run `tal paper` for many configs at once.
+
+    - Prices for the union of all universes are loaded (and cached) once, as are the
+      historical stress windows.
+    - Per-account decisions are computed in a process pool; each worker receives the
+      union panel once via the pool initializer rather than once per task.
+    - Artifacts are written by the parent process under one account name each, so
+      accounts never race on `latest_*.json`; decision logs use locked appends.
+
+    Returns the daily markdown path per config, in input order.
+    """
+    cfgs = [_read_config(p) for p in config_paths]
+    if not cfgs:
+        return []
+    accounts = _account_names(config_paths, cfgs)
+
+    tickers = list(dict.fromkeys(t for c in cfgs for t in c.tickers))
+    start = min(pd.Timestamp(c.start) for c in cfgs)
+    end = max(pd.Timestamp(_paper_end(c)) for c in cfgs)
+    intervals = {c.interval for c in cfgs}
+    if len(intervals) > 1:
+        raise ValueError(f"Batch configs must share one bar interval, got {sorted(intervals)}")
+    panel = load_prices(tickers, str(start.date()), str(end.date()), interval=intervals.pop(), ffill=False)
+    windows = list(dict.fromkeys(w for c in cfgs if c.stress.enabled for w in c.stress.historical))
+    scenarios = load_historical_scenarios(tickers, windows) if windows else []
+
+    if workers is None:
+        workers = min(len(cfgs), os.cpu_count() or 1)
+
+    if workers <= 1:
+        _init_worker(panel, scenarios)
+        outs = [_decide(c) for c in cfgs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(panel, scenarios)) as ex:
+            outs = list(ex.map(_decide, cfgs))
+
+    today = date.today().isoformat()
+    return [
+        write_paper_artifacts(out, Path(cfg.out_dir), account=account, today=today, write_latest=False)
+        for cfg, account, out in zip(cfgs, accounts, outs)
+    ]
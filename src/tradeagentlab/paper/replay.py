@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.data.yf import load_prices
+from tradeagentlab.paper.run import (
+    PaperConfig,
+    _paper_end,
+    _read_config,
+    compute_paper_decision,
+    load_stress_scenarios,
+    write_paper_artifacts,
+)
+from tradeagentlab.portfolio.rebalance import rebalance_mask
+from tradeagentlab.risk.stress import Scenario
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def replay_paper(
+    cfg: PaperConfig,
+    prices: pd.DataFrame,
+    start: str | None = None,
+    bars: int | None = 100,
+    rate: float = 0.0,
+    history_days: float = 252,
+    scenarios: list[Scenario] | None = None,
+    out_dir: Path | None = None,
+    account: str = "replay",
+    trace_memory: bool = True,
+) -> dict:
+    """Feed `prices` bar by bar through research → decision → risk gate → execution.
+
+    - Bars from `start` (else the last `bars` bars) arrive one at a time; each decision
+      sees the trailing `history_days` of bars, as a live run would.
+    - `rate` paces arrivals in bars per second (0 = as fast as possible). Latency is
+      measured from a bar's scheduled arrival to its finished plan, so a pipeline that
+      falls behind the feed shows up as queueing delay and in `late_bars`.
+    - With `out_dir` the paper artifacts are written per bar (dated by the bar).
+    - `trace_memory` tracks Python heap growth with `tracemalloc` (slows the pipeline).
+    - With a weekly/monthly `portfolio.rebalance.calendar` the pipeline only runs on
+      rebalance bars; the bars in between carry the standing plan (`rebalanced` False).
+
+    Returns per-bar records and a summary dict.
+    """
+    idx = prices.index
+    first = int(idx.searchsorted(pd.Timestamp(start))) if start else max(0, len(idx) - (bars or len(idx)))
+    if first >= len(idx):
+        raise ValueError(f"No bars to replay after {start}")
+    hist = cfg.freq.bars(history_days)
+    interval = 1.0 / rate if rate > 0 else 0.0
+    schedule = rebalance_mask(idx, cfg.rebalance.calendar)
+
+    if trace_memory:
+        tracemalloc.start()
+    rows = []
+    mem0 = None
+    out = None
+    t0 = time.perf_counter()
+    try:
+        for k, i in enumerate(range(first, len(idx))):
+            due = t0 + k * interval
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+            began = time.perf_counter()
+            arrival = due if interval else began
+
+            rebalanced = out is None or bool(schedule[i])
+            if rebalanced:
+                out = compute_paper_decision(cfg, prices.iloc[max(0, i - hist + 1) : i + 1], scenarios)
+            if out_dir is not None:
+                write_paper_artifacts(
+                    out, out_dir, account=account, today=f"{idx[i]:%Y-%m-%d}", write_latest=False
+                )
+            done = time.perf_counter()
+
+            ex = out["execution"]
+            row = {
+                "timestamp": idx[i],
+                "latency_ms": (done - arrival) * 1e3,
+                "compute_ms": (done - began) * 1e3,
+                "gross_exposure": ex.gross_exposure,
+                "gate_reason": ex.gate_reason,
+                "rebalanced": rebalanced,
+            }
+            if trace_memory:
+                cur, _ = tracemalloc.get_traced_memory()
+                row["traced_mb"] = cur / 2**20
+                # Baseline after the first bar so one-off imports/caches don't count as growth
+                mem0 = row["traced_mb"] if mem0 is None else mem0
+            rows.append(row)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] / 2**20 if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    per_bar = pd.DataFrame(rows).set_index("timestamp")
+    lat = per_bar["latency_ms"].to_numpy()
+    # A bar is late when it was still being processed after the next one was due
+    late = int((lat > interval * 1e3).sum()) if interval else 0
+    summary = {
+        "bars": len(per_bar),
+        "start": per_bar.index[0],
+        "end": per_bar.index[-1],
+        "elapsed_s": elapsed,
+        "bars_per_sec": len(per_bar) / elapsed if elapsed > 0 else float("inf"),
+        "rate": rate,
+        "late_bars": late,
+        "rebalance_bars": int(per_bar["rebalanced"].sum()),
+        **{f"latency_p{q}_ms": float(np.percentile(lat, q)) for q in LATENCY_PERCENTILES},
+        "latency_max_ms": float(lat.max()),
+    }
+    if trace_memory:
+        summary.update(
+            mem_start_mb=mem0,
+            mem_end_mb=float(per_bar["traced_mb"].iloc[-1]),
+            mem_growth_mb=float(per_bar["traced_mb"].iloc[-1] - mem0),
+            mem_peak_mb=peak,
+        )
+    return {"bars": per_bar, "summary": summary}
+
+
+def run_replay(
+    config_path: Path,
+    start: str | None = None,
+    bars: int | None = 100,
+    rate: float = 0.0,
+    write_artifacts: bool = False,
+    trace_memory: bool = True,
+) -> Path:
+    """`tal replay`: replay cached bars through the paper pipeline and report latency.
+
+    Writes `<out_dir>/replay/<account>_replay.csv` (per bar) and `<account>_replay.md`.
+    Per-bar paper artifacts (with `write_artifacts`) go under `<out_dir>/replay/` so they
+    never mix with the live `daily/` folder.
+    """
+    cfg = _read_config(config_path)
+    account = cfg.account or "paper"
+    prices = load_prices(cfg.tickers, cfg.start, _paper_end(cfg), interval=cfg.interval)
+    out_dir = Path(cfg.out_dir) / "replay"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    out = replay_paper(
+        cfg,
+        prices,
+        start=start,
+        bars=bars,
+        rate=rate,
+        scenarios=load_stress_scenarios(cfg),
+        out_dir=out_dir if write_artifacts else None,
+        account=account,
+        trace_memory=trace_memory,
+    )
+    s = out["summary"]
+    csv_path = out_dir / f"{account}_replay.csv"
+    out["bars"].to_csv(csv_path)
+
+    mem_md = (
+        f"- Traced heap: {s['mem_start_mb']:.1f} MB → {s['mem_end_mb']:.1f} MB "
+        f"(growth **{s['mem_growth_mb']:+.2f} MB**, peak {s['mem_peak_mb']:.1f} MB)\n"
+        if trace_memory
+        else "- Memory tracing off\n"
+    )
+    lat = pd.DataFrame(
+        {"latency_ms": [s[f"latency_p{q}_ms"] for q in LATENCY_PERCENTILES] + [s["latency_max_ms"]]},
+        index=[f"p{q}" for q in LATENCY_PERCENTILES] + ["max"],
+    )
+    calendar_md = ""
+    pipeline_note = "Each bar runs the full paper pipeline on the trailing history, as a live run would."
+    if cfg.rebalance.calendar != "daily":
+        calendar_md = f"; {s['rebalance_bars']:,} {cfg.rebalance.calendar} rebalance bars"
+        pipeline_note = (
+            "Each rebalance bar runs the full paper pipeline on the trailing history, as a live run "
+            "would; the bars in between carry the standing plan."
+        )
+    md = f"""# TradeAgentLab Replay: {account}
+
+- Bars replayed: **{s["bars"]:,}** ({s["start"]} → {s["end"]}, {cfg.interval} bars{calendar_md})
+- Feed rate: {f"{rate:g} bars/s" if rate > 0 else "unthrottled"}; late bars: **{s["late_bars"]}**
+- Throughput: **{s["bars_per_sec"]:.1f} bars/s** ({s["elapsed_s"]:.2f}s total)
+{mem_md}- Per-bar log: `{csv_path.as_posix()}`
+
+## End-to-end latency (bar arrival → execution plan)
+{lat.to_markdown(floatfmt=".2f")}
+
+## Notes
+- {pipeline_note}
+"""
+    path = out_dir / f"{account}_replay.md"
+    path.write_text(md)
+    return path
@@ -1,17 +1,40 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
 from pathlib import Path
 
 import pandas as pd
 import yaml
 
-from tradeagentlab.agents.orchestrator import run_agent_decision
+from tradeagentlab.agents.llm import LLMConfig
+from tradeagentlab.agents.orchestrator import build_agent_decision, write_agent_artifacts
+from tradeagentlab.data.bars import BarFrequency, bar_frequency
 from tradeagentlab.data.yf import load_prices
+from tradeagentlab.features.shards import ComputeConfig
 from tradeagentlab.features.tech import compute_momentum_signal
-from tradeagentlab.risk.engine import RiskConfig, apply_risk
+from tradeagentlab.portfolio.construction import build_weights
+from tradeagentlab.portfolio.optimizer import OptimizerConfig
+from tradeagentlab.portfolio.rebalance import RebalanceConfig, rebalance_mask
+from tradeagentlab.risk.engine import (
+    RiskConfig,
+    apply_risk,
+    apply_risk_rebalanced,
+    read_risk_config,
+)
+from tradeagentlab.risk.stress import (
+    Scenario,
+    StressConfig,
+    load_historical_scenarios,
+    stress_plan,
+    stress_table,
+)
+
+try:  # POSIX advisory locks; on other platforms appends are best-effort
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
 
 
 @dataclass
@@ -25,6 +48,19 @@ class PaperConfig:
     risk: RiskConfig
     agent: dict
     out_dir: str
+    account: str | None = None
+    interval: str = "1d"
+    bars_per_day: float | None = None
+    construction: str = "equal"  # equal|min_variance|risk_parity|mean_variance
+    optimizer: OptimizerConfig = field(default_factory=OptimizerConfig)
+    rebalance: RebalanceConfig = field(default_factory=RebalanceConfig)
+    stress: StressConfig = field(default_factory=StressConfig)
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    compute: ComputeConfig = field(default_factory=ComputeConfig)
+
+    @property
+    def freq(self) -> BarFrequency:
+        return bar_frequency(self.interval, self.bars_per_day)
 
 
 def _read_config(path: Path) -> PaperConfig:
@@ -35,14 +71,9 @@ def _read_config(path: Path) -> PaperConfig:
     rk = obj.get("risk", {})
     ag = obj.get("agent", {})
     r = obj.get("report", {})
+    pp = obj.get("paper", {}) or {}
 
-    risk = RiskConfig(
-        target_vol_ann=float(rk.get("target_vol_ann", 0.12)),
-        vol_lookback=int(rk.get("vol_lookback", 20)),
-        max_leverage=float(rk.get("max_leverage", 1.0)),
-        dd_kill=float(rk.get("dd_kill", 0.35)),
-        dd_recover=(float(rk["dd_recover"]) if "dd_recover" in rk and rk["dd_recover"] is not None else None),
-    )
+    risk = read_risk_config(rk, ag, dd_kill=0.35)
 
     return PaperConfig(
         tickers=list(u["tickers"]),
@@ -52,71 +83,185 @@ def _read_config(path: Path) -> PaperConfig:
         max_position_weight=float(p["max_position_weight"]),
         transaction_cost_bps=float(p.get("transaction_cost_bps", 0.0)),
         risk=risk,
-        agent=dict(ag),
+        agent={k: v for k, v in ag.items() if k != "llm"},
         out_dir=str(r.get("out_dir", "docs")),
+        account=(str(pp["account"]) if pp.get("account") else None),
+        interval=str(u.get("interval", "1d")),
+        bars_per_day=(float(u["bars_per_day"]) if u.get("bars_per_day") else None),
+        construction=str(p.get("construction", "equal")),
+        optimizer=OptimizerConfig(**(p.get("optimizer") or {})),
+        # `portfolio.rebalance.calendar` holds the standing plan between rebalance bars
+        rebalance=RebalanceConfig(**(p.get("rebalance") or {})),
+        # `risk.stress: null` (or `enabled: false`) skips the stress scenarios
+        stress=StressConfig(**(rk.get("stress") or {}) if rk.get("stress", True) else {"enabled": False}),
+        # `agent.llm` turns on LLM commentary in the research note (needs an endpoint)
+        llm=LLMConfig(**{"enabled": True, **(ag.get("llm") or {})}) if ag.get("llm") else LLMConfig(),
+        # `compute.shards > 1` splits per-ticker features/research into parallel column shards
+        compute=ComputeConfig(**(obj.get("compute") or {})),
     )
 
 
-def run_paper(config_path: Path) -> Path:
-    """Generate today's paper-trading decision artifacts + a daily markdown report."""
-    cfg = _read_config(config_path)
-    out_dir = Path(cfg.out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+DECISION_COLUMNS = ["date", "as_of", "regime", "gross_exposure", "cash_weight", "gate_reason"]
+
 
+def _paper_end(cfg: PaperConfig) -> str:
     # Use config end if provided, otherwise run up to today.
-    end = cfg.end or str(pd.Timestamp.today().date())
+    return cfg.end or str(pd.Timestamp.today().date())
+
+
+def load_stress_scenarios(cfg: PaperConfig, tickers: list[str] | None = None) -> list[Scenario]:
+    """Historical stress windows for `tickers` (default: the config universe)."""
+    if not cfg.stress.enabled or not cfg.stress.historical:
+        return []
+    return load_historical_scenarios(tickers or cfg.tickers, cfg.stress.historical)
 
-    prices = load_prices(cfg.tickers, cfg.start, end)
+
+def compute_paper_decision(
+    cfg: PaperConfig,
+    prices: pd.DataFrame,
+    scenarios: list[Scenario] | None = None,
+) -> dict:
+    """Baseline weights → risk overlay → agent decision for the last bar of `prices` (no file IO).
+
+    With stress enabled the plan is also run through `scenarios` (preloaded historical
+    windows) plus the synthetic shocks. With a rebalance calendar the proposed weights are
+    the targets from the last rebalance bar.
+    """
+    freq = cfg.freq
     rets = prices.pct_change().fillna(0.0)
 
-    # Proposed weights (baseline)
-    signal = compute_momentum_signal(prices, lookback=cfg.lookback)
-    w = signal.div(signal.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
-    w = w.clip(upper=cfg.max_position_weight)
-    w = w.div(w.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
+    # Proposed weights (baseline), evaluated on rebalance bars only
+    schedule = rebalance_mask(prices.index, cfg.rebalance.calendar) if cfg.rebalance.active else None
+    signal = compute_momentum_signal(prices, lookback=freq.bars(cfg.lookback), compute=cfg.compute)
+    w = build_weights(
+        signal,
+        prices,
+        cfg.max_position_weight,
+        construction=cfg.construction,
+        optimizer=cfg.optimizer,
+        lookback=freq.bars(cfg.lookback),
+        freq=freq,
+        compute=cfg.compute,
+        rebalance=schedule,
+    )
 
     # Risk overlay (for scale/audit). We don't need executed weights here, but audit does.
-    risk_out = apply_risk(
-        base_weights=w,
-        asset_returns=rets,
-        transaction_cost_bps=cfg.transaction_cost_bps,
-        cfg=cfg.risk,
-    )
+    # With a rebalance calendar the kill switch gates the drifting held book.
+    if schedule is None:
+        risk_out = apply_risk(
+            base_weights=w,
+            asset_returns=rets,
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            cfg=cfg.risk,
+            freq=freq,
+        )
+    else:
+        risk_out = apply_risk_rebalanced(
+            base_weights=w,
+            asset_returns=rets,
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            cfg=cfg.risk,
+            rebalance=cfg.rebalance,
+            schedule=schedule,
+            freq=freq,
+        )
     audit = risk_out["audit"]
 
     # Agent decision + risk-gated execution plan
-    agent_out = run_agent_decision(
+    agent_out = build_agent_decision(
         prices=prices,
         proposed_weights=w,
         risk_audit=audit,
-        out_dir=out_dir,
-        name="paper",
         max_ticker_vol_ann=float(cfg.agent.get("max_ticker_vol_ann", 0.20)),
         vol_cap_mode=str(cfg.agent.get("vol_cap_mode", "scale")),
+        freq=freq,
+        llm=cfg.llm,
+        group_factor=risk_out.get("group_factor"),
+        compute=cfg.compute,
     )
+    if cfg.stress.enabled:
+        agent_out["stress"] = stress_plan(
+            agent_out,
+            prices,
+            cfg.risk,
+            cfg.stress,
+            historical=scenarios or [],
+            transaction_cost_bps=cfg.transaction_cost_bps,
+            freq=freq,
+        )
+    return agent_out
+
+
+def _append_decision_row(csv_path: Path, row: list[str]) -> None:
+    """Append one row to the decision log under an exclusive lock (header written once)."""
+    with csv_path.open("a", newline="") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            # Check emptiness *after* acquiring the lock so only one writer emits the header.
+            new_file = f.seek(0, 2) == 0
+            wtr = csv.writer(f)
+            if new_file:
+                wtr.writerow(DECISION_COLUMNS)
+            wtr.writerow(row)
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_paper_artifacts(
+    agent_out: dict,
+    out_dir: Path,
+    account: str = "paper",
+    today: str | None = None,
+    write_latest: bool = True,
+) -> Path:
+    """Write agent JSON, the daily markdown and the decision log row for one account.
+
+    The default account keeps the historical layout (`daily/YYYY-MM-DD.md`); other accounts
+    get their own `daily/<account>/` folder so many accounts can share one `out_dir`.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    agent_out["paths"] = write_agent_artifacts(agent_out, out_dir, account, write_latest=write_latest)
 
+    research = agent_out["research"]
     decision = agent_out["decision"]
     execution = agent_out["execution"]
 
     # Daily markdown
-    today = date.today().isoformat()
+    today = today or date.today().isoformat()
     daily_dir = out_dir / "daily"
+    if account != "paper":
+        daily_dir = daily_dir / account
     daily_dir.mkdir(parents=True, exist_ok=True)
     daily_path = daily_dir / f"{today}.md"
 
-    rows = execution.rows
-    exec_df = pd.DataFrame(
-        [(r.ticker, r.proposed_weight, r.executed_weight, r.status) for r in rows],
-        columns=["ticker", "proposed", "executed", "status"],
-    ).sort_values("executed", ascending=False)
+    exec_df = execution.to_frame()[["ticker", "proposed", "executed", "status"]].sort_values(
+        "executed", ascending=False
+    )
+
+    llm_md = f"- LLM ({research.llm_model}): {research.llm_summary}\n" if research.llm_summary else ""
 
-    md = f"""# Paper Trading — {today}
+    stress = agent_out.get("stress")
+    stress_md = ""
+    if stress is not None and len(stress):
+        stress_md = (
+            "\n## Stress scenarios\n"
+            "- Today's plan under historical windows and synthetic shocks; `managed` keeps the "
+            "vol-target / drawdown-kill overlays running, `static` holds today's weights.\n\n"
+            + stress_table(stress).astype(object).fillna("").to_markdown()
+            + "\n"
+        )
+
+    title = "Paper Trading" if account == "paper" else f"Paper Trading ({account})"
+    md = f"""# {title} — {today}
 
 **As of:** {decision.as_of}
 
 ## Regime
-- {agent_out['research'].regime.label} (conf={agent_out['research'].regime.confidence:.2f})
-
+- {research.regime_label} (conf={research.regime_confidence:.2f})
+{llm_md}
 ## Execution summary
 - Gross exposure: **{execution.gross_exposure:.2%}**
 - Cash weight: **{execution.cash_weight:.2%}**
@@ -124,7 +269,7 @@ def run_paper(config_path: Path) -> Path:
 
 ## Executable target weights
 {exec_df.to_markdown(index=False)}
-
+{stress_md}
 ## Notes
 - This is a simulated paper run. Not financial advice.
 """
@@ -132,21 +277,24 @@ def run_paper(config_path: Path) -> Path:
     daily_path.write_text(md)
 
     # Append to decisions.csv
-    csv_path = daily_dir / "decisions.csv"
-    new_file = not csv_path.exists()
-    with csv_path.open("a", newline="") as f:
-        wtr = csv.writer(f)
-        if new_file:
-            wtr.writerow(["date", "as_of", "regime", "gross_exposure", "cash_weight", "gate_reason"])
-        wtr.writerow(
-            [
-                today,
-                decision.as_of,
-                agent_out["research"].regime.label,
-                f"{execution.gross_exposure:.6f}",
-                f"{execution.cash_weight:.6f}",
-                execution.gate_reason,
-            ]
-        )
+    _append_decision_row(
+        daily_dir / "decisions.csv",
+        [
+            today,
+            decision.as_of,
+            research.regime_label,
+            f"{execution.gross_exposure:.6f}",
+            f"{execution.cash_weight:.6f}",
+            execution.gate_reason,
+        ],
+    )
 
     return daily_path
+
+
+def run_paper(config_path: Path) -> Path:
+    """Generate today's paper-trading decision artifacts + a daily markdown report."""
+    cfg = _read_config(config_path)
+    prices = load_prices(cfg.tickers, cfg.start, _paper_end(cfg), interval=cfg.interval)
+    agent_out = compute_paper_decision(cfg, prices, load_stress_scenarios(cfg))
+    return write_paper_artifacts(agent_out, Path(cfg.out_dir), account=cfg.account or "paper")
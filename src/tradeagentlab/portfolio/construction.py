@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.features.shards import (
+    ComputeConfig,
+    clip_kernel,
+    count_kernel,
+    map_shards,
+    scale_kernel,
+)
+from tradeagentlab.portfolio.optimizer import OptimizerConfig, optimize_weights
+
+
+def equal_weight(
+    signal: pd.DataFrame, max_position_weight: float, compute: ComputeConfig | None = None
+) -> pd.DataFrame:
+    """Equal-weight across tickers with signal==1, capped, then renormalized.
+
+    Sharded (`compute.shards > 1`): only the per-row signal counts and capped weight sums
+    are merged across shards; the per-ticker steps run shard by shard.
+    """
+    if compute is not None and compute.sharded:
+        sig = {"signal": signal.to_numpy(dtype=float)}
+        _, parts = map_shards(count_kernel, sig, {}, compute)
+        out, parts = map_shards(
+            clip_kernel,
+            sig,
+            {"weights": (signal.shape, float)},
+            compute,
+            counts=np.sum(parts, axis=0),
+            cap=max_position_weight,
+        )
+        totals = np.sum(parts, axis=0)
+        out, _ = map_shards(scale_kernel, out, {"scaled": (signal.shape, float)}, compute, totals=totals)
+        return pd.DataFrame(out["scaled"], index=signal.index, columns=signal.columns)
+    w = signal.div(signal.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
+    w = w.clip(upper=max_position_weight)
+    w = w.div(w.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
+    return w
+
+
+def build_weights(
+    signal: pd.DataFrame,
+    prices: pd.DataFrame,
+    max_position_weight: float,
+    construction: str = "equal",
+    optimizer: OptimizerConfig | None = None,
+    lookback: int = 20,
+    freq: BarFrequency = DAILY,
+    compute: ComputeConfig | None = None,
+    rebalance: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """Proposed (pre-risk) weights for every date.
+
+    `construction`: equal | min_variance | risk_parity | mean_variance. The optimizers
+    allocate among the same names the signal selects; mean_variance uses the trailing
+    `lookback`-bar return (per bar) as the expected return.
+
+    With a boolean `rebalance` mask, weights are only evaluated on those dates and held
+    (as targets) in between.
+    """
+    if rebalance is not None:
+        rebalance = np.asarray(rebalance, dtype=bool)
+    if construction == "equal":
+        if rebalance is None:
+            return equal_weight(signal, max_position_weight, compute)
+        w = equal_weight(signal[rebalance], max_position_weight, compute)
+        return w.astype(float).reindex(signal.index).ffill().fillna(0.0)
+    rets = prices.pct_change().fillna(0.0)
+    mu = prices.pct_change(lookback) / lookback if construction == "mean_variance" else None
+    w, _ = optimize_weights(
+        signal,
+        rets,
+        construction,
+        max_position_weight,
+        optimizer or OptimizerConfig(),
+        expected_returns=mu,
+        freq=freq,
+        solve=rebalance,
+    )
+    return w if rebalance is None else w.ffill().fillna(0.0)
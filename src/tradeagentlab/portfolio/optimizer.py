@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.risk.covariance import EWMACovariance
+
+METHODS = ("min_variance", "risk_parity", "mean_variance")
+
+
+@dataclass
+class OptimizerConfig:
+    cov_halflife: float = 60.0  # trading days
+    cov_shrinkage: float = 0.1  # blend towards the diagonal, 0..1
+    risk_aversion: float = 5.0  # mean_variance only
+    max_iter: int = 500
+    tol: float = 1e-7  # max abs weight change between iterations
+    workers: int = 1  # >1 solves contiguous date blocks in a process pool
+    block_size: int = 252  # dates per pool task (each block warm-starts internally)
+
+
+def project_capped_simplex(v: np.ndarray, cap: float) -> np.ndarray:
+    """Euclidean projection onto {0 <= w <= cap, sum(w) = 1}, exact in O(n log n).
+
+    w = clip(v − τ, 0, cap) where f(τ) = Σ clip(v − τ, 0, cap) is piecewise linear and
+    decreasing; f is evaluated at every breakpoint (v_i and v_i − cap) with one sort and
+    cumulative sums, then τ is interpolated inside the bracketing segment.
+
+    If the caps cannot sum to 1 (n·cap < 1) the cap is relaxed to 1/n, which is what
+    the equal-weight builder's clip-then-renormalize ends up holding as well.
+    """
+    n = len(v)
+    cap = max(cap, 1.0 / n)
+    vs = np.sort(v)
+    cs = np.concatenate([[0.0], np.cumsum(vs)])
+    tau = np.sort(np.concatenate([vs, vs - cap]))
+    hi = n - np.searchsorted(vs, tau, side="right")  # v_i > τ
+    cp = n - np.searchsorted(vs, tau + cap, side="left")  # v_i >= τ + cap (capped)
+    f = cp * cap + (cs[n - cp] - cs[n - hi]) - tau * (hi - cp)
+    j = int(np.searchsorted(-f, -1.0))  # first breakpoint with f <= 1
+    if j == 0:
+        t = tau[0]
+    else:
+        f0, f1 = f[j - 1], f[j]
+        t = tau[j - 1] + (tau[j] - tau[j - 1]) * (f0 - 1.0) / (f0 - f1) if f0 > f1 else tau[j]
+    w = np.clip(v - t, 0.0, cap)
+    return w / w.sum()
+
+
+def _lmax(S: np.ndarray, x: np.ndarray, iters: int = 20) -> float:
+    """Largest eigenvalue of a PSD matrix by power iteration."""
+    x = x / (np.linalg.norm(x) or 1.0)
+    lam = 0.0
+    for _ in range(iters):
+        y = S @ x
+        lam = float(np.linalg.norm(y))
+        if lam == 0.0:
+            return 0.0
+        x = y / lam
+    return lam
+
+
+def _active_set(
+    S: np.ndarray, lin: np.ndarray, a: float, cap: float, w0: np.ndarray, max_iter: int = 0
+) -> tuple[np.ndarray, int] | None:
+    """Primal active-set solve started from the feasible point `w0` and its bound pattern.
+
+    Each iteration either takes the equality-constrained Newton step on the free names
+    (stopping at the first bound it hits) or releases the bound with the most negative
+    multiplier. Day to day the set of names at 0 / at the cap barely changes, so a warm
+    start typically needs a handful of small linear solves. Returns None if it fails.
+    """
+    n = len(w0)
+    w = w0.copy()
+    lower = w <= 1e-12
+    upper = ~lower & (w >= cap - 1e-12)
+    w[lower], w[upper] = 0.0, cap
+    scale = float(a * np.abs(np.diag(S)).max() + np.abs(lin).max()) or 1.0
+    for k in range(1, (max_iter or 10 * n + 10) + 1):
+        free = ~(lower | upper)
+        f = np.flatnonzero(free)
+        h = a * (S @ w) - lin
+        if len(f) == 0:
+            gamma = -0.5 * (h[upper].max() + h[lower].min()) if lower.any() and upper.any() else 0.0
+            step = False
+        else:
+            K = np.empty((len(f) + 1, len(f) + 1))
+            K[:-1, :-1] = a * S[np.ix_(f, f)]
+            K[:-1, -1] = K[-1, :-1] = 1.0
+            K[-1, -1] = 0.0
+            rhs = np.zeros(len(f) + 1)
+            rhs[:-1] = -h[f]
+            try:
+                sol = np.linalg.solve(K, rhs)
+            except np.linalg.LinAlgError:
+                return None
+            p, gamma = sol[:-1], sol[-1]
+            step = np.abs(p).max() > 1e-12
+
+        if step:
+            # Longest feasible fraction of the step; the first bound hit joins the set
+            ratio = np.full(len(f), np.inf)
+            dec, inc = p < -1e-15, p > 1e-15
+            ratio[dec] = w[f][dec] / -p[dec]
+            ratio[inc] = (cap - w[f][inc]) / p[inc]
+            j = int(np.argmin(ratio))
+            alpha = min(1.0, float(ratio[j]))
+            w[f] += alpha * p
+            if alpha < 1.0:
+                i = f[j]
+                hit_upper = bool(p[j] > 0)
+                lower[i], upper[i] = not hit_upper, hit_upper
+                w[i] = cap if hit_upper else 0.0
+            continue
+
+        # Stationary on the free names: check bound multipliers (g > 0 keeps a name at 0,
+        # g < 0 keeps it at the cap)
+        g = h + gamma
+        viol = np.zeros(n)
+        viol[lower] = -g[lower]
+        viol[upper] = g[upper]
+        i = int(np.argmax(viol))
+        if viol[i] <= 1e-10 * scale:
+            return w, k
+        lower[i] = upper[i] = False
+    return None
+
+
+def solve_quadratic(
+    S: np.ndarray,
+    mu: np.ndarray | None,
+    cap: float,
+    w0: np.ndarray,
+    risk_aversion: float = 1.0,
+    max_iter: int = 500,
+    tol: float = 1e-7,
+) -> tuple[np.ndarray, int]:
+    """min  (a/2)·w'Sw − μ'w  on the capped simplex.
+
+    Warm-started active-set solve first; if that does not settle, accelerated projected
+    gradient (FISTA with adaptive restart) from the same start. `mu=None` gives minimum
+    variance. Returns (weights, iterations used).
+    """
+    a = risk_aversion
+    n = len(w0)
+    cap = max(cap, 1.0 / n)
+    lin = np.zeros(n) if mu is None else mu
+    if cap * n <= 1.0 + 1e-12:
+        return np.full(n, 1.0 / n), 0  # only the equal-weight book is feasible
+    w = project_capped_simplex(w0, cap)
+    exact = _active_set(S, lin, a, cap, w)
+    if exact is not None:
+        return exact
+
+    L = a * _lmax(S, w + 1e-3)
+    if L <= 0.0:
+        return w, 0
+    z, t = w, 1.0
+    for k in range(1, max_iter + 1):
+        w_new = project_capped_simplex(z - (a * (S @ z) - lin) / L, cap)
+        if np.abs(w_new - w).max() < tol:
+            return w_new, k
+        if (z - w_new) @ (w_new - w) > 0.0:
+            # Adaptive restart: momentum points uphill, drop it (linear rate when convex)
+            z, t = w_new, 1.0
+        else:
+            t_new = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+            z = w_new + ((t - 1.0) / t_new) * (w_new - w)
+            t = t_new
+        w = w_new
+    return w, max_iter
+
+
+def solve_risk_parity(
+    S: np.ndarray, cap: float, w0: np.ndarray, max_iter: int = 500, tol: float = 1e-7
+) -> tuple[np.ndarray, int]:
+    """Equal risk contributions by cyclical coordinate descent, then capped.
+
+    Solves min ½y'Sy − (1/n)·Σ log y (y > 0) and normalizes; each coordinate step has a
+    closed form and S·y is maintained incrementally, so a sweep costs O(n²).
+    """
+    n = len(w0)
+    d = np.diag(S).copy()
+    if (d <= 0).any():
+        return project_capped_simplex(np.full(n, 1.0 / n), cap), 0
+    b = 1.0 / n
+    y = np.where(w0 > 0, w0, 1.0 / n) / np.sqrt(max(float(w0 @ S @ w0), 1e-300))
+    Sy = S @ y
+    k = 0
+    for k in range(1, max_iter + 1):
+        step = 0.0
+        for i in range(n):
+            c = Sy[i] - d[i] * y[i]
+            yi = (-c + np.sqrt(c * c + 4.0 * d[i] * b)) / (2.0 * d[i])
+            delta = yi - y[i]
+            if delta:
+                Sy += S[:, i] * delta
+                y[i] = yi
+                step = max(step, abs(delta) / yi)
+        if step < tol:
+            break
+    return project_capped_simplex(y / y.sum(), cap), k
+
+
+def _solve_block(task: dict) -> tuple[np.ndarray, int]:
+    """Walk one contiguous block of dates: advance the covariance, solve each date warm."""
+    cov: EWMACovariance = task["cov"]
+    R, M, mu, solve = task["returns"], task["members"], task["mu"], task["solve"]
+    method, cap, cfg = task["method"], task["cap"], task["cfg"]
+    T, n = M.shape
+    W = np.zeros((T, n))
+    W[~solve] = np.nan
+    w_prev = np.zeros(n)
+    iters = 0
+    for t in range(T):
+        cov.update(R[t])
+        if not solve[t]:
+            continue
+        idx = np.flatnonzero(M[t])
+        if len(idx) == 0:
+            w_prev = np.zeros(n)
+            continue
+        S = cov.covariance[np.ix_(idx, idx)]
+        # Warm start: yesterday's solution on today's names, entrants at 0 (the active set
+        # releases them if they help); a cold start begins from equal weight
+        w0 = w_prev[idx].copy()
+        if w0.sum() <= 0.0:
+            w0[:] = 1.0 / len(idx)
+        else:
+            w0 /= w0.sum()
+        if cov.n_obs < 2 or not np.diag(S).any():
+            w, k = project_capped_simplex(np.full(len(idx), 1.0 / len(idx)), cap), 0
+        elif method == "risk_parity":
+            w, k = solve_risk_parity(S, cap, w0, cfg.max_iter, cfg.tol)
+        else:
+            w, k = solve_quadratic(
+                S,
+                None if method == "min_variance" else np.nan_to_num(mu[t, idx]),
+                cap,
+                w0,
+                risk_aversion=1.0 if method == "min_variance" else cfg.risk_aversion,
+                max_iter=cfg.max_iter,
+                tol=cfg.tol,
+            )
+        iters += k
+        W[t, idx] = w
+        w_prev = W[t]
+    return W, iters
+
+
+def optimize_weights(
+    members: pd.DataFrame,
+    asset_returns: pd.DataFrame,
+    method: str,
+    max_position_weight: float,
+    cfg: OptimizerConfig,
+    expected_returns: pd.DataFrame | None = None,
+    freq: BarFrequency = DAILY,
+    solve: np.ndarray | None = None,
+) -> tuple[pd.DataFrame, dict]:
+    """Long-only, fully invested, capped weights among `members` (0/1) on every date.
+
+    The EWMA covariance at date t includes returns up to t, matching the ex-ante risk
+    model. Dates are split into contiguous blocks; the covariance is snapshotted at each
+    block start in one cheap sequential pass, so blocks solve independently (and in
+    parallel when `cfg.workers > 1`) while every solve inside a block is warm-started
+    from the previous date.
+
+    With a boolean `solve` mask (e.g. rebalance dates) only those dates are solved; the
+    covariance still advances every bar, and the other rows are NaN.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown optimizer method {method!r} ({'|'.join(METHODS)})")
+    if method == "mean_variance" and expected_returns is None:
+        raise ValueError("mean_variance needs expected_returns")
+
+    R = asset_returns.reindex(members.index).fillna(0.0).to_numpy(dtype=float)
+    M = members.fillna(0).to_numpy() > 0
+    solve = np.ones(len(M), dtype=bool) if solve is None else np.asarray(solve, dtype=bool)
+    mu = (
+        expected_returns.reindex(index=members.index, columns=members.columns).to_numpy(dtype=float)
+        if expected_returns is not None
+        else None
+    )
+    T, n = M.shape
+    block = max(1, int(cfg.block_size))
+    workers = max(1, int(cfg.workers or os.cpu_count() or 1))
+
+    cov = EWMACovariance(n, halflife=freq.bars(cfg.cov_halflife), shrinkage=cfg.cov_shrinkage)
+    tasks = []
+    for s in range(0, T, block):
+        e = min(T, s + block)
+        tasks.append(
+            {
+                "cov": copy.deepcopy(cov),
+                "returns": R[s:e],
+                "members": M[s:e],
+                "solve": solve[s:e],
+                "mu": mu[s:e] if mu is not None else None,
+                "method": method,
+                "cap": max_position_weight,
+                "cfg": cfg,
+            }
+        )
+        for r in R[s:e]:
+            cov.update(r)
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as ex:
+            parts = list(ex.map(_solve_block, tasks))
+    else:
+        parts = [_solve_block(t) for t in tasks]
+
+    W = np.concatenate([p[0] for p in parts]) if parts else np.zeros((0, n))
+    info = {"method": method, "iterations": int(sum(p[1] for p in parts)), "blocks": len(tasks)}
+    return pd.DataFrame(W, index=members.index, columns=members.columns), info
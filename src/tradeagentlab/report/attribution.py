@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class AttributionConfig:
+    enabled: bool = False  # opt-in: the size/sector factors download extra ETFs
+    window: int = 63  # rolling regression window (trading days)
+    momentum_lookback: int = 126  # trading days, for the long-short momentum factor
+    size: list[str] = field(default_factory=lambda: ["IWM", "SPY"])  # small-minus-large spread
+    sectors: list[str] = field(default_factory=list)  # extra sector ETFs (XL* in the universe are used anyway)
+
+
+def read_attribution_config(section: dict | None) -> AttributionConfig:
+    """`report.attribution`: a section turns attribution on unless it says `enabled: false`."""
+    return AttributionConfig(**{"enabled": True, **section}) if section else AttributionConfig()
+
+
+@dataclass
+class Attribution:
+    factors: list[str]
+    rolling: pd.DataFrame  # columns (strategy, term), term in [alpha, *factors, r2, n]
+    expanding: pd.DataFrame  # same layout; the last row is the full-sample fit
+    summary: pd.DataFrame  # index (strategy, term): beta, factor_ann, contrib_ann
+    window: int
+
+
+def build_factors(
+    prices: pd.DataFrame,
+    market_returns: pd.Series,
+    momentum_lookback: int = 126,
+    size: list[str] | None = None,
+    sectors: list[str] | None = None,
+    extra_prices: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Factor return series aligned to `prices.index`.
+
+    - market: benchmark returns
+    - momentum: equal-weight winners minus losers of the strategy universe, split at the
+      cross-sectional median of the trailing `momentum_lookback` return (known at t-1)
+    - size: return spread of the `size` pair (e.g. IWM − SPY), when both are available
+    - sector ETFs (XL* in the panel plus `sectors`): return in excess of the market
+    """
+    panel = prices
+    if extra_prices is not None:
+        panel = pd.concat([prices, extra_prices.drop(columns=prices.columns, errors="ignore")], axis=1)
+    rets = panel.pct_change(fill_method=None)
+    mkt = market_returns.reindex(prices.index)
+    factors = {"market": mkt}
+
+    universe = [c for c in prices.columns if c != market_returns.name and not str(c).startswith("XL")]
+    if len(universe) >= 2:
+        mom = prices[universe].pct_change(momentum_lookback, fill_method=None).shift(1)
+        rank = mom.rank(axis=1, pct=True)
+        r = rets[universe]
+        winners = r.where(rank > 0.5).mean(axis=1)
+        losers = r.where(rank <= 0.5).mean(axis=1)
+        factors["momentum"] = (winners - losers).where(mom.notna().sum(axis=1) >= 2)
+
+    def _ret(t: str) -> pd.Series | None:
+        if t in rets.columns:
+            return rets[t]
+        if t == market_returns.name:
+            return mkt
+        return None
+
+    if size and len(size) == 2:
+        a, b = _ret(size[0]), _ret(size[1])
+        if a is not None and b is not None:
+            factors["size"] = a - b
+
+    for t in dict.fromkeys([*(c for c in panel.columns if str(c).startswith("XL")), *(sectors or [])]):
+        r = _ret(t)
+        if r is not None:
+            factors[str(t)] = r - mkt
+
+    return pd.DataFrame(factors, index=prices.index)
+
+
+def _fit(C, b, yy, n, min_obs):
+    """Batched OLS from sufficient statistics.
+
+    C: (T,P,P) Σzz', b: (T,P,S) Σzy, yy: (T,S) Σy², n: (T,) obs → (β (T,P,S), r2 (T,S)).
+    """
+    P = C.shape[-1]
+    ridge = 1e-12 * np.trace(C, axis1=1, axis2=2)[:, None, None] * np.eye(P)
+    beta = np.linalg.solve(C + ridge + 1e-300 * np.eye(P), b)
+    sse = yy - 2.0 * np.einsum("tps,tps->ts", beta, b) + np.einsum("tps,tpq,tqs->ts", beta, C, beta)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ybar = b[:, 0, :] / n[:, None]
+        sst = yy - n[:, None] * ybar**2
+        r2 = 1.0 - sse / sst
+    bad = n < min_obs
+    beta[bad] = np.nan
+    r2[bad] = np.nan
+    return beta, r2
+
+
+def factor_regressions(
+    returns: pd.DataFrame,
+    factors: pd.DataFrame,
+    window: int = 63,
+    ann: float = 252.0,
+    min_obs: int | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Rolling (`window`) and expanding OLS of every strategy on all factors at once.
+
+    Sufficient statistics (Σzz', Σzy, Σy² with z = [1, factors]) are accumulated once with
+    cumulative sums; a rolling window is the difference of two cumulative states, so no
+    window is refit from raw data. Strategies sharing the same sample (the usual case)
+    share Σzz', and every date × strategy system is solved in one batched call.
+    """
+    idx = returns.index
+    X = factors.reindex(idx).to_numpy(dtype=float)
+    Y = returns.to_numpy(dtype=float)
+    T, K = X.shape
+    S = Y.shape[1]
+    P = K + 1
+    # Rolling fits need half a window; the expanding fit only needs a well-posed system
+    min_obs = min_obs or max(P + 2, window // 2)
+    min_obs_exp = min(min_obs, max(P + 2, 20))
+
+    Z = np.concatenate([np.ones((T, 1)), X], axis=1)
+    valid = np.isfinite(Z).all(axis=1)[:, None] & np.isfinite(Y)
+    Z = np.nan_to_num(Z)
+    Y0 = np.where(valid, Y, 0.0)
+    ZZ = Z[:, :, None] * Z[:, None, :]
+
+    def _lagged(cum: np.ndarray) -> np.ndarray:
+        out = cum.copy()
+        out[window:] -= cum[:-window]
+        return out
+
+    terms = ["alpha", *factors.columns, "r2", "n"]
+    out = {k: np.full((T, S, len(terms)), np.nan) for k in ("rolling", "expanding")}
+    # One Σzz' per distinct sample mask (strategies with identical NaN patterns share it)
+    masks, group = np.unique(valid.T, axis=0, return_inverse=True)
+    for g, m in enumerate(masks):
+        cols = np.flatnonzero(group.ravel() == g)
+        mf = m.astype(float)
+        C = np.cumsum(ZZ * mf[:, None, None], axis=0)
+        b = np.cumsum(Z[:, :, None] * Y0[:, None, cols], axis=0)
+        yy = np.cumsum(Y0[:, cols] ** 2, axis=0)
+        n = np.cumsum(mf)
+        for kind, (Ck, bk, yk, nk, mo) in {
+            "expanding": (C, b, yy, n, min_obs_exp),
+            "rolling": (_lagged(C), _lagged(b), _lagged(yy), _lagged(n), min_obs),
+        }.items():
+            beta, r2 = _fit(Ck, bk, yk, nk, mo)
+            res = out[kind]
+            res[:, cols, 0] = beta[:, 0, :] * ann
+            res[:, cols, 1:P] = np.moveaxis(beta[:, 1:, :], 1, 2)
+            res[:, cols, P] = r2
+            res[:, cols, P + 1] = np.broadcast_to(nk[:, None], (T, len(cols)))
+
+    columns = pd.MultiIndex.from_product([list(returns.columns), terms], names=["strategy", "term"])
+    rolling, expanding = (
+        pd.DataFrame(out[k].reshape(T, S * len(terms)), index=idx, columns=columns)
+        for k in ("rolling", "expanding")
+    )
+    return rolling, expanding
+
+
+def compute_attribution(
+    returns: pd.Series | pd.DataFrame,
+    factors: pd.DataFrame,
+    window: int = 63,
+    ann: float = 252.0,
+) -> Attribution:
+    """Rolling/expanding factor betas plus a full-sample return attribution per strategy.
+
+    `contrib_ann` = beta × annualized mean factor return over each strategy's sample;
+    the alpha row carries the annualized intercept, so rows add up to the fitted
+    annualized mean return.
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame("strategy")
+    factors = factors.loc[:, factors.notna().any()]
+    rolling, expanding = factor_regressions(returns, factors, window=window, ann=ann)
+
+    rows = []
+    for s in returns.columns:
+        last = expanding[s].iloc[-1]
+        sample = returns[s].notna() & factors.notna().all(axis=1)
+        f_ann = factors[sample].mean() * ann
+        rows.append(((s, "alpha"), [np.nan, np.nan, float(last["alpha"])]))
+        for f in factors.columns:
+            beta = float(last[f])
+            rows.append(((s, f), [beta, float(f_ann[f]), beta * float(f_ann[f])]))
+        rows.append(((s, "r2"), [float(last["r2"]), np.nan, np.nan]))
+    summary = pd.DataFrame(
+        [r[1] for r in rows],
+        index=pd.MultiIndex.from_tuples([r[0] for r in rows], names=["strategy", "term"]),
+        columns=["beta", "factor_ann", "contrib_ann"],
+    )
+    return Attribution(
+        factors=list(factors.columns),
+        rolling=rolling,
+        expanding=expanding,
+        summary=summary,
+        window=window,
+    )
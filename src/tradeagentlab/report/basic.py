@@ -2,38 +2,19 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
+from tradeagentlab.report.attribution import Attribution
+from tradeagentlab.report.metrics import ReportMetrics, compute_metrics
+from tradeagentlab.risk.stress import stress_table
 
-def _drawdown(equity: pd.Series) -> pd.Series:
-    peak = equity.cummax()
-    return equity / peak - 1.0
 
-
-def _perf_stats(returns: pd.Series) -> dict[str, float]:
-    r = returns.dropna()
-    if len(r) == 0:
-        return {"cagr": 0.0, "sharpe": 0.0, "mdd": 0.0, "vol": 0.0}
-
-    ann = 252
-    equity = (1 + r).cumprod()
-    cagr = equity.iloc[-1] ** (ann / len(r)) - 1
-    vol = r.std() * np.sqrt(ann)
-    sharpe = (r.mean() / (r.std() + 1e-12)) * np.sqrt(ann)
-    dd = _drawdown(equity)
-    mdd = dd.min()
-    return {"cagr": float(cagr), "sharpe": float(sharpe), "mdd": float(mdd), "vol": float(vol)}
-
-
-def _monthly_returns_table(returns: pd.Series) -> pd.DataFrame:
-    """Monthly returns in a year×month table (percent)."""
-    # pandas 3.0+: use month-end alias "ME" ("M" removed)
-    m = (1 + returns).resample("ME").prod() - 1
-    if m.empty:
+def _monthly_returns_table(monthly: pd.Series) -> pd.DataFrame:
+    """Monthly returns in a year×month table (percent), from month-end compounded returns."""
+    if monthly.empty:
         return pd.DataFrame()
-    df = m.to_frame("ret")
+    df = monthly.to_frame("ret")
     df["year"] = df.index.year
     df["month"] = df.index.month
     piv = df.pivot_table(index="year", columns="month", values="ret", aggfunc="sum").sort_index()
@@ -41,98 +22,112 @@ def _monthly_returns_table(returns: pd.Series) -> pd.DataFrame:
     return (piv * 100).round(2)
 
 
-def _beta_alpha(strategy_ret: pd.Series, bench_ret: pd.Series) -> tuple[float, float]:
-    # Align on the same dates
-    x, y = bench_ret.align(strategy_ret, join="inner")
-    x = x.astype(float)
-    y = y.astype(float)
+def _label(col: str) -> str:
+    return "Strategy" if col == "strategy" else str(col)
 
-    if len(x) < 20:
-        return 0.0, 0.0
 
-    var = float(np.var(x.to_numpy()))
-    if var < 1e-12:
-        return 0.0, 0.0
+def build_report_figures(results: dict, metrics: ReportMetrics) -> dict[str, go.Figure]:
+    """All report charts keyed by file suffix (e.g. `equity_vs_spy`), in report order.
 
-    cov = float(np.cov(x.to_numpy(), y.to_numpy(), ddof=0)[0, 1])
-    beta = cov / var
-    alpha_daily = float(y.mean() - beta * x.mean())
-    alpha_ann = alpha_daily * 252
-    return float(beta), float(alpha_ann)
-
-
-def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    fig_dir = out_dir / "figures"
-    fig_dir.mkdir(parents=True, exist_ok=True)
-
-    equity: pd.Series = results["equity"]
-    bench_equity: pd.Series = results.get("benchmark_equity")
-    rets: pd.Series = results["portfolio_returns"]
-    bench_rets: pd.Series | None = results.get("benchmark_returns")
+    Every non-benchmark column of `metrics` is drawn as its own strategy line, so the same
+    figures serve single- and multi-strategy results.
+    """
     weights: pd.DataFrame = results["weights"]
-    proposed_weights: pd.DataFrame | None = results.get("proposed_weights")
     turnover: pd.Series = results["turnover"]
     cost: pd.Series = results["cost"]
     risk_audit: pd.DataFrame | None = results.get("risk_audit")
-    agent: dict | None = results.get("agent")
+    initial = float(getattr(results.get("config"), "initial_cash", 1.0))
 
-    stats = _perf_stats(rets)
-    bench_stats = _perf_stats(bench_rets) if bench_rets is not None else None
-    beta, alpha = _beta_alpha(rets, bench_rets) if bench_rets is not None else (0.0, 0.0)
+    has_bench = "benchmark" in metrics.summary.index
+    strategies = [c for c in metrics.summary.index if c != "benchmark"]
+    figs: dict[str, go.Figure] = {}
 
-    # Figures
     # 1) Equity vs benchmark
     fig_eq = go.Figure()
-    fig_eq.add_trace(go.Scatter(x=equity.index, y=equity.values, name="Strategy"))
-    if bench_equity is not None:
-        fig_eq.add_trace(go.Scatter(x=bench_equity.index, y=bench_equity.values, name="SPY (benchmark)"))
+    for c in strategies:
+        eq = metrics.equity[c] * initial
+        fig_eq.add_trace(go.Scatter(x=eq.index, y=eq.values, name=_label(c)))
+    if has_bench:
+        beq = metrics.equity["benchmark"] * initial
+        fig_eq.add_trace(go.Scatter(x=beq.index, y=beq.values, name="SPY (benchmark)"))
     fig_eq.update_layout(title="Equity Curve (vs SPY)", xaxis_title="Date", yaxis_title="Value")
-    eq_path = fig_dir / f"{name}_equity_vs_spy.png"
-    fig_eq.write_image(eq_path, scale=2)
+    figs["equity_vs_spy"] = fig_eq
 
     # 2) Drawdown
-    dd = _drawdown(equity)
     fig_dd = go.Figure()
-    fig_dd.add_trace(go.Scatter(x=dd.index, y=dd.values, name="Drawdown"))
+    for c in strategies:
+        dd = metrics.drawdown[c]
+        fig_dd.add_trace(go.Scatter(x=dd.index, y=dd.values, name="Drawdown" if c == "strategy" else c))
     fig_dd.update_layout(title="Drawdown", xaxis_title="Date", yaxis_title="Drawdown")
-    dd_path = fig_dir / f"{name}_drawdown.png"
-    fig_dd.write_image(dd_path, scale=2)
+    figs["drawdown"] = fig_dd
 
     # 3) Turnover & costs
     fig_tc = go.Figure()
     fig_tc.add_trace(go.Scatter(x=turnover.index, y=turnover.values, name="Turnover (|Δw| sum)"))
     fig_tc.add_trace(go.Scatter(x=cost.index, y=cost.cumsum().values, name="Cumulative cost"))
     fig_tc.update_layout(title="Turnover & Costs", xaxis_title="Date")
-    tc_path = fig_dir / f"{name}_turnover_cost.png"
-    fig_tc.write_image(tc_path, scale=2)
-
-    # 4) Rolling risk metrics (vol) + risk overlay (scale)
-    vol_path = None
-    scale_path = None
-    scale_hist_path = None
-    risk_summary = "(risk audit not available)"
-    audit_md = "(no audit)"
-
-    # Rolling vol (20d, annualized) strategy vs SPY
-    vol_window = 20
-    strat_vol = rets.rolling(vol_window, min_periods=vol_window).std(ddof=0) * np.sqrt(252)
-    if bench_rets is not None:
-        bench_vol = bench_rets.rolling(vol_window, min_periods=vol_window).std(ddof=0) * np.sqrt(252)
-    else:
-        bench_vol = None
+    figs["turnover_cost"] = fig_tc
 
+    # 4) Rolling vol strategy vs SPY
+    vol_window = metrics.window
     fig_v = go.Figure()
-    fig_v.add_trace(go.Scatter(x=strat_vol.index, y=strat_vol.values, name=f"Strategy {vol_window}D vol"))
-    if bench_vol is not None:
-        fig_v.add_trace(go.Scatter(x=bench_vol.index, y=bench_vol.values, name=f"SPY {vol_window}D vol"))
+    for c in strategies:
+        v = metrics.rolling_vol[c]
+        fig_v.add_trace(go.Scatter(x=v.index, y=v.values, name=f"{_label(c)} {vol_window}{metrics.unit} vol"))
+    if has_bench:
+        v = metrics.rolling_vol["benchmark"]
+        fig_v.add_trace(go.Scatter(x=v.index, y=v.values, name=f"SPY {vol_window}{metrics.unit} vol"))
     fig_v.update_layout(
-        title=f"Rolling volatility ({vol_window}D, annualized)",
+        title=f"Rolling volatility ({vol_window}{metrics.unit}, annualized)",
         xaxis_title="Date",
         yaxis_title="Vol",
     )
-    vol_path = fig_dir / f"{name}_rolling_vol.png"
-    fig_v.write_image(vol_path, scale=2)
+    figs["rolling_vol"] = fig_v
+
+    # Rolling Sharpe (same window as vol)
+    fig_rs = go.Figure()
+    for c in strategies + (["benchmark"] if has_bench else []):
+        rs = metrics.rolling_sharpe[c]
+        fig_rs.add_trace(go.Scatter(x=rs.index, y=rs.values, name="SPY" if c == "benchmark" else _label(c)))
+    fig_rs.update_layout(
+        title=f"Rolling Sharpe ({vol_window}{metrics.unit}, annualized)", xaxis_title="Date", yaxis_title="Sharpe"
+    )
+    figs["rolling_sharpe"] = fig_rs
+
+    # Rolling beta / alpha vs SPY
+    if has_bench and metrics.rolling_beta is not None and metrics.rolling_alpha is not None:
+        fig_b = go.Figure()
+        for c in strategies:
+            rb = metrics.rolling_beta[c]
+            ra = metrics.rolling_alpha[c]
+            prefix = "" if c == "strategy" else f"{c} "
+            fig_b.add_trace(go.Scatter(x=rb.index, y=rb.values, name=f"{prefix}Beta"))
+            fig_b.add_trace(go.Scatter(x=ra.index, y=ra.values, name=f"{prefix}Alpha (ann.)", yaxis="y2"))
+        fig_b.update_layout(
+            title=f"Rolling beta / alpha vs SPY ({metrics.beta_window}{metrics.unit})",
+            xaxis_title="Date",
+            yaxis={"title": "Beta"},
+            yaxis2={"title": "Alpha (ann.)", "overlaying": "y", "side": "right"},
+        )
+        figs["rolling_beta"] = fig_b
+
+    # Rolling multi-factor betas
+    attribution: Attribution | None = results.get("attribution")
+    if attribution is not None and attribution.factors:
+        fig_f = go.Figure()
+        for c in strategies:
+            if c not in attribution.rolling.columns.get_level_values(0):
+                continue
+            prefix = "" if c == "strategy" else f"{c} "
+            for f in attribution.factors:
+                rb = attribution.rolling[(c, f)]
+                fig_f.add_trace(go.Scatter(x=rb.index, y=rb.values, name=f"{prefix}{f}"))
+        fig_f.update_layout(
+            title=f"Rolling factor betas ({attribution.window}{metrics.unit})",
+            xaxis_title="Date",
+            yaxis_title="Beta",
+        )
+        figs["factor_betas"] = fig_f
 
     # Exposure (invested weight) and cash weight over time
     exposure = weights.sum(axis=1).clip(lower=0.0)
@@ -141,43 +136,186 @@ def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
     fig_e.add_trace(go.Scatter(x=exposure.index, y=exposure.values, name="Gross exposure"))
     fig_e.add_trace(go.Scatter(x=cash.index, y=cash.values, name="Cash weight"))
     fig_e.update_layout(title="Exposure & Cash over time", xaxis_title="Date", yaxis_title="Weight")
-    exposure_path = fig_dir / f"{name}_exposure_cash.png"
-    fig_e.write_image(exposure_path, scale=2)
+    figs["exposure_cash"] = fig_e
 
     if risk_audit is not None and "scale" in risk_audit.columns:
         # Exposure scale time series
         fig_s = go.Figure()
         fig_s.add_trace(go.Scatter(x=risk_audit.index, y=risk_audit["scale"].values, name="Exposure scale"))
         fig_s.update_layout(title="Risk overlay: exposure scaling", xaxis_title="Date", yaxis_title="Scale")
-        scale_path = fig_dir / f"{name}_risk_scale.png"
-        fig_s.write_image(scale_path, scale=2)
+        figs["risk_scale"] = fig_s
 
         # Exposure scale distribution
         fig_h = go.Figure()
         fig_h.add_trace(go.Histogram(x=risk_audit["scale"].values, nbinsx=30, name="scale"))
         fig_h.update_layout(title="Exposure scale distribution", xaxis_title="Scale", yaxis_title="Count")
-        scale_hist_path = fig_dir / f"{name}_risk_scale_hist.png"
-        fig_h.write_image(scale_hist_path, scale=2)
+        figs["risk_scale_hist"] = fig_h
+
+    return figs
+
+
+def _attribution_table(attribution: Attribution, strategy: str = "strategy") -> pd.DataFrame:
+    """Full-sample factor attribution for one strategy (factor returns/contributions in %)."""
+    tab = attribution.summary.loc[strategy].copy()
+    tab["factor_ann"] = (tab["factor_ann"] * 100).round(2)
+    tab["contrib_ann"] = (tab["contrib_ann"] * 100).round(2)
+    tab["beta"] = tab["beta"].round(3)
+    return tab.rename(columns={"factor_ann": "factor_ann_%", "contrib_ann": "contrib_ann_%"})
+
+
+def _audit_tail(risk_audit: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """Last `n` audit rows, with `vol_est_ann` / `drawdown` in percent."""
+    cols = [
+        c
+        for c in ["scale", "vol_est_ann", "drawdown", "killed", "clipped", "ticker_vol_cut", "group_cap_cut", "reason"]
+        if c in risk_audit.columns
+    ]
+    tail = risk_audit[cols].tail(n).copy()
+    tail.index = tail.index.strftime("%Y-%m-%d")
+    if "vol_est_ann" in tail.columns:
+        tail["vol_est_ann"] = (tail["vol_est_ann"] * 100).round(2)
+    if "drawdown" in tail.columns:
+        tail["drawdown"] = (tail["drawdown"] * 100).round(2)
+    return tail
+
+
+def _risk_contrib_table(risk_contrib: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    """Last-bar ex-ante vol contributions (in %), largest first; `share_%` sums to 100."""
+    last = risk_contrib.iloc[-1].dropna()
+    last = last[last.abs() > 0]
+    tot = float(last.sum())
+    out = pd.DataFrame({"contrib_vol_%": (last * 100).round(2)})
+    out["share_%"] = (last / tot * 100).round(1) if tot else 0.0
+    return out.sort_values("contrib_vol_%", ascending=False).head(n)
+
 
+def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fig_dir = out_dir / "figures"
+    fig_dir.mkdir(parents=True, exist_ok=True)
+
+    rets: pd.Series = results["portfolio_returns"]
+    bench_rets: pd.Series | None = results.get("benchmark_returns")
+    weights: pd.DataFrame = results["weights"]
+    risk_audit: pd.DataFrame | None = results.get("risk_audit")
+    agent: dict | None = results.get("agent")
+    risk_contrib: pd.DataFrame | None = results.get("risk_contrib")
+
+    # All statistics come from one streaming pass (reused from run_backtest when available)
+    metrics: ReportMetrics | None = results.get("metrics")
+    if metrics is None:
+        metrics = compute_metrics(rets, bench_rets)
+    summary = metrics.summary
+    has_bench = "benchmark" in summary.index
+
+    stats = summary.loc["strategy"]
+    bench_stats = summary.loc["benchmark"] if has_bench else None
+    beta, alpha = (float(stats["beta"]), float(stats["alpha"])) if has_bench else (0.0, 0.0)
+
+    # Figures (static PNGs)
+    fig_paths: dict[str, Path] = {}
+    for key, fig in build_report_figures(results, metrics).items():
+        fig_paths[key] = fig_dir / f"{name}_{key}.png"
+        fig.write_image(fig_paths[key], scale=2)
+
+    eq_path = fig_paths["equity_vs_spy"]
+    dd_path = fig_paths["drawdown"]
+    tc_path = fig_paths["turnover_cost"]
+    vol_path = fig_paths["rolling_vol"]
+    sharpe_path = fig_paths["rolling_sharpe"]
+    exposure_path = fig_paths["exposure_cash"]
+    scale_path = fig_paths.get("risk_scale")
+    scale_hist_path = fig_paths.get("risk_scale_hist")
+
+    beta_md = "(no benchmark)"
+    if "rolling_beta" in fig_paths:
+        last_b = metrics.rolling_beta["strategy"].dropna()
+        last_a = metrics.rolling_alpha["strategy"].dropna()
+        beta_md = (
+            f"- Latest {metrics.beta_window}{metrics.unit} beta: **{float(last_b.iloc[-1]):.2f}**, "
+            f"alpha (ann.): **{float(last_a.iloc[-1]):.2%}**\n\n"
+            if len(last_b) and len(last_a)
+            else ""
+        ) + f"![]({fig_paths['rolling_beta'].relative_to(out_dir)})"
+
+    attribution: Attribution | None = results.get("attribution")
+    attr_block = ""
+    if attribution is not None and "strategy" in attribution.summary.index.get_level_values(0):
+        attr_block = (
+            "\n\n## Factor attribution\n"
+            f"- Factors: {', '.join(f'`{f}`' for f in attribution.factors)}; "
+            "full-sample OLS, `contrib_ann_%` = beta × annualized factor return.\n\n"
+            + _attribution_table(attribution).astype(object).fillna("").to_markdown()
+        )
+        if "factor_betas" in fig_paths:
+            attr_block += f"\n\n![]({fig_paths['factor_betas'].relative_to(out_dir)})"
+
+    risk_summary = "(risk audit not available)"
+    audit_md = "(no audit)"
+    if risk_audit is not None and "scale" in risk_audit.columns:
         last_scale = float(risk_audit["scale"].iloc[-1])
         killed_days = int(risk_audit.get("killed", pd.Series(False, index=risk_audit.index)).sum())
         risk_summary = f"- Last scale: **{last_scale:.2f}**\n- Days killed (scale=0 due to DD): **{killed_days}**"
+        audit_md = _audit_tail(risk_audit).to_markdown()
+
+    contrib_block = ""
+    if risk_contrib is not None and len(risk_contrib):
+        ctab = _risk_contrib_table(risk_contrib)
+        contrib_block = (
+            f"\n\n## Ex-ante risk contributions ({risk_contrib.index[-1]:%Y-%m-%d})\n"
+            "- EWMA covariance; per-ticker contribution to annualized portfolio vol.\n\n"
+            + (ctab.to_markdown() if len(ctab) else "(no positions)")
+        )
 
-        cols = [c for c in ["scale", "vol_est_ann", "drawdown", "killed", "clipped", "reason"] if c in risk_audit.columns]
-        tail = risk_audit[cols].tail(10).copy()
-        tail.index = tail.index.strftime("%Y-%m-%d")
-        if "vol_est_ann" in tail.columns:
-            tail["vol_est_ann"] = (tail["vol_est_ann"] * 100).round(2)
-        if "drawdown" in tail.columns:
-            tail["drawdown"] = (tail["drawdown"] * 100).round(2)
-        audit_md = tail.to_markdown()
+    stress: pd.DataFrame | None = results.get("stress")
+    stress_block = ""
+    if stress is not None and len(stress):
+        stress_block = (
+            "\n\n## Stress scenarios (latest plan)\n"
+            "- Historical windows and synthetic shocks applied to the last execution plan; "
+            "`managed` keeps the vol-target / drawdown-kill overlays running, `static` holds the weights. "
+            "`coverage_%` is the weight with real data (the rest is proxied by beta × SPY).\n\n"
+            + stress_table(stress).astype(object).fillna("").to_markdown()
+        )
+
+    ledger: dict | None = results.get("ledger")
+    ledger_md = ""
+    cost_note = "- Costs are modeled as: `turnover * transaction_cost_bps` (simplified)."
+    if ledger is not None:
+        lot = getattr(results.get("config"), "lot_size", 1.0)
+        ledger_md = (
+            f"- Share ledger (lot size {lot:g}): final cash **${ledger['final_cash']:,.0f}** "
+            f"(min ${ledger['min_cash']:,.0f}), {ledger['positions']} positions, "
+            f"{ledger['fills']:,} fills on {ledger['fill_days']:,} days, "
+            f"costs **${ledger['total_cost']:,.0f}**.\n\n"
+        )
+        cost_note = (
+            "- Orders are whole lots sized on the pre-trade NAV; costs are "
+            "`|filled notional| * transaction_cost_bps`, and cash includes the rounding residual."
+        )
+    rebalance: dict | None = results.get("rebalance")
+    if rebalance is not None:
+        rb = results["config"].rebalance
+        last = rebalance["last_rebalance"]
+        rules = [f"{rb.calendar} calendar"]
+        rules += [f"no-trade band ±{rb.band:.0%} of target"] if rb.band else []
+        rules += [f"min trade {rb.min_trade:.2%}"] if rb.min_trade else []
+        ledger_md = (
+            f"- Rebalance policy ({', '.join(rules)}): traded on **{rebalance['rebalances']:,}** "
+            f"of {rebalance['bars']:,} bars ({rebalance['scheduled']:,} scheduled), "
+            f"{rebalance['orders']:,} orders; last rebalance "
+            f"{f'{last:%Y-%m-%d}' if last is not None else 'n/a'}.\n\n"
+        ) + ledger_md
+        cost_note += (
+            " Holdings drift between rebalances; turnover is measured against the drifted weights."
+        )
 
     # 5) Latest holdings
-    latest_w = weights.iloc[-1].sort_values(ascending=False)
+    latest_w = weights.iloc[-1].sort_values(ascending=False, kind="stable")
     top = latest_w[latest_w > 0].head(10)
 
     # Monthly table
-    mtab = _monthly_returns_table(rets)
+    mtab = _monthly_returns_table(metrics.monthly["strategy"])
     mtab_md = mtab.to_markdown() if not mtab.empty else "(not enough data)"
 
     bench_line = ""
@@ -197,40 +335,40 @@ def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
         decision_json = paths.get("decision", "docs/agent/latest_decision.json")
         execution_json = paths.get("execution", "docs/agent/latest_execution.json")
 
-        # Build compact tables
-        if decision is not None and hasattr(decision, "proposed_positions"):
-            pos = [(p.ticker, p.weight, p.reason) for p in decision.proposed_positions]
-            dfp = pd.DataFrame(pos, columns=["ticker", "proposed", "reason"]).sort_values("proposed", ascending=False)
+        # Build compact tables (straight from the columnar frames)
+        if decision is not None:
+            dfp = decision.to_frame().sort_values("proposed", ascending=False)
 
             exec_md = "(no execution plan)"
-            if execution is not None and hasattr(execution, "rows"):
-                rows = [(r.ticker, r.proposed_weight, r.executed_weight, r.status) for r in execution.rows]
-                dfx = pd.DataFrame(rows, columns=["ticker", "proposed", "executed", "status"]).sort_values(
-                    "proposed", ascending=False
-                )
+            reasons_md = "(no per-ticker reasons)"
+            if execution is not None:
+                ex = execution.to_frame()
+                dfx = ex[["ticker", "proposed", "executed", "status"]].sort_values("proposed", ascending=False)
                 dfx["delta"] = (dfx["executed"] - dfx["proposed"]).round(4)
                 exec_md = dfx.to_markdown(index=False)
 
-            gate_reason = getattr(execution, "gate_reason", "") if execution is not None else ""
-            cash_w = getattr(execution, "cash_weight", None) if execution is not None else None
-            gross = getattr(execution, "gross_exposure", None) if execution is not None else None
-
-            # Per-ticker gate reasons (trim to keep report readable)
-            reasons_md = "(no per-ticker reasons)"
-            if execution is not None and hasattr(execution, "rows"):
-                rrows = [(r.ticker, r.status, r.gate_reason) for r in execution.rows]
-                dfr = pd.DataFrame(rrows, columns=["ticker", "status", "gate_reason"])
+                # Per-ticker gate reasons (trim to keep report readable)
+                dfr = ex[["ticker", "status", "gate_reason"]].copy()
                 dfr["gate_reason"] = dfr["gate_reason"].str.slice(0, 140)
                 reasons_md = dfr.to_markdown(index=False)
 
+            gate_reason = execution.gate_reason if execution is not None else ""
+            cash_w = execution.cash_weight if execution is not None else None
+            gross = execution.gross_exposure if execution is not None else None
+
             exec_summary = ""
             if cash_w is not None and gross is not None:
                 exec_summary = f"**Executed gross exposure:** {float(gross):.2%}  |  **Cash weight:** {float(cash_w):.2%}\n\n"
 
+            llm_line = ""
+            if research.llm_summary:
+                llm_line = f"**LLM research ({research.llm_model}):** {research.llm_summary}\n\n"
+
             agent_md = (
                 f"**As of:** `{decision.as_of}`\n\n"
-                f"**Regime:** `{research.regime.label}` (conf={research.regime.confidence:.2f})\n\n"
-                f"**Decision JSON:** `{Path(decision_json).as_posix()}`\n"
+                f"**Regime:** `{research.regime_label}` (conf={research.regime_confidence:.2f})\n\n"
+                + llm_line
+                + f"**Decision JSON:** `{Path(decision_json).as_posix()}`\n"
                 f"**Execution JSON:** `{Path(execution_json).as_posix()}`\n\n"
                 + exec_summary
                 + f"### Proposed positions\n{dfp.to_markdown(index=False)}\n\n"
@@ -295,8 +433,13 @@ def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
 ## Rolling risk metrics
 ![]({vol_path.relative_to(out_dir)})
 
+![]({sharpe_path.relative_to(out_dir)})
+
+## Rolling beta / alpha vs benchmark
+{beta_md}{attr_block}
+
 ## Exposure & cash over time
-![]({exposure_path.relative_to(out_dir)})
+{ledger_md}![]({exposure_path.relative_to(out_dir)})
 
 ## Risk overlay (exposure scale)
 {risk_summary}
@@ -317,7 +460,7 @@ def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
 ## Risk audit (last 10 days)
 - `vol_est_ann` and `drawdown` are shown in **%**.
 
-{audit_md}
+{audit_md}{contrib_block}{stress_block}
 
 ## Latest holdings (top 10 weights)
 {top.to_frame('weight').to_markdown() if len(top) else '(no positions)'}
@@ -329,7 +472,8 @@ def write_basic_report(results: dict, out_dir: Path, name: str) -> None:
 {agent_md}
 
 ## Notes
-- Costs are modeled as: `turnover * transaction_cost_bps` (simplified).
+- Rolling beta/alpha use a {metrics.beta_window}{metrics.unit} window; rolling vol/Sharpe use {metrics.window}{metrics.unit}.
+{cost_note}
 - This is a research backtest, not investment advice.
 """
 
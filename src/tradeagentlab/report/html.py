@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import html
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from tradeagentlab.report.basic import (
+    _attribution_table,
+    _audit_tail,
+    _monthly_returns_table,
+    _risk_contrib_table,
+    build_report_figures,
+)
+from tradeagentlab.report.metrics import ReportMetrics, compute_metrics
+from tradeagentlab.risk.stress import stress_table
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling; returns the kept positions.
+
+    Keeps the first/last point and, per bucket, the point forming the largest triangle with
+    the previously kept point and the next bucket's centroid. Peaks, troughs and drawdown
+    shapes survive at any point budget; cost is O(len(x)).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 interior buckets
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample_figure(fig: go.Figure, max_points: int) -> go.Figure:
+    """LTTB-downsample every line trace of `fig` longer than `max_points` (in place)."""
+    for trace in fig.data:
+        if trace.type != "scatter" or trace.x is None or trace.y is None or len(trace.x) <= max_points:
+            continue
+        xs = pd.Index(trace.x)
+        ys = np.asarray(trace.y, dtype=float)
+        xnum = xs.asi8.astype(float) if isinstance(xs, pd.DatetimeIndex) else xs.to_numpy(dtype=float)
+        keep = np.flatnonzero(np.isfinite(ys))  # warm-up NaNs would only poison the buckets
+        idx = keep[lttb_indices(xnum[keep], ys[keep], max_points)]
+        xs = xs[idx]
+        if isinstance(xs, pd.DatetimeIndex) and (xs == xs.normalize()).all():
+            xs = xs.strftime("%Y-%m-%d")  # daily bars: shorter JSON than full timestamps
+        trace.x = xs
+        trace.y = ys[idx]
+    return fig
+
+
+def _table(df: pd.DataFrame, **kw) -> str:
+    return df.to_html(classes="tbl", border=0, na_rep="", **kw) if len(df) else "<p>(none)</p>"
+
+
+def write_html_report(results: dict, out_dir: Path, name: str, max_points: int = 2000) -> Path:
+    """Single-file interactive report: plotly.js embedded once, every series LTTB-downsampled."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rets: pd.Series = results["portfolio_returns"]
+    weights: pd.DataFrame = results["weights"]
+    risk_audit: pd.DataFrame | None = results.get("risk_audit")
+    agent: dict | None = results.get("agent")
+
+    metrics: ReportMetrics | None = results.get("metrics")
+    if metrics is None:
+        metrics = compute_metrics(rets, results.get("benchmark_returns"))
+
+    figs = build_report_figures(results, metrics)
+    divs = []
+    for fig in figs.values():
+        downsample_figure(fig, max_points)
+        fig.update_layout(margin={"l": 50, "r": 30, "t": 50, "b": 40})
+        divs.append(
+            pio.to_html(fig, full_html=False, include_plotlyjs=False, default_height="420px")
+        )
+
+    summ = metrics.summary.drop(columns=["n"]).rename(index={"benchmark": "SPY (benchmark)"})
+    pct = ["cagr", "vol", "mdd", "alpha"]
+    fmt = {c: "{:.2%}".format for c in pct} | {c: "{:.2f}".format for c in ["sharpe", "beta"]}
+
+    latest_w = weights.iloc[-1].sort_values(ascending=False, kind="stable")
+    top = latest_w[latest_w > 0].head(10).to_frame("weight")
+    mtab = _monthly_returns_table(metrics.monthly["strategy"])
+
+    agent_html = "<p>(agent not run)</p>"
+    if agent is not None and agent.get("execution") is not None:
+        ex = agent["execution"]
+        dfx = ex.to_frame().sort_values("proposed", ascending=False)
+        agent_html = (
+            f"<p><b>As of:</b> {html.escape(ex.as_of)} | <b>Gross:</b> {ex.gross_exposure:.2%} | "
+            f"<b>Cash:</b> {ex.cash_weight:.2%}</p>" + _table(dfx, index=False)
+        )
+
+    sections = [
+        f"<h1>TradeAgentLab Report: {html.escape(name)}</h1>",
+        "<h2>Summary</h2>",
+        _table(summ, formatters=fmt),
+        "<h2>Charts</h2>",
+        *divs,
+        *(
+            ["<h2>Factor attribution (full sample)</h2>", _table(_attribution_table(attr))]
+            if (attr := results.get("attribution")) is not None
+            and "strategy" in attr.summary.index.get_level_values(0)
+            else []
+        ),
+        "<h2>Risk audit (last 10 days)</h2>",
+        _table(_audit_tail(risk_audit)) if risk_audit is not None else "<p>(no audit)</p>",
+        *(
+            ["<h2>Ex-ante risk contributions (last bar)</h2>", _table(_risk_contrib_table(rc))]
+            if (rc := results.get("risk_contrib")) is not None and len(rc)
+            else []
+        ),
+        *(
+            ["<h2>Stress scenarios (latest plan)</h2>", _table(stress_table(st).astype(object).fillna(""))]
+            if (st := results.get("stress")) is not None and len(st)
+            else []
+        ),
+        "<h2>Latest holdings (top 10 weights)</h2>",
+        _table(top),
+        "<h2>Monthly returns (%)</h2>",
+        _table(mtab),
+        "<h2>Agent decision (risk-gated execution)</h2>",
+        agent_html,
+        (
+            f"<p class='note'>Series downsampled with LTTB to ≤{max_points} points each. "
+            "Research backtest, not investment advice.</p>"
+        ),
+    ]
+
+    doc = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>TradeAgentLab Report: {html.escape(name)}</title>
+<script type="text/javascript">{get_plotlyjs()}</script>
+<style>
+body {{ font-family: system-ui, sans-serif; max-width: 1100px; margin: 2em auto; color: #222; }}
+.tbl {{ border-collapse: collapse; font-size: 0.9em; margin: 0.5em 0 1.5em; }}
+.tbl th, .tbl td {{ padding: 3px 8px; border-bottom: 1px solid #ddd; text-align: right; }}
+.note {{ color: #666; font-size: 0.85em; }}
+</style>
+</head>
+<body>
+{chr(10).join(sections)}
+</body>
+</html>
+"""
+    path = out_dir / f"{name}_report.html"
+    path.write_text(doc, encoding="utf-8")
+    return path
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_COLUMNS = ["n", "cagr", "vol", "sharpe", "mdd", "beta", "alpha"]
+
+
+def _rolling_sums(tail: np.ndarray, block: np.ndarray, w: int) -> np.ndarray:
+    """Trailing `w`-row sums for each row of `block`, given the previous `w-1` rows in `tail`.
+
+    One cumsum over (tail + block) and a shifted difference: O(1) per row and column.
+    Rows whose window reaches before the start of the series are NaN.
+    """
+    s = np.concatenate([tail, block], axis=0)
+    c = np.concatenate([np.zeros((1,) + s.shape[1:]), np.cumsum(s, axis=0)], axis=0)
+    hi = np.arange(len(tail) + 1, len(s) + 1)
+    lo = hi - w
+    out = np.full((len(block),) + s.shape[1:], np.nan)
+    ok = lo >= 0
+    out[ok] = c[hi[ok]] - c[lo[ok]]
+    return out
+
+
+class MetricsEngine:
+    """Streaming report statistics for a (date × series) returns matrix.
+
+    Rows are fed in time order through `update` in blocks of any size; all state needed
+    to continue (equity/peak, Welford moments, benchmark co-moments, the last rows of
+    each rolling window, the open month) is carried between blocks. Per-row work is O(1)
+    per series, so one pass covers full-sample stats, rolling vol/Sharpe, rolling
+    beta/alpha and monthly returns.
+
+    Conventions match the original report: full-sample vol/Sharpe use ddof=1, rolling
+    vol/Sharpe and all beta/alpha use ddof=0, beta needs >=20 paired observations.
+    """
+
+    def __init__(
+        self,
+        n_series: int,
+        bench_col: int | None = None,
+        window: int = 20,
+        beta_window: int = 63,
+        ann: float = 252,
+    ) -> None:
+        k = n_series
+        self.bench_col = bench_col
+        self.window = window
+        self.beta_window = beta_window
+        self.ann = ann
+
+        self.equity = np.ones(k)
+        self.peak = np.zeros(k)  # peak over observed equity only (first bar's equity sets it)
+        self.mdd = np.zeros(k)
+
+        # Full-sample Welford moments (NaN rows skipped per series)
+        self.n = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+
+        # Co-moments vs the benchmark over rows where both are present
+        self.pn = np.zeros(k)
+        self.pmx = np.zeros(k)
+        self.pmy = np.zeros(k)
+        self.pcxx = np.zeros(k)
+        self.pcxy = np.zeros(k)
+
+        self._tail = np.empty((0, k))
+        self._month: int | None = None
+        self._month_log = np.zeros(k)
+        self._months: list[int] = []
+        self._month_rets: list[np.ndarray] = []
+
+    def update(self, values: np.ndarray, month_ids: np.ndarray) -> dict[str, np.ndarray]:
+        """Consume a block of rows; return per-row series for that block."""
+        x = np.asarray(values, dtype=float)
+        valid = ~np.isnan(x)
+        z = np.where(valid, x, 0.0)
+        out: dict[str, np.ndarray] = {}
+
+        # Equity / drawdown
+        eq = self.equity * np.cumprod(1.0 + z, axis=0)
+        peak = np.maximum.accumulate(np.concatenate([self.peak[None, :], eq], axis=0), axis=0)[1:]
+        dd = eq / peak - 1.0
+        if len(x):
+            self.equity, self.peak = eq[-1], peak[-1]
+            self.mdd = np.minimum(self.mdd, dd.min(axis=0))
+        out["equity"], out["drawdown"] = eq, dd
+
+        # Full-sample moments (Chan et al. block merge)
+        nb = valid.sum(axis=0)
+        mb = z.sum(axis=0) / np.maximum(nb, 1)
+        m2b = (np.where(valid, x - mb, 0.0) ** 2).sum(axis=0)
+        n_new = self.n + nb
+        delta = mb - self.mean
+        self.mean = self.mean + delta * nb / np.maximum(n_new, 1)
+        self.m2 = self.m2 + m2b + delta**2 * self.n * nb / np.maximum(n_new, 1)
+        self.n = n_new
+
+        # Rolling vol / Sharpe (window rows must all be present, like min_periods=window)
+        w = self.window
+        tail = self._tail[max(0, len(self._tail) - (w - 1)) :]
+        tv = ~np.isnan(tail)
+        cnt = _rolling_sums(tv.astype(float), valid.astype(float), w)
+        s1 = _rolling_sums(np.where(tv, tail, 0.0), z, w)
+        s2 = _rolling_sums(np.where(tv, tail, 0.0) ** 2, z**2, w)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            m = s1 / w
+            sd = np.sqrt(np.maximum(s2 / w - m**2, 0.0))
+            full = cnt == w
+            out["rolling_vol"] = np.where(full, sd * np.sqrt(self.ann), np.nan)
+            out["rolling_sharpe"] = np.where(full & (sd > 1e-12), m / sd * np.sqrt(self.ann), np.nan)
+
+        if self.bench_col is not None:
+            self._update_bench(x, valid, out)
+
+        # Monthly compounding; the last (possibly partial) month stays open across blocks
+        logs = np.log1p(z)
+        if len(x):
+            cut = np.flatnonzero(np.diff(month_ids)) + 1
+            starts = np.concatenate([[0], cut])
+            seg_logs = np.add.reduceat(logs, starts, axis=0)
+            for i, s in enumerate(starts):
+                mid = int(month_ids[s])
+                if self._month is not None and mid != self._month:
+                    self._months.append(self._month)
+                    self._month_rets.append(np.expm1(self._month_log))
+                    self._month_log = np.zeros_like(self._month_log)
+                self._month = mid
+                self._month_log = self._month_log + seg_logs[i]
+
+        keep = max(self.window, self.beta_window) - 1
+        self._tail = np.concatenate([self._tail, x], axis=0)[-keep:] if keep > 0 else self._tail[:0]
+        return out
+
+    def _update_bench(self, x: np.ndarray, valid: np.ndarray, out: dict) -> None:
+        j = self.bench_col
+        bx = x[:, j : j + 1]
+        pv = valid & valid[:, j : j + 1]
+        xb = np.where(pv, bx, 0.0)
+        yb = np.where(pv, x, 0.0)
+
+        # Full-sample co-moments
+        nb = pv.sum(axis=0)
+        mxb = xb.sum(axis=0) / np.maximum(nb, 1)
+        myb = yb.sum(axis=0) / np.maximum(nb, 1)
+        cxx = (np.where(pv, bx - mxb, 0.0) ** 2).sum(axis=0)
+        cxy = (np.where(pv, (bx - mxb) * (x - myb), 0.0)).sum(axis=0)
+        n_new = self.pn + nb
+        dx, dy = mxb - self.pmx, myb - self.pmy
+        f = self.pn * nb / np.maximum(n_new, 1)
+        self.pcxx = self.pcxx + cxx + dx * dx * f
+        self.pcxy = self.pcxy + cxy + dx * dy * f
+        self.pmx = self.pmx + dx * nb / np.maximum(n_new, 1)
+        self.pmy = self.pmy + dy * nb / np.maximum(n_new, 1)
+        self.pn = n_new
+
+        # Rolling beta / alpha over paired rows
+        w = self.beta_window
+        tail = self._tail[max(0, len(self._tail) - (w - 1)) :]
+        tpv = ~np.isnan(tail) & ~np.isnan(tail[:, j : j + 1])
+        tx = np.where(tpv, tail[:, j : j + 1], 0.0)
+        ty = np.where(tpv, tail, 0.0)
+        cnt = _rolling_sums(tpv.astype(float), pv.astype(float), w)
+        sx = _rolling_sums(tx, xb, w)
+        sy = _rolling_sums(ty, yb, w)
+        sxx = _rolling_sums(tx * tx, xb * xb, w)
+        sxy = _rolling_sums(tx * ty, xb * yb, w)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mx, my = sx / w, sy / w
+            var = sxx / w - mx * mx
+            cov = sxy / w - mx * my
+            ok = (cnt == w) & (var > 1e-12)
+            beta = np.where(ok, cov / var, np.nan)
+            out["rolling_beta"] = beta
+            out["rolling_alpha"] = np.where(ok, (my - beta * mx) * self.ann, np.nan)
+
+    def monthly(self) -> tuple[list[int], np.ndarray]:
+        """Closed months plus the open one: (month ids, returns[month, series])."""
+        months = list(self._months)
+        rets = list(self._month_rets)
+        if self._month is not None:
+            months.append(self._month)
+            rets.append(np.expm1(self._month_log))
+        return months, np.array(rets).reshape(len(months), len(self.equity))
+
+    def summary(self) -> np.ndarray:
+        """Full-sample stats per series, columns as `SUMMARY_COLUMNS`."""
+        ann = self.ann
+        n = self.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cagr = np.where(n > 0, self.equity ** (ann / np.maximum(n, 1)) - 1.0, 0.0)
+            std = np.sqrt(self.m2 / (n - 1))
+            vol = np.where(n > 0, std * np.sqrt(ann), 0.0)
+            sharpe = np.where(n > 0, self.mean / (std + 1e-12) * np.sqrt(ann), 0.0)
+            var = self.pcxx / np.maximum(self.pn, 1)
+            ok = (self.pn >= 20) & (var >= 1e-12)
+            beta = np.where(ok, self.pcxy / np.where(ok, self.pcxx, 1.0), 0.0)
+            alpha = np.where(ok, (self.pmy - beta * self.pmx) * ann, 0.0)
+        return np.column_stack([n, cagr, vol, sharpe, self.mdd, beta, alpha])
+
+
+@dataclass
+class ReportMetrics:
+    """Everything `report.basic` needs, for every series, from one streaming pass."""
+
+    equity: pd.DataFrame  # growth of 1
+    drawdown: pd.DataFrame
+    rolling_vol: pd.DataFrame
+    rolling_sharpe: pd.DataFrame
+    rolling_beta: pd.DataFrame | None
+    rolling_alpha: pd.DataFrame | None
+    monthly: pd.DataFrame  # month-end × series
+    summary: pd.DataFrame  # series × SUMMARY_COLUMNS
+    window: int
+    beta_window: int
+    unit: str = "D"  # window label suffix, see BarFrequency.unit
+
+
+def compute_metrics(
+    returns: pd.DataFrame | pd.Series,
+    benchmark: pd.Series | None = None,
+    window: int = 20,
+    beta_window: int = 63,
+    ann: float = 252,
+    chunk_size: int = 4096,
+    bench_name: str = "benchmark",
+    unit: str = "D",
+) -> ReportMetrics:
+    """Run `MetricsEngine` over a returns matrix (strategy, benchmark or many strategies).
+
+    A Series is treated as one strategy column named `strategy`. If `benchmark` is given it
+    is appended as column `bench_name` and every column gets beta/alpha against it.
+    """
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame("strategy")
+    frame = returns.astype(float)
+    if benchmark is not None:
+        idx = frame.index.union(benchmark.index)
+        frame = frame.reindex(idx)
+        frame[bench_name] = benchmark.reindex(idx).astype(float)
+    cols = list(frame.columns)
+    idx = frame.index
+
+    values = frame.to_numpy(dtype=float)
+    month_ids = (idx.year * 12 + idx.month - 1).to_numpy()
+    engine = MetricsEngine(
+        len(cols),
+        bench_col=(len(cols) - 1 if benchmark is not None else None),
+        window=window,
+        beta_window=beta_window,
+        ann=ann,
+    )
+
+    parts: dict[str, list[np.ndarray]] = {}
+    # (an empty input still runs one empty block so every output frame exists)
+    for lo in range(0, len(values), chunk_size) or [0]:
+        hi = lo + chunk_size
+        for k, v in engine.update(values[lo:hi], month_ids[lo:hi]).items():
+            parts.setdefault(k, []).append(v)
+
+    def _frame(key: str) -> pd.DataFrame | None:
+        if key not in parts:
+            return None
+        return pd.DataFrame(np.concatenate(parts[key], axis=0), index=idx, columns=cols)
+
+    months, mrets = engine.monthly()
+    month_end = pd.DatetimeIndex(
+        [pd.Timestamp(m // 12, m % 12 + 1, 1) + pd.offsets.MonthEnd(0) for m in months]
+    )
+
+    return ReportMetrics(
+        equity=_frame("equity"),
+        drawdown=_frame("drawdown"),
+        rolling_vol=_frame("rolling_vol"),
+        rolling_sharpe=_frame("rolling_sharpe"),
+        rolling_beta=_frame("rolling_beta"),
+        rolling_alpha=_frame("rolling_alpha"),
+        monthly=pd.DataFrame(mrets, index=month_end, columns=cols),
+        summary=pd.DataFrame(engine.summary(), index=cols, columns=SUMMARY_COLUMNS),
+        window=window,
+        beta_window=beta_window,
+        unit=unit,
+    )
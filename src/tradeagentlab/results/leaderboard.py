@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import operator
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.results.store import RESULTS_DIR, read_results, read_runs_meta
+
+_OPS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+_FILTER_RE = re.compile(r"^\s*(\w+)\s*(>=|<=|==|!=|>|<)\s*(.+?)\s*$")
+
+
+def leaderboard_metrics(
+    returns: pd.DataFrame,
+    bench_returns: pd.DataFrame | None = None,
+    turnover: pd.DataFrame | None = None,
+    ann: int = 252,
+) -> pd.DataFrame:
+    """Performance stats for many runs at once.
+
+    Inputs are date × run matrices (NaN outside a run's span). Every statistic is a
+    column-wise array reduction, so thousands of runs cost a handful of numpy passes.
+    Definitions match `report.basic` (sample std for vol/Sharpe, population cov for beta).
+    """
+    R = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(R)
+    n = valid.sum(axis=0)
+    Rz = np.where(valid, R, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_growth = np.log1p(Rz).sum(axis=0)
+        cagr = np.where(n > 0, np.exp(log_growth * ann / np.maximum(n, 1)) - 1.0, 0.0)
+
+        mean = Rz.sum(axis=0) / np.maximum(n, 1)
+        dev = np.where(valid, R - mean, 0.0)
+        std = np.sqrt((dev**2).sum(axis=0) / np.maximum(n - 1, 1))
+        vol = std * np.sqrt(ann)
+        sharpe = mean / (std + 1e-12) * np.sqrt(ann)
+
+        # Peak over each run's own span (rows before its first return are NaN)
+        started = np.cumsum(valid, axis=0) > 0
+        equity = np.where(started, np.cumprod(1.0 + Rz, axis=0), np.nan)
+        dd = equity / np.fmax.accumulate(equity, axis=0) - 1.0
+        mdd = np.where(started, dd, 0.0).min(axis=0, initial=0.0)
+
+    out = pd.DataFrame(
+        {"n_days": n, "cagr": cagr, "vol": vol, "sharpe": sharpe, "mdd": mdd},
+        index=returns.columns,
+    )
+
+    if bench_returns is not None:
+        B = bench_returns.reindex(index=returns.index, columns=returns.columns).to_numpy(dtype=float)
+        both = valid & ~np.isnan(B)
+        m = both.sum(axis=0)
+        x = np.where(both, B, 0.0)
+        y = np.where(both, R, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mx = x.sum(axis=0) / np.maximum(m, 1)
+            my = y.sum(axis=0) / np.maximum(m, 1)
+            var = (x * x).sum(axis=0) / np.maximum(m, 1) - mx * mx
+            cov = (x * y).sum(axis=0) / np.maximum(m, 1) - mx * my
+            ok = (m >= 20) & (var >= 1e-12)
+            beta = np.where(ok, cov / np.where(ok, var, 1.0), 0.0)
+            alpha = np.where(ok, (my - beta * mx) * ann, 0.0)
+        out["beta"] = beta
+        out["alpha"] = alpha
+
+    if turnover is not None:
+        T = turnover.reindex(index=returns.index, columns=returns.columns).to_numpy(dtype=float)
+        with np.errstate(invalid="ignore"):
+            out["turnover_ann"] = np.nan_to_num(np.nanmean(T, axis=0)) * ann
+
+    return out
+
+
+def _apply_filters(df: pd.DataFrame, filters: list[str]) -> pd.DataFrame:
+    for f in filters:
+        m = _FILTER_RE.match(f)
+        if m is None or m.group(1) not in df.columns:
+            raise ValueError(f"Bad filter {f!r}; expected e.g. 'sharpe>0.5' on one of {list(df.columns)}")
+        col, op, raw = m.groups()
+        val: object = raw
+        if pd.api.types.is_numeric_dtype(df[col]):
+            val = float(raw)
+        df = df[_OPS[op](df[col], val)]
+    return df
+
+
+def build_leaderboard(
+    root: Path = RESULTS_DIR,
+    filters: list[str] | None = None,
+    name_contains: str | None = None,
+    sort_by: str = "sharpe",
+    ascending: bool = False,
+    top: int | None = None,
+) -> pd.DataFrame:
+    """Load the results dataset, stack returns into date × run matrices and rank runs."""
+    meta = read_runs_meta(root)
+    run_ids = None
+    if name_contains and "name" in meta.columns:
+        run_ids = meta.index[meta["name"].astype(str).str.contains(name_contains, regex=False)].tolist()
+
+    long = read_results(root, columns=["portfolio_return", "benchmark_return", "turnover"], run_ids=run_ids)
+    if long.empty:
+        return pd.DataFrame()
+
+    long["run_id"] = long["run_id"].astype(str)
+    wide = long.pivot(
+        index="date",
+        columns="run_id",
+        values=["portfolio_return", "benchmark_return", "turnover"],
+    ).sort_index()
+    board = leaderboard_metrics(
+        wide["portfolio_return"],
+        bench_returns=wide["benchmark_return"],
+        turnover=wide["turnover"],
+    )
+
+    keys = long.drop_duplicates("run_id").set_index("run_id")["config_hash"]
+    board.insert(0, "config_hash", keys.reindex(board.index))
+    for col in ["created_at", "name"]:
+        if col in meta.columns:
+            board.insert(0, col, meta[col].reindex(board.index))
+    board.index.name = "run_id"
+
+    board = _apply_filters(board, filters or [])
+    if sort_by not in board.columns:
+        raise ValueError(f"Unknown sort column {sort_by!r}; choose from {list(board.columns)}")
+    board = board.sort_values(sort_by, ascending=ascending)
+    return board.head(top) if top else board
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+RESULTS_DIR = Path(".cache/results")
+
+# Hive partition keys; typed explicitly so hex hashes / numeric-looking ids stay strings.
+PARTITIONING = ds.partitioning(
+    pa.schema([("config_hash", pa.string()), ("run_id", pa.string())]), flavor="hive"
+)
+
+AUDIT_COLUMNS = ["scale", "vol_est_ann", "drawdown", "killed", "clipped", "reason"]
+RUN_COLUMNS = ["date", "portfolio_return", "benchmark_return", "exposure", "turnover", "cost"]
+
+
+def config_hash(obj: dict) -> str:
+    """Stable short hash of a (JSON-able) config dict."""
+    blob = json.dumps(obj, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def run_frame(results: dict) -> pd.DataFrame:
+    """Flatten one backtest's daily series into a long-format frame (one row per date)."""
+    port_ret: pd.Series = results["portfolio_returns"]
+    idx = port_ret.index
+    bench_ret = results.get("benchmark_returns")
+    audit = results.get("risk_audit")
+
+    df = pd.DataFrame(
+        {
+            "date": idx,
+            "portfolio_return": port_ret.to_numpy(dtype=float),
+            "benchmark_return": (
+                bench_ret.reindex(idx).to_numpy(dtype=float) if bench_ret is not None else float("nan")
+            ),
+            "exposure": results["weights"].sum(axis=1).reindex(idx).to_numpy(dtype=float),
+            "turnover": results["turnover"].reindex(idx).to_numpy(dtype=float),
+            "cost": results["cost"].reindex(idx).to_numpy(dtype=float),
+        }
+    )
+    if audit is not None:
+        for c in AUDIT_COLUMNS:
+            if c in audit.columns:
+                df[c] = audit[c].reindex(idx).to_numpy()
+    return df
+
+
+def write_run_results(
+    results: dict,
+    run_id: str,
+    cfg_hash: str,
+    meta: dict | None = None,
+    root: Path = RESULTS_DIR,
+) -> Path:
+    """Write one run into the partitioned results dataset.
+
+    Layout (hive partitions, readable with `pyarrow.dataset`):
+      root/config_hash=<hash>/run_id=<id>/part-0.parquet
+      root/_runs/<id>.json   (run metadata; ignored by the dataset scan)
+
+    Writes are atomic and idempotent: re-writing a run id replaces its file.
+    """
+    part_dir = root / f"config_hash={cfg_hash}" / f"run_id={run_id}"
+    part_dir.mkdir(parents=True, exist_ok=True)
+    path = part_dir / "part-0.parquet"
+    tmp = part_dir / f".part-0.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pandas(run_frame(results), preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+    runs_dir = root / "_runs"
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = runs_dir / f"{run_id}.json"
+    meta_tmp = runs_dir / f".{run_id}.{os.getpid()}.tmp"
+    meta_tmp.write_text(json.dumps({"run_id": run_id, "config_hash": cfg_hash, **(meta or {})}, default=str))
+    os.replace(meta_tmp, meta_path)
+    return path
+
+
+def read_runs_meta(root: Path = RESULTS_DIR) -> pd.DataFrame:
+    """One row per run with its metadata (name, created_at, config, ...)."""
+    rows = [json.loads(p.read_text()) for p in sorted((root / "_runs").glob("*.json"))]
+    if not rows:
+        return pd.DataFrame(columns=["run_id", "config_hash"])
+    return pd.DataFrame(rows).set_index("run_id", drop=False)
+
+
+def read_results(
+    root: Path = RESULTS_DIR,
+    columns: list[str] | None = None,
+    run_ids: list[str] | None = None,
+) -> pd.DataFrame:
+    """Read the stacked long-format results (columns + `config_hash`, `run_id`).
+
+    A missing or empty results directory (or an empty `run_ids`) reads as an empty frame.
+    """
+    cols = None if columns is None else list(dict.fromkeys(["date", *columns, "config_hash", "run_id"]))
+    if run_ids == [] or not any(Path(root).glob("config_hash=*/run_id=*/*.parquet")):
+        return pd.DataFrame(columns=cols or [*RUN_COLUMNS, *AUDIT_COLUMNS, "config_hash", "run_id"])
+    dset = ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+    flt = ds.field("run_id").isin(run_ids) if run_ids is not None else None
+    return dset.to_table(columns=cols, filter=flt).to_pandas()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+class EWMACovariance:
+    """Exponentially weighted covariance of asset returns, updated one bar at a time.
+
+    Each `update` is a rank-1 decay-and-add (O(N²)); nothing is recomputed over a window.
+    Returns are treated as zero-mean (RiskMetrics convention) and the estimate is
+    bias-corrected for the short history at start-up. Optional shrinkage blends the
+    sample matrix towards its diagonal: S = (1 - δ)·C + δ·diag(C).
+    """
+
+    def __init__(self, n_assets: int, halflife: float, shrinkage: float = 0.0) -> None:
+        if halflife <= 0:
+            raise ValueError("halflife must be > 0")
+        if not 0.0 <= shrinkage <= 1.0:
+            raise ValueError("shrinkage must be in [0, 1]")
+        self.lam = 0.5 ** (1.0 / halflife)
+        self.shrinkage = shrinkage
+        self._c = np.zeros((n_assets, n_assets))
+        self._wsum = 0.0  # 1 - lam**n, for bias correction
+        self.n_obs = 0
+
+    def update(self, r: np.ndarray) -> None:
+        """Fold in one bar of asset returns (NaN treated as 0)."""
+        x = np.nan_to_num(np.asarray(r, dtype=float))
+        self._c *= self.lam
+        self._c += (1.0 - self.lam) * np.outer(x, x)
+        self._wsum = self.lam * self._wsum + (1.0 - self.lam)
+        self.n_obs += 1
+
+    @property
+    def covariance(self) -> np.ndarray:
+        if self._wsum == 0.0:
+            return np.zeros_like(self._c)
+        c = self._c / self._wsum
+        if self.shrinkage:
+            c = (1.0 - self.shrinkage) * c + self.shrinkage * np.diag(np.diag(c))
+        return c
+
+    def matvec(self, w: np.ndarray) -> np.ndarray:
+        """S·w without materializing the shrunk matrix."""
+        if self._wsum == 0.0:
+            return np.zeros_like(w, dtype=float)
+        cw = self._c @ w
+        if self.shrinkage:
+            cw = (1.0 - self.shrinkage) * cw + self.shrinkage * np.diag(self._c) * w
+        return cw / self._wsum
+
+    def portfolio_var(self, w: np.ndarray) -> float:
+        return float(w @ self.matvec(w))
+
+    def risk_contributions(self, w: np.ndarray) -> np.ndarray:
+        """Per-asset contributions to portfolio vol: w_i·(S·w)_i / σ_p (they sum to σ_p)."""
+        sw = self.matvec(w)
+        var = float(w @ sw)
+        if var <= 0.0:
+            return np.zeros_like(sw)
+        return w * sw / np.sqrt(var)
+
+
+def ewma_portfolio_risk(
+    asset_returns: np.ndarray,
+    weights: np.ndarray,
+    halflife: float,
+    shrinkage: float = 0.0,
+    min_periods: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Ex-ante per-bar portfolio vol and per-asset vol contributions (both per-bar units).
+
+    At bar t the covariance includes returns up to t and is applied to `weights[t]`, i.e.
+    the book that will be held over t+1. Rows before `min_periods` are NaN.
+    """
+    R = np.asarray(asset_returns, dtype=float)
+    W = np.asarray(weights, dtype=float)
+    T, n = R.shape
+    vol = np.full(T, np.nan)
+    contrib = np.full((T, n), np.nan)
+    cov = EWMACovariance(n, halflife=halflife, shrinkage=shrinkage)
+    for t in range(T):
+        cov.update(R[t])
+        if t + 1 < min_periods:
+            continue
+        sw = cov.matvec(W[t])
+        var = float(W[t] @ sw)
+        vol[t] = np.sqrt(max(var, 0.0))
+        contrib[t] = W[t] * sw / vol[t] if vol[t] > 0 else 0.0
+    return vol, contrib
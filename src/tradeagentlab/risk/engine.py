@@ -1,94 +1,311 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import numpy as np
 import pandas as pd
 
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.portfolio.rebalance import RebalanceConfig, apply_rebalance
+from tradeagentlab.risk.covariance import ewma_portfolio_risk
+
+
+@dataclass
+class GroupCap:
+    tickers: list[str]
+    cap: float  # max summed base weight of the group
+
 
 @dataclass
 class RiskConfig:
     # Vol targeting
     target_vol_ann: float = 0.12  # e.g. 12% annualized
-    vol_lookback: int = 20
+    vol_lookback: int = 20  # trading days (converted to bars by BarFrequency)
     max_leverage: float = 1.0  # keep <=1 for long-only cash+equities
+    # realized: rolling std of unscaled strategy returns
+    # ewma: ex-ante sqrt(w' Σ w) from an incrementally updated EWMA covariance of assets
+    vol_model: str = "realized"
+    cov_halflife: float = 20.0  # trading days
+    cov_shrinkage: float = 0.0  # blend towards the diagonal, 0..1
 
     # Drawdown kill switch
     dd_kill: float = 0.20  # kill if drawdown <= -20%
     dd_recover: float | None = None  # if set, re-enable when drawdown > -dd_recover
 
+    # Cross-sectional overlays on the base weights (all off by default)
+    ticker_vol_cap: float | None = None  # annualized per-name vol above which a name is cut
+    ticker_vol_mode: str = "scale"  # scale (w *= cap/vol) | reject (w = 0)
+    ticker_vol_lookback: int = 20  # trading days (same 20D vol as the research note)
+    groups: dict[str, GroupCap] = field(default_factory=dict)  # name → summed-weight cap
+    # Day-level cap on executed gross exposure (applied with vol targeting)
+    max_gross: float | None = None
+
+
+def read_risk_config(rk: dict, agent: dict | None = None, dd_kill: float = 0.20) -> RiskConfig:
+    """`RiskConfig` from a YAML `risk:` section.
+
+    `ticker_vol_cap: agent` mirrors the agent gate (`agent.max_ticker_vol_ann` /
+    `agent.vol_cap_mode`) so backtest equity reflects the same per-ticker cap.
+    """
+    agent = agent or {}
+    cap = rk.get("ticker_vol_cap")
+    mode = str(rk.get("ticker_vol_mode", "scale"))
+    if cap == "agent":
+        if "max_ticker_vol_ann" not in agent:
+            raise ValueError("risk.ticker_vol_cap: agent needs agent.max_ticker_vol_ann")
+        cap = agent["max_ticker_vol_ann"]
+        mode = str(agent.get("vol_cap_mode", mode))
+    return RiskConfig(
+        target_vol_ann=float(rk.get("target_vol_ann", 0.12)),
+        vol_lookback=int(rk.get("vol_lookback", 20)),
+        max_leverage=float(rk.get("max_leverage", 1.0)),
+        vol_model=str(rk.get("vol_model", "realized")),
+        cov_halflife=float(rk.get("cov_halflife", 20)),
+        cov_shrinkage=float(rk.get("cov_shrinkage", 0.0)),
+        dd_kill=float(rk.get("dd_kill", dd_kill)),
+        dd_recover=(float(rk["dd_recover"]) if "dd_recover" in rk and rk["dd_recover"] is not None else None),
+        ticker_vol_cap=(float(cap) if cap is not None else None),
+        ticker_vol_mode=mode,
+        ticker_vol_lookback=int(rk.get("ticker_vol_lookback", 20)),
+        groups={
+            name: GroupCap(tickers=[str(t) for t in g["tickers"]], cap=float(g["cap"]))
+            for name, g in (rk.get("groups") or {}).items()
+        },
+        max_gross=(float(rk["max_gross"]) if rk.get("max_gross") is not None else None),
+    )
+
+
+def ticker_vol_factor(vol: np.ndarray, cap: float, mode: str = "scale") -> np.ndarray:
+    """Per-name multiplier of the vol cap: cap/vol (scale) or 0 (reject) where vol > cap."""
+    if mode not in ("scale", "reject"):
+        raise ValueError(f"Unknown ticker_vol_mode {mode!r} (scale|reject)")
+    over = vol > cap  # NaN vol (warm-up) → not capped
+    if mode == "reject":
+        return np.where(over, 0.0, 1.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(over, cap / vol, 1.0)
 
-def apply_risk(
-    base_weights: pd.DataFrame,
-    asset_returns: pd.DataFrame,
-    transaction_cost_bps: float,
-    cfg: RiskConfig,
-) -> dict:
-    """Apply simple risk overlays:
 
-    - Vol targeting: scale exposure based on rolling vol of *unscaled* strategy returns.
-    - Drawdown kill switch: set exposure=0 when drawdown breaches threshold.
+def group_membership(tickers: list[str], groups: dict[str, GroupCap]) -> tuple[np.ndarray, np.ndarray]:
+    """(G×N membership mask, G caps) for `tickers`; names outside the universe are ignored."""
+    pos = {str(t): i for i, t in enumerate(tickers)}
+    m = np.zeros((len(groups), len(tickers)), dtype=bool)
+    for g, grp in enumerate(groups.values()):
+        m[g, [pos[t] for t in grp.tickers if t in pos]] = True
+    return m, np.array([grp.cap for grp in groups.values()], dtype=float)
 
-    Returns dict with scaled weights, portfolio returns, and an audit log.
+
+def group_cap_factor(w: np.ndarray, membership: np.ndarray, caps: np.ndarray) -> np.ndarray:
+    """Per-name multiplier (T×N) that scales each over-cap group down to its cap.
+
+    A name in several groups takes the tightest of their factors.
     """
+    gsum = w @ membership.T  # T×G
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gf = np.where(gsum > caps, caps / gsum, 1.0)
+    return np.where(membership[None, :, :], gf[:, :, None], 1.0).min(axis=1, initial=1.0)
 
-    # Base (unscaled) portfolio returns (no costs)
-    base_port_ret = (base_weights.shift(1).fillna(0.0) * asset_returns).sum(axis=1)
 
-    # Rolling vol estimate (annualized)
-    roll = base_port_ret.rolling(cfg.vol_lookback, min_periods=cfg.vol_lookback)
-    vol_est = roll.std(ddof=0) * np.sqrt(252)
+def cross_sectional_overlays(
+    w: np.ndarray,
+    asset_vol: np.ndarray | None,
+    cfg: RiskConfig,
+    tickers: list[str],
+) -> tuple[np.ndarray, np.ndarray | None, dict[str, np.ndarray]]:
+    """Per-ticker overlays on base weights (T×N), in order: ticker vol cap → group caps.
+
+    Returns the capped weights, the group-cap multiplier (None without groups) and
+    per-overlay audit columns (`<overlay>_names` binding, `<overlay>_cut` weight removed).
+    """
+    audit: dict[str, np.ndarray] = {}
+    group_f = None
+    if cfg.ticker_vol_cap is not None:
+        f = ticker_vol_factor(asset_vol, cfg.ticker_vol_cap, cfg.ticker_vol_mode)
+        capped = w * f
+        audit["ticker_vol_names"] = ((f < 1.0) & (w != 0)).sum(axis=1)
+        audit["ticker_vol_cut"] = np.abs(w).sum(axis=1) - np.abs(capped).sum(axis=1)
+        w = capped
+    if cfg.groups:
+        m, caps = group_membership(tickers, cfg.groups)
+        group_f = group_cap_factor(w, m, caps)
+        capped = w * group_f
+        audit["group_cap_names"] = ((group_f < 1.0) & (w != 0)).sum(axis=1)
+        audit["group_cap_cut"] = np.abs(w).sum(axis=1) - np.abs(capped).sum(axis=1)
+        w = capped
+    return w, group_f, audit
+
+
+def _overlays(
+    base_weights: pd.DataFrame, asset_returns: pd.DataFrame, cfg: RiskConfig, freq: BarFrequency
+) -> tuple[pd.DataFrame, pd.DataFrame | None, dict[str, np.ndarray]]:
+    """Steps 1-2 of `apply_risk` (ticker vol cap, group caps) on the whole panel."""
+    if cfg.ticker_vol_cap is None and not cfg.groups:
+        return base_weights, None, {}
+    idx = base_weights.index
+    asset_vol = None
+    if cfg.ticker_vol_cap is not None:
+        n = freq.bars(cfg.ticker_vol_lookback)
+        asset_vol = (asset_returns.rolling(n).std(ddof=0) * freq.ann_factor).to_numpy(dtype=float)
+    w, gf, overlay_audit = cross_sectional_overlays(
+        base_weights.to_numpy(dtype=float), asset_vol, cfg, [str(c) for c in base_weights.columns]
+    )
+    group_factor = pd.DataFrame(gf, index=idx, columns=base_weights.columns) if gf is not None else None
+    return pd.DataFrame(w, index=idx, columns=base_weights.columns), group_factor, overlay_audit
+
+
+def _vol_estimate(
+    base_weights: pd.DataFrame,
+    base_port_ret: pd.Series,
+    asset_returns: pd.DataFrame,
+    cfg: RiskConfig,
+    freq: BarFrequency,
+) -> tuple[pd.Series, pd.DataFrame | None]:
+    """Annualized vol estimate per bar (and EWMA risk contributions of the base weights)."""
+    idx = base_weights.index
+    window = freq.bars(cfg.vol_lookback)
+    if cfg.vol_model == "ewma":
+        vol_bar, contrib_bar = ewma_portfolio_risk(
+            asset_returns.to_numpy(dtype=float),
+            base_weights.to_numpy(dtype=float),
+            halflife=freq.bars(cfg.cov_halflife),
+            shrinkage=cfg.cov_shrinkage,
+            min_periods=window,
+        )
+        vol_est = pd.Series(vol_bar * freq.ann_factor, index=idx)
+        return vol_est, pd.DataFrame(contrib_bar * freq.ann_factor, index=idx, columns=base_weights.columns)
+    if cfg.vol_model == "realized":
+        roll = base_port_ret.rolling(window, min_periods=window)
+        return roll.std(ddof=0) * freq.ann_factor, None
+    raise ValueError(f"Unknown vol_model {cfg.vol_model!r} (realized|ewma)")
 
-    # Exposure scaling: target_vol / vol_est, clipped
+
+def _exposure_scale(
+    vol_est: pd.Series, base_weights: pd.DataFrame, cfg: RiskConfig
+) -> tuple[pd.Series, pd.Series, np.ndarray | None]:
+    """(raw scale, clipped scale, max_gross binding mask) from the vol estimate."""
     raw_scale = cfg.target_vol_ann / vol_est
     scale = raw_scale.clip(lower=0.0, upper=cfg.max_leverage)
-    scale = scale.fillna(0.0)
+    gross_capped = None
+    if cfg.max_gross is not None:
+        gross = base_weights.abs().sum(axis=1)
+        gross_cap = (cfg.max_gross / gross).where(gross > 0, np.inf)
+        gross_capped = (scale > gross_cap).to_numpy()
+        scale = scale.where(~gross_capped, gross_cap)
+    return raw_scale, scale.fillna(0.0), gross_capped
 
-    # Apply drawdown kill switch on the scaled (pre-cost) equity
-    pre_cost_scaled_ret = scale.shift(1).fillna(0.0) * base_port_ret
-    pre_cost_equity = (1.0 + pre_cost_scaled_ret).cumprod()
-    peak = pre_cost_equity.cummax()
-    dd = pre_cost_equity / peak - 1.0
 
-    killed = pd.Series(False, index=scale.index)
+def _kill_path(dd: np.ndarray, cfg: RiskConfig) -> np.ndarray:
+    """Kill/recover state over a drawdown path (the only sequential step)."""
+    killed = np.zeros(len(dd), dtype=bool)
     live = True
-    for i, t in enumerate(scale.index):
+    for i, d in enumerate(dd.tolist()):
         if not live:
             # Optionally allow recovery
-            if cfg.dd_recover is not None and dd.loc[t] > -cfg.dd_recover:
+            if cfg.dd_recover is not None and d > -cfg.dd_recover:
                 live = True
             else:
-                killed.iloc[i] = True
+                killed[i] = True
                 continue
-        if dd.loc[t] <= -cfg.dd_kill:
+        if d <= -cfg.dd_kill:
             live = False
-            killed.iloc[i] = True
+            killed[i] = True
+    return killed
 
-    scale2 = scale.mask(killed, 0.0)
-
-    # Human-readable audit reasons (for reports)
-    reason = pd.Series("", index=scale.index, dtype=object)
-    clipped_flag = pd.Series(False, index=scale.index)
 
-    for t in scale.index:
-        if killed.loc[t]:
-            reason.loc[t] = (
-                f"KILL_SWITCH: dd={dd.loc[t]:.2%} <= -{cfg.dd_kill:.0%} → scale=0"
+def _risk_audit(
+    cfg: RiskConfig,
+    idx: pd.Index,
+    killed_arr: np.ndarray,
+    dd: pd.Series,
+    vol_est: pd.Series,
+    raw_scale: pd.Series,
+    scale2: pd.Series,
+    gross_capped: np.ndarray | None,
+) -> tuple[pd.Series, pd.Series]:
+    """Human-readable per-bar audit reasons (for reports) and the clipped flag."""
+    vol_label = "vol_est" if cfg.vol_model == "realized" else "exante_vol"
+    warm = np.isnan(vol_est.to_numpy(dtype=float))
+    clipped_arr = ~killed_arr & ~warm & (np.abs(raw_scale.to_numpy(dtype=float) - scale2.to_numpy()) > 1e-9)
+    gross_note = (
+        np.where(gross_capped, f" [MAX_GROSS {cfg.max_gross:.0%}]", "")
+        if gross_capped is not None
+        else np.full(len(idx), "")
+    )
+    reason = pd.Series(
+        [
+            f"KILL_SWITCH: dd={d:.2%} <= -{cfg.dd_kill:.0%} → scale=0"
+            if k
+            else f"WARMUP: need {cfg.vol_lookback}d for vol_est → scale=0"
+            if wu
+            else (
+                f"VOL_TARGET: {vol_label}={v:.2%}, target={cfg.target_vol_ann:.2%} → "
+                f"raw_scale={rs:.2f}, scale={s2:.2f}{' (CLIPPED)' if c else ''}{gn}"
             )
-            clipped_flag.loc[t] = False
-        elif np.isnan(vol_est.loc[t]):
-            reason.loc[t] = f"WARMUP: need {cfg.vol_lookback}d for vol_est → scale=0"
-            clipped_flag.loc[t] = False
-        else:
-            rs = float(raw_scale.loc[t])
-            s2 = float(scale2.loc[t])
-            clipped = abs(rs - s2) > 1e-9
-            clipped_flag.loc[t] = clipped
-            clip_note = " (CLIPPED)" if clipped else ""
-            reason.loc[t] = (
-                f"VOL_TARGET: vol_est={vol_est.loc[t]:.2%}, target={cfg.target_vol_ann:.2%} → "
-                f"raw_scale={rs:.2f}, scale={s2:.2f}{clip_note}"
+            for k, wu, d, v, rs, s2, c, gn in zip(
+                killed_arr.tolist(),
+                warm.tolist(),
+                dd.tolist(),
+                vol_est.tolist(),
+                raw_scale.tolist(),
+                scale2.tolist(),
+                clipped_arr.tolist(),
+                gross_note.tolist(),
             )
+        ],
+        index=idx,
+        dtype=object,
+    )
+    return reason, pd.Series(clipped_arr, index=idx)
+
+
+def apply_risk(
+    base_weights: pd.DataFrame,
+    asset_returns: pd.DataFrame,
+    transaction_cost_bps: float,
+    cfg: RiskConfig,
+    freq: BarFrequency = DAILY,
+) -> dict:
+    """Apply the risk overlay pipeline in one vectorized pass over the date × ticker panel:
+
+    1. Per-ticker vol cap (`ticker_vol_cap`): names whose trailing vol exceeds the cap are
+       scaled by cap/vol or rejected, as the agent gate does for the final plan.
+    2. Group caps (`groups`): over-cap groups are scaled down to their summed-weight cap.
+    3. Vol targeting: scale exposure based on rolling vol of *unscaled* strategy returns
+       (`vol_model="realized"`), or on the ex-ante vol of today's weights under an EWMA
+       covariance of asset returns (`vol_model="ewma"`); clipped to `max_leverage` and,
+       with `max_gross`, to max_gross / gross.
+    4. Drawdown kill switch: set exposure=0 when drawdown breaches threshold.
+
+    Steps 1-2 are per-ticker multipliers and 3-4 a per-date scale, so every overlay is
+    one array operation and portfolio returns/costs are computed once at the end.
+
+    Returns dict with scaled weights, portfolio returns, and an audit log (plus
+    `<overlay>_names` / `<overlay>_cut` columns for enabled cross-sectional overlays and
+    `gross_capped` with `max_gross`). With groups it also returns `group_factor` (date ×
+    ticker multiplier for the agent gate); with the EWMA model `risk_contrib` (date ×
+    ticker annualized vol contributions of the executed weights; rows sum to the executed
+    ex-ante vol).
+    """
+    idx = base_weights.index
+    base_weights, group_factor, overlay_audit = _overlays(base_weights, asset_returns, cfg, freq)
+
+    # Base (unscaled) portfolio returns (no costs)
+    base_port_ret = (base_weights.shift(1).fillna(0.0) * asset_returns).sum(axis=1)
+
+    # Vol estimate (annualized) → exposure scale: target_vol / vol_est, clipped
+    vol_est, contrib = _vol_estimate(base_weights, base_port_ret, asset_returns, cfg, freq)
+    raw_scale, scale, gross_capped = _exposure_scale(vol_est, base_weights, cfg)
+
+    # Apply drawdown kill switch on the scaled (pre-cost) equity
+    pre_cost_scaled_ret = scale.shift(1).fillna(0.0) * base_port_ret
+    pre_cost_equity = (1.0 + pre_cost_scaled_ret).cumprod()
+    peak = pre_cost_equity.cummax()
+    dd = pre_cost_equity / peak - 1.0
+    killed_arr = _kill_path(dd.to_numpy(dtype=float), cfg)
+    killed = pd.Series(killed_arr, index=idx)
+
+    scale2 = scale.mask(killed, 0.0)
+    reason, clipped_flag = _risk_audit(cfg, idx, killed_arr, dd, vol_est, raw_scale, scale2, gross_capped)
 
     # Scaled weights and costs
     w_scaled = base_weights.mul(scale2, axis=0)
@@ -107,12 +324,93 @@ def apply_risk(
             "reason": reason,
             "turnover": turnover,
             "cost": cost,
+            **overlay_audit,
+            **({"gross_capped": gross_capped & ~killed_arr} if gross_capped is not None else {}),
         },
-        index=scale.index,
+        index=idx,
     )
 
-    return {
+    out = {
         "weights": w_scaled,
         "portfolio_returns": port_ret,
         "audit": audit,
     }
+    if group_factor is not None:
+        out["group_factor"] = group_factor
+    if contrib is not None:
+        out["risk_contrib"] = contrib.mul(scale2, axis=0)
+    return out
+
+
+def apply_risk_rebalanced(
+    base_weights: pd.DataFrame,
+    asset_returns: pd.DataFrame,
+    transaction_cost_bps: float,
+    cfg: RiskConfig,
+    rebalance: RebalanceConfig,
+    schedule: np.ndarray,
+    freq: BarFrequency = DAILY,
+) -> dict:
+    """`apply_risk` for a book that only trades on `schedule` bars (see `apply_rebalance`).
+
+    The vol-target scale is decided on rebalance bars and held until the next one, with
+    the realized model measuring the unscaled *held* (drifting) portfolio. The drawdown
+    kill switch runs on the equity of the scaled held portfolio, and a kill (or recovery)
+    forces a trade outside the schedule. The audit therefore describes the book whose
+    returns are reported.
+
+    Returns the `apply_risk` outputs plus `trades` and `rebalanced` from `apply_rebalance`.
+    """
+    idx = base_weights.index
+    schedule = np.asarray(schedule, dtype=bool)
+    base_weights, group_factor, overlay_audit = _overlays(base_weights, asset_returns, cfg, freq)
+
+    decided = pd.Series(schedule, index=idx)
+
+    def on_schedule(x):
+        return x.where(decided, axis=0).ffill()
+
+    # Unscaled held portfolio → vol estimate and scale, carried between rebalance bars
+    held = apply_rebalance(base_weights, asset_returns, schedule, rebalance)
+    vol_est, contrib = _vol_estimate(base_weights, held["portfolio_returns"], asset_returns, cfg, freq)
+    raw_scale, scale, gross_capped = _exposure_scale(vol_est, base_weights, cfg)
+    vol_est, raw_scale = on_schedule(vol_est), on_schedule(raw_scale)
+    scale = on_schedule(scale).fillna(0.0)
+    if gross_capped is not None:
+        gross_capped = on_schedule(pd.Series(gross_capped, index=idx)).fillna(False).to_numpy(dtype=bool)
+
+    # Kill switch on the scaled held (pre-cost) equity
+    scaled = apply_rebalance(base_weights.mul(scale, axis=0), asset_returns, schedule, rebalance)
+    pre_cost_equity = (1.0 + scaled["portfolio_returns"]).cumprod()
+    dd = pre_cost_equity / pre_cost_equity.cummax() - 1.0
+    killed_arr = _kill_path(dd.to_numpy(dtype=float), cfg)
+    killed = pd.Series(killed_arr, index=idx)
+
+    scale2 = scale.mask(killed, 0.0)
+    reason, clipped_flag = _risk_audit(cfg, idx, killed_arr, dd, vol_est, raw_scale, scale2, gross_capped)
+
+    # Executed book: kills and recoveries trade immediately
+    trade_bars = schedule | killed_arr | np.concatenate([[False], killed_arr[:-1]])
+    out = apply_rebalance(
+        base_weights.mul(scale2, axis=0), asset_returns, trade_bars, rebalance, transaction_cost_bps
+    )
+    out["audit"] = pd.DataFrame(
+        {
+            "scale": scale2,
+            "vol_est_ann": vol_est,
+            "drawdown": dd,
+            "killed": killed,
+            "clipped": clipped_flag,
+            "reason": reason,
+            "turnover": out["turnover"],
+            "cost": out["cost"],
+            **overlay_audit,
+            **({"gross_capped": gross_capped & ~killed_arr} if gross_capped is not None else {}),
+        },
+        index=idx,
+    )
+    if group_factor is not None:
+        out["group_factor"] = group_factor
+    if contrib is not None:
+        out["risk_contrib"] = on_schedule(contrib).mul(scale2, axis=0)
+    return out
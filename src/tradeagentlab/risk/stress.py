@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.data.bars import DAILY, BarFrequency
+from tradeagentlab.risk.covariance import EWMACovariance
+from tradeagentlab.risk.engine import RiskConfig
+
+# Historical stress windows (daily closes, inclusive)
+HISTORICAL_WINDOWS: dict[str, tuple[str, str]] = {
+    "gfc_2008": ("2008-09-01", "2009-03-09"),
+    "covid_2020": ("2020-02-19", "2020-03-23"),
+    "rates_2022": ("2022-01-03", "2022-10-12"),
+}
+
+# Synthetic shocks: a market move spread over `days` (scaled by each ticker's beta), or
+# the trailing `days` of returns replayed with volatility multiplied by `vol_mult`.
+SYNTHETIC_SHOCKS: dict[str, dict[str, float]] = {
+    "crash_20pct_10d": {"market": -0.20, "days": 10},
+    "gap_10pct_1d": {"market": -0.10, "days": 1},
+    "vol_x3_63d": {"vol_mult": 3.0, "days": 63},
+}
+
+
+@dataclass
+class StressConfig:
+    enabled: bool = True
+    historical: list[str] = field(default_factory=list)  # opt-in: names in HISTORICAL_WINDOWS (network)
+    synthetic: list[str] = field(default_factory=lambda: list(SYNTHETIC_SHOCKS))
+    beta_lookback: int = 252  # trading days of history for betas / proxies / vol warm-up
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    kind: str  # historical|synthetic
+    returns: pd.DataFrame  # day × ticker daily returns (NaN = ticker has no data)
+
+
+def load_historical_scenarios(
+    tickers: list[str],
+    names: list[str] | None = None,
+    market: str = "SPY",
+) -> list[Scenario]:
+    """Daily returns of `tickers` (+ the market) over each historical window.
+
+    Windows that cannot be loaded are skipped with a warning, so a stress run never
+    blocks the decision itself.
+    """
+    from tradeagentlab.data.yf import load_prices
+
+    cols = list(dict.fromkeys([*tickers, market]))
+    out = []
+    for name in names if names is not None else list(HISTORICAL_WINDOWS):
+        start, end = HISTORICAL_WINDOWS[name]
+        # One extra week before the window so the first day has a return
+        pre = str((pd.Timestamp(start) - pd.Timedelta(days=7)).date())
+        post = str((pd.Timestamp(end) + pd.Timedelta(days=1)).date())
+        try:
+            px = load_prices(cols, pre, post)
+        except Exception as e:  # noqa: BLE001 - data outages shouldn't fail the run
+            warnings.warn(f"stress scenario {name} skipped: {e}", stacklevel=2)
+            continue
+        rets = px.pct_change(fill_method=None).loc[start:end].reindex(columns=cols)
+        if len(rets):
+            out.append(Scenario(name=name, kind="historical", returns=rets))
+    return out
+
+
+def _betas(history: pd.DataFrame, market: str) -> pd.Series:
+    """Per-ticker beta to `market` over `history` (1.0 where it can't be estimated)."""
+    if market not in history.columns:
+        return pd.Series(1.0, index=history.columns)
+    m = history[market]
+    var = float(m.var())
+    if not np.isfinite(var) or var <= 0:
+        return pd.Series(1.0, index=history.columns)
+    return (history.apply(lambda c: c.cov(m)) / var).fillna(1.0)
+
+
+def synthetic_scenarios(
+    history: pd.DataFrame,
+    names: list[str] | None = None,
+    market: str = "SPY",
+) -> list[Scenario]:
+    """Synthetic shocks built from recent daily `history` (day × ticker returns)."""
+    beta = _betas(history, market)
+    out = []
+    for name in names if names is not None else list(SYNTHETIC_SHOCKS):
+        spec = SYNTHETIC_SHOCKS[name]
+        days = int(spec["days"])
+        idx = pd.RangeIndex(1, days + 1, name="day")
+        if "market" in spec:
+            daily = (1.0 + spec["market"]) ** (1.0 / days) - 1.0
+            rets = pd.DataFrame(np.outer(np.ones(days), beta.to_numpy() * daily), index=idx, columns=history.columns)
+        else:
+            tail = history.tail(days).fillna(0.0)
+            rets = (tail - tail.mean()) * spec["vol_mult"]
+            rets.index = idx[: len(rets)]
+        out.append(Scenario(name=name, kind="synthetic", returns=rets))
+    return out
+
+
+def stress_test(
+    portfolios: pd.DataFrame,
+    scenarios: list[Scenario],
+    risk: RiskConfig,
+    history: pd.DataFrame,
+    scale0: float = 1.0,
+    transaction_cost_bps: float = 0.0,
+    market: str = "SPY",
+) -> pd.DataFrame:
+    """Run every scenario × portfolio as one batched computation.
+
+    `portfolios` is portfolio × ticker base (pre-overlay) weights. Scenario returns are
+    stacked into an S×T×N array (shorter scenarios padded), base returns come from one
+    einsum to S×P×T, and the vol-target / drawdown-kill overlays then step through T
+    with vectorized S×P state:
+
+    - the vol estimate is warmed up with the last `vol_lookback` days of `history`
+      (realized: rolling std of base returns; ewma: covariance seeded from history);
+    - scale(t) applies to day t+1, starting from today's `scale0`;
+    - drawdown is measured from the scenario start and trips the kill switch.
+
+    Tickers with no data in a historical window are proxied by beta × market return;
+    `coverage` is the share of gross weight with real data.
+    """
+    tickers = list(portfolios.columns)
+    W = portfolios.to_numpy(dtype=float)  # P×N
+    P, N = W.shape
+    S = len(scenarios)
+    if S == 0 or P == 0:
+        return pd.DataFrame()
+    hist = history.reindex(columns=tickers)
+    beta = _betas(history.reindex(columns=list(dict.fromkeys([*tickers, market]))), market)[tickers]
+
+    T = max(len(s.returns) for s in scenarios)
+    R = np.zeros((S, T, N))
+    live = np.zeros((S, T), dtype=bool)
+    coverage = np.zeros((S, P))
+    gross = np.abs(W).sum(axis=1)
+    for i, sc in enumerate(scenarios):
+        r = sc.returns.reindex(columns=tickers)
+        has = r.notna().any().to_numpy()
+        if market in sc.returns.columns:
+            proxy = np.outer(sc.returns[market].fillna(0.0).to_numpy(), beta.to_numpy())
+        else:
+            proxy = np.zeros(r.shape)
+        R[i, : len(r)] = np.where(r.notna().to_numpy(), r.fillna(0.0).to_numpy(), proxy)
+        live[i, : len(r)] = True
+        coverage[i] = np.divide(np.abs(W[:, has]).sum(axis=1), gross, out=np.ones(P), where=gross > 0)
+
+    base = np.einsum("stn,pn->spt", R, W)  # S×P×T unscaled portfolio returns
+
+    # Vol estimate per (scenario, portfolio, day), warmed up from recent history
+    L = max(2, int(risk.vol_lookback))
+    ann = np.sqrt(252.0)
+    h = hist.tail(max(L, 1)).fillna(0.0).to_numpy()
+    if risk.vol_model == "ewma":
+        cov = EWMACovariance(N, halflife=risk.cov_halflife)  # shrinkage applied per step below
+        for row in hist.tail(max(L, int(5 * risk.cov_halflife))).fillna(0.0).to_numpy():
+            cov.update(row)
+        C = np.broadcast_to(cov.covariance, (S, N, N)).copy()  # bias-corrected seed
+        lam, d = cov.lam, risk.cov_shrinkage
+        vol = np.empty((S, P, T))
+        for t in range(T):
+            x = R[:, t, :]
+            C = lam * C + (1.0 - lam) * x[:, :, None] * x[:, None, :]
+            Cs = (1.0 - d) * C + d * (np.eye(N) * C)
+            vol[:, :, t] = np.sqrt(np.maximum(np.einsum("pn,snm,pm->sp", W, Cs, W), 0.0)) * ann
+    else:
+        hb = np.broadcast_to((h @ W.T).T, (S, P, len(h)))  # history base returns
+        full = np.concatenate([hb, base], axis=2)
+        c1 = np.cumsum(np.concatenate([np.zeros((S, P, 1)), full], axis=2), axis=2)
+        c2 = np.cumsum(np.concatenate([np.zeros((S, P, 1)), full**2], axis=2), axis=2)
+        end = np.arange(len(h) + 1, len(h) + T + 1)
+        start = np.maximum(end - L, 0)
+        n = (end - start).astype(float)
+        m1 = (c1[:, :, end] - c1[:, :, start]) / n
+        m2 = (c2[:, :, end] - c2[:, :, start]) / n
+        vol = np.sqrt(np.maximum(m2 - m1**2, 0.0)) * ann
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        target_scale = np.nan_to_num(np.clip(risk.target_vol_ann / vol, 0.0, risk.max_leverage), nan=0.0)
+
+    # Sequential overlays, vectorized over S×P (same rules as `apply_risk`: the kill switch
+    # watches pre-cost scaled equity, scale(t) earns the return of t+1)
+    cost_rate = transaction_cost_bps / 1e4
+    shape = (S, P)
+    scale_prev = np.full(shape, float(scale0))
+    eq_pre, peak = np.ones(shape), np.ones(shape)
+    eq, peak_net = np.ones(shape), np.ones(shape)
+    eq_raw, peak_raw = np.ones(shape), np.ones(shape)
+    mdd, mdd_raw = np.zeros(shape), np.zeros(shape)
+    worst = np.zeros(shape)
+    scale_sum = np.zeros(shape)
+    killed = np.zeros(shape, dtype=bool)
+    kill_day = np.full(shape, np.nan)
+    for t in range(T):
+        on = live[:, t][:, None]
+        ret_pre = scale_prev * base[:, :, t]
+        eq_pre = np.where(on, eq_pre * (1.0 + ret_pre), eq_pre)
+        peak = np.maximum(peak, eq_pre)
+        dd = eq_pre / peak - 1.0
+        if risk.dd_recover is not None:
+            killed &= ~(dd > -risk.dd_recover)
+        trip = on & ~killed & (dd <= -risk.dd_kill)
+        kill_day = np.where(trip & np.isnan(kill_day), t + 1, kill_day)
+        killed |= trip
+        s_new = np.where(killed, 0.0, target_scale[:, :, t])
+        ret = ret_pre - np.abs(s_new - scale_prev) * gross[None, :] * cost_rate
+        eq = np.where(on, eq * (1.0 + ret), eq)
+        peak_net = np.maximum(peak_net, eq)
+        mdd = np.minimum(mdd, eq / peak_net - 1.0)
+        scale_sum += np.where(on, s_new, 0.0)
+        worst = np.where(on, np.minimum(worst, ret), worst)
+        scale_prev = np.where(on, s_new, scale_prev)
+
+        eq_raw = np.where(on, eq_raw * (1.0 + scale0 * base[:, :, t]), eq_raw)
+        peak_raw = np.maximum(peak_raw, eq_raw)
+        mdd_raw = np.minimum(mdd_raw, eq_raw / peak_raw - 1.0)
+
+    days = live.sum(axis=1)
+    rows = []
+    for i, sc in enumerate(scenarios):
+        idx = sc.returns.index
+        span = f"{idx[0]:%Y-%m-%d}..{idx[-1]:%Y-%m-%d}" if isinstance(idx, pd.DatetimeIndex) else ""
+        for j, p in enumerate(portfolios.index):
+            rows.append(
+                {
+                    "scenario": sc.name,
+                    "portfolio": p,
+                    "kind": sc.kind,
+                    "window": span,
+                    "days": int(days[i]),
+                    "ret_static": eq_raw[i, j] - 1.0,
+                    "ret_managed": eq[i, j] - 1.0,
+                    "mdd_static": mdd_raw[i, j],
+                    "mdd_managed": mdd[i, j],
+                    "worst_day": worst[i, j],
+                    "avg_scale": scale_sum[i, j] / max(days[i], 1),
+                    "kill_day": kill_day[i, j],
+                    "coverage": coverage[i, j],
+                }
+            )
+    return pd.DataFrame(rows).set_index(["scenario", "portfolio"])
+
+
+def plan_portfolios(agent_out: dict) -> tuple[pd.DataFrame, float]:
+    """Base weights of today's plan (`plan`: after per-ticker caps, before the day-level
+    scale) and the raw proposal (`proposed`), plus today's overlay scale."""
+    ex = agent_out["execution"]
+    proposed = pd.Series(ex.proposed_weight, index=ex.tickers)
+    if ex.scale > 0:
+        plan = pd.Series(ex.executed_weight / ex.scale, index=ex.tickers)
+    else:
+        plan = proposed
+    return pd.DataFrame({"plan": plan, "proposed": proposed}).T.fillna(0.0), float(ex.scale)
+
+
+def stress_plan(
+    agent_out: dict,
+    prices: pd.DataFrame,
+    risk: RiskConfig,
+    cfg: StressConfig,
+    historical: list[Scenario],
+    transaction_cost_bps: float = 0.0,
+    market: str = "SPY",
+    freq: BarFrequency = DAILY,
+) -> pd.DataFrame:
+    """Stress today's execution plan against `historical` windows plus synthetic shocks.
+
+    Scenarios are daily, so intraday `prices` are sampled at the daily close first.
+    """
+    portfolios, scale0 = plan_portfolios(agent_out)
+    daily = prices if freq.is_daily else prices.resample("1D").last().dropna(how="all")
+    history = daily.pct_change(fill_method=None).tail(cfg.beta_lookback)
+    scenarios = [s for s in historical if s.name in cfg.historical]
+    scenarios += synthetic_scenarios(history, cfg.synthetic, market=market)
+    return stress_test(
+        portfolios,
+        scenarios,
+        risk,
+        history,
+        scale0=scale0,
+        transaction_cost_bps=transaction_cost_bps,
+        market=market,
+    )
+
+
+def stress_table(stress: pd.DataFrame, portfolio: str = "plan") -> pd.DataFrame:
+    """Compact report view (percent) for one portfolio."""
+    tab = stress.xs(portfolio, level="portfolio").copy()
+    for c in ["ret_static", "ret_managed", "mdd_static", "mdd_managed", "worst_day", "coverage"]:
+        tab[c] = (tab[c] * 100).round(2)
+    tab["avg_scale"] = tab["avg_scale"].round(2)
+    return tab.rename(
+        columns={
+            "ret_static": "ret_static_%",
+            "ret_managed": "ret_managed_%",
+            "mdd_static": "mdd_static_%",
+            "mdd_managed": "mdd_managed_%",
+            "worst_day": "worst_day_%",
+            "coverage": "coverage_%",
+        }
+    )
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.report.attribution import (
+    build_factors,
+    factor_regressions,
+    read_attribution_config,
+)
+
+
+def _ols(y, X):
+    d = pd.concat([y, X], axis=1).dropna()
+    Z = np.c_[np.ones(len(d)), d[X.columns].to_numpy()]
+    return np.linalg.lstsq(Z, d[y.name].to_numpy(), rcond=None)[0]
+
+
+def test_batched_rolling_and_expanding_match_lstsq():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2020-01-01", periods=300)
+    F = pd.DataFrame(rng.normal(0, 0.01, (300, 3)), index=idx, columns=["market", "momentum", "size"])
+    F.iloc[:30, 1] = np.nan
+    Y = pd.DataFrame(
+        {
+            "a": 0.0002 + F.fillna(0) @ [1.0, 0.5, -0.3] + rng.normal(0, 0.002, 300),
+            "b": F.fillna(0) @ [0.3, 0.0, 0.2] + rng.normal(0, 0.004, 300),
+        }
+    )
+    Y.iloc[:50, 1] = np.nan  # different sample → separate sufficient statistics
+
+    rolling, expanding = factor_regressions(Y, F, window=63, ann=252)
+    terms = ["alpha", "market", "momentum", "size"]
+    for s in ["a", "b"]:
+        for t in [120, 299]:
+            beta = _ols(Y[s].iloc[t - 62 : t + 1], F.iloc[t - 62 : t + 1])
+            assert np.allclose(rolling[s].iloc[t][terms], np.r_[beta[0] * 252, beta[1:]])
+            beta = _ols(Y[s].iloc[: t + 1], F.iloc[: t + 1])
+            assert np.allclose(expanding[s].iloc[t][terms], np.r_[beta[0] * 252, beta[1:]])
+
+
+def test_build_factors_uses_panel_sectors_and_size_spread():
+    idx = pd.bdate_range("2021-01-01", periods=200)
+    rng = np.random.default_rng(1)
+    px = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (200, 4)), axis=0)),
+        index=idx,
+        columns=["AAA", "BBB", "CCC", "XLK"],
+    )
+    spy = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200))), index=idx)
+    iwm = pd.DataFrame({"IWM": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200)))}, index=idx)
+    mkt = spy.pct_change().rename("SPY")
+
+    f = build_factors(px, mkt, momentum_lookback=20, size=["IWM", "SPY"], extra_prices=iwm)
+    assert list(f.columns) == ["market", "momentum", "size", "XLK"]
+    assert np.allclose(f["size"].dropna(), (iwm["IWM"].pct_change() - mkt).dropna())
+    assert np.allclose(f["XLK"].dropna(), (px["XLK"].pct_change() - mkt).dropna())
+
+
+def test_attribution_is_opt_in():
+    assert not read_attribution_config(None).enabled
+    assert not read_attribution_config({"enabled": False, "window": 20}).enabled
+    on = read_attribution_config({"window": 20})
+    assert on.enabled and on.window == 20
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+import tradeagentlab.data.yf as yfmod
+from tradeagentlab.data.cache import PriceCache
+
+
+def _fake_download(calls):
+    def download(tickers, start, end, **kw):
+        calls.append((tuple(tickers), start, end))
+        idx = pd.bdate_range(start, end, inclusive="left", name="Date")
+        cols = {t: 100 + np.arange(len(idx)) * (i + 1) * 0.1 for i, t in enumerate(sorted(tickers))}
+        close = pd.DataFrame(cols, index=idx)[list(tickers)]
+        close.columns = pd.MultiIndex.from_product([["Close"], close.columns])
+        return close
+
+    return download
+
+
+def test_superset_hits_and_stats(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(yfmod.yf, "download", _fake_download(calls))
+
+    wide = yfmod.load_prices(["A", "B", "C"], "2020-01-01", "2021-01-01")
+    sub = yfmod.load_prices(["C", "A"], "2020-03-01", "2020-06-01")
+    again = yfmod.load_prices(["A", "B", "C"], "2020-01-01", "2021-01-01")
+
+    assert len(calls) == 1  # the subset and the repeat never hit the network
+    expected = wide.loc["2020-03-01":"2020-05-31", ["C", "A"]]
+    pd.testing.assert_frame_equal(sub, expected, check_freq=False)
+    pd.testing.assert_frame_equal(again, wide, check_freq=False)
+
+    s = PriceCache(tmp_path).stats()
+    assert (s["files"], s["misses"], s["hits"], s["superset_hits"]) == (1, 1, 1, 1)
+    assert set(s["tickers"]["ticker"]) == {"A", "B", "C"}
+
+
+def test_compact_evict_verify(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(yfmod.yf, "download", _fake_download(calls))
+    cache = PriceCache(tmp_path)
+
+    yfmod.load_prices(["A", "B"], "2020-01-01", "2020-07-01")
+    yfmod.load_prices(["A", "B"], "2020-06-01", "2021-01-01")  # overlaps the first
+    yfmod.load_prices(["B"], "2020-02-01", "2020-12-01")  # covered once merged
+    yfmod.load_prices(["D"], "2020-01-01", "2020-02-01")
+
+    out = cache.compact()
+    assert len(out["merged"]) == 1 and len(out["dropped"]) == 1
+    assert len(cache.entries()) == 2
+    n = len(calls)
+    full = yfmod.load_prices(["B", "A"], "2020-01-01", "2021-01-01")
+    assert len(calls) == n and full.index.is_unique and len(full) == len(pd.bdate_range("2020-01-01", "2020-12-31"))
+
+    merged = tmp_path / out["merged"][0]
+    merged.write_bytes(merged.read_bytes() + b"x")
+    report = cache.verify().set_index("file")["status"]
+    assert report[merged.name] == "checksum" and (report.drop(merged.name) == "ok").all()
+    cache.verify(fix=True)
+    assert not merged.exists()
+
+    # LRU: D was read least recently, so it goes first
+    yfmod.load_prices(["A", "B"], "2020-01-01", "2021-01-01")
+    yfmod.load_prices(["A"], "2020-01-01", "2020-02-01")
+    removed = cache.evict(max_bytes=max(f["bytes"] for f in cache.entries().values()))
+    assert removed == [PriceCache.key(["D"], "2020-01-01", "2020-02-01")]
+
+
+def _mixed_calendar_download(tickers, start, end, **kw):
+    # BTC trades every day, the others on business days (yfinance returns the union)
+    days = pd.date_range(start, end, inclusive="left", name="Date")
+    close = pd.DataFrame({t: 100.0 + days.dayofyear * (i + 1) for i, t in enumerate(sorted(tickers))}, index=days)
+    close = close[list(tickers)]
+    close.loc[close.index.dayofweek >= 5, [t for t in tickers if t != "BTC"]] = np.nan
+    close = close.dropna(how="all")
+    close.columns = pd.MultiIndex.from_product([["Close"], close.columns])
+    return close
+
+
+def test_superset_hit_keeps_the_subset_calendar(tmp_path, monkeypatch):
+    monkeypatch.setattr(yfmod.yf, "download", _mixed_calendar_download)
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path / "cold")
+    cold = yfmod.load_prices(["A", "B"], "2021-01-01", "2021-02-01")
+
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path / "warm")
+    wide = yfmod.load_prices(["A", "B", "BTC"], "2020-12-01", "2021-03-01")
+    sub = yfmod.load_prices(["A", "B"], "2021-01-01", "2021-02-01")
+
+    assert len(wide.loc["2021-01"]) == 31 and len(cold) == 21
+    assert PriceCache(tmp_path / "warm").stats()["superset_hits"] == 1
+    pd.testing.assert_frame_equal(sub, cold, check_freq=False)
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradeagentlab.agents.orchestrator import build_agent_decision, run_agent_decision
+
+GOLDEN = Path(__file__).parent / "golden"
+
+
+def _inputs():
+    rng = np.random.default_rng(4)
+    idx = pd.bdate_range("2022-01-01", periods=80)
+    cols = ["SPY", "AAA", "BBB", "CCC"]
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.001, [0.005, 0.03, 0.01, 0.02], (80, 4)), axis=0)),
+        index=idx,
+        columns=cols,
+    )
+    weights = pd.DataFrame(0.0, index=idx, columns=cols)
+    weights.iloc[-1] = [0.0, 0.5, 0.3, 0.2]
+    audit = pd.DataFrame({"scale": [0.8], "reason": ["VOL_TARGET: test"]}, index=idx[-1:])
+    return prices, weights, audit
+
+
+def test_columnar_agent_frames_serialize_to_schema():
+    prices, weights, audit = _inputs()
+    cols = list(prices.columns)
+
+    out = build_agent_decision(prices, weights, audit, max_ticker_vol_ann=0.2, vol_cap_mode="reject")
+    execution = out["execution"]
+    plan = json.loads(execution.to_model().model_dump_json())
+
+    # AAA (~48% vol) is rejected by the per-ticker cap; the others are scaled by the overlay
+    rows = {r["ticker"]: r for r in plan["rows"]}
+    assert rows["AAA"]["status"] == "rejected" and "VOL_CAP_REJECT" in rows["AAA"]["gate_reason"]
+    assert np.isclose(rows["BBB"]["executed_weight"], 0.3 * 0.8)
+    assert np.isclose(plan["gross_exposure"], execution.executed_weight.sum())
+    assert list(execution.to_frame()["ticker"]) == [r["ticker"] for r in plan["rows"]]
+
+    note = out["research"].to_model()
+    assert [s.ticker for s in note.universe] == cols
+    assert out["decision"].to_model().proposed_positions[0].ticker == "AAA"
+
+
+@pytest.mark.parametrize("mode", ["reject", "scale"])
+def test_agent_artifacts_match_golden_json(tmp_path, mode):
+    # Golden files were written by the original pydantic-model pipeline; the columnar
+    # frames must keep serializing to the same bytes.
+    prices, weights, audit = _inputs()
+    run_agent_decision(prices, weights, audit, tmp_path, mode, max_ticker_vol_ann=0.2, vol_cap_mode=mode)
+    for kind in ("research", "decision", "execution"):
+        got = (tmp_path / "agent" / f"{mode}_{kind}.json").read_text()
+        assert got == (GOLDEN / f"agent_{mode}_{kind}.json").read_text(), kind
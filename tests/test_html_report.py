@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from tradeagentlab.report.html import lttb_indices, write_html_report
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    rng = np.random.default_rng(0)
+    x = np.arange(5000, dtype=float)
+    y = np.cumsum(rng.normal(size=5000))
+    y[1234] = 1e3  # a spike must survive
+
+    idx = lttb_indices(x, y, 300)
+    assert len(idx) == 300 and idx[0] == 0 and idx[-1] == 4999
+    assert (np.diff(idx) > 0).all() and 1234 in idx
+
+    # Short input (or a budget too small to bucket) comes back unchanged
+    assert (lttb_indices(x[:100], y[:100], 300) == np.arange(100)).all()
+    assert (lttb_indices(x[:10], y[:10], 2) == np.arange(10)).all()
+
+
+def test_html_report_is_one_self_contained_file(tmp_path):
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2015-01-01", periods=3000)
+    rets = pd.Series(rng.normal(0.0004, 0.01, len(idx)), index=idx)
+    weights = pd.DataFrame({"A": 0.6, "B": 0.4}, index=idx)
+    results = {
+        "portfolio_returns": rets,
+        "benchmark_returns": pd.Series(rng.normal(0.0003, 0.01, len(idx)), index=idx),
+        "weights": weights,
+        "turnover": pd.Series(0.0, index=idx),
+        "cost": pd.Series(0.0, index=idx),
+    }
+
+    path = write_html_report(results, tmp_path, "run", max_points=500)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["run_report.html"]
+    doc = path.read_text(encoding="utf-8")
+    assert doc.count(get_plotlyjs()) == 1 and "<script src=" not in doc
+    assert "Series downsampled with LTTB to ≤500 points" in doc
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.report.metrics import compute_metrics
+from tradeagentlab.results.leaderboard import build_leaderboard, leaderboard_metrics
+from tradeagentlab.results.store import read_results
+
+
+def test_leaderboard_matches_report_stats():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2020-01-01", periods=300)
+    bench = pd.Series(rng.normal(0.0004, 0.01, len(idx)), index=idx)
+    runs = {
+        "a": 0.5 * bench + rng.normal(0.0002, 0.008, len(idx)),
+        "b": pd.Series(rng.normal(0.0, 0.015, len(idx)), index=idx),
+    }
+    runs["b"].iloc[:100] = np.nan  # shorter run
+
+    R = pd.DataFrame(runs)
+    B = pd.DataFrame({k: bench for k in R.columns})
+    board = leaderboard_metrics(R, bench_returns=B)
+    ref = compute_metrics(R, bench).summary
+
+    for k in R.columns:
+        for m in ["cagr", "vol", "sharpe", "mdd", "beta", "alpha"]:
+            assert np.isclose(board.loc[k, m], ref.loc[k, m])
+
+
+def test_missing_or_empty_results_dir_reads_as_empty(tmp_path):
+    for root in (tmp_path / "missing", tmp_path):
+        long = read_results(root, columns=["portfolio_return"])
+        assert long.empty and list(long.columns) == ["date", "portfolio_return", "config_hash", "run_id"]
+        assert build_leaderboard(root).empty
+        assert build_leaderboard(root, name_contains="nothing").empty
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.backtest.ledger import run_ledger
+
+
+def _panel():
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2020-01-01", periods=300)
+    cols = ["A", "B", "C"]
+    px = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(idx), 3)), axis=0)), idx, cols)
+    px.iloc[:40, 2] = np.nan  # C lists later
+    w = pd.DataFrame(rng.random((len(idx), 3)), idx, cols)
+    w["C"] = w["C"].where(px["C"].notna(), 0.0)
+    return px, w.div(w.sum(axis=1), axis=0) * 0.9
+
+
+def test_ledger_whole_lots_and_cash_identity():
+    px, w = _panel()
+    out = run_ledger(w, px, initial_cash=100_000, transaction_cost_bps=5.0, lot_size=10)
+    shares = out["shares"]
+    assert (shares.to_numpy() % 10 == 0).all()
+    assert (shares["C"].iloc[:40] == 0).all()
+    value = (shares * px.ffill().fillna(0.0)).sum(axis=1)
+    np.testing.assert_allclose(out["cash"] + value, out["equity"], rtol=1e-12)
+    assert out["cash"].min() > 0  # the 10% cash buffer covers rounding and fees
+    assert np.isclose((1 + out["portfolio_returns"]).prod() * 100_000, out["equity"].iloc[-1])
+    # Costs come from fills: the first day pays for the initial buy
+    assert np.isclose(out["cost_cash"].iloc[0], 5e-4 * (out["fills"].iloc[0] * px.iloc[0].fillna(0.0)).abs().sum())
+
+
+def test_fractional_ledger_matches_weight_path():
+    px, w = _panel()
+    out = run_ledger(w, px, initial_cash=1e6, lot_size=1e-6)
+    rets = px.pct_change(fill_method=None).fillna(0.0)
+    ref = (w.shift(1).fillna(0.0) * rets).sum(axis=1)
+    np.testing.assert_allclose(out["portfolio_returns"], ref, atol=1e-8)
+    np.testing.assert_allclose(out["weights"].iloc[-1], w.iloc[-1], atol=1e-6)
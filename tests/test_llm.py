@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradeagentlab.agents.llm import LLMConfig, enrich_research_note
+from tradeagentlab.agents.llm_stub import start_stub_server
+from tradeagentlab.agents.research import build_research_note
+
+
+def _note():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2024-01-01", periods=60)
+    px = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (60, 5)), axis=0)),
+        index=idx,
+        columns=["SPY", "AAA", "BBB", "CCC", "DDD"],
+    )
+    return build_research_note(px)
+
+
+def test_llm_notes_are_concurrent_cached_and_optional(tmp_path):
+    note = _note()
+    server = start_stub_server()
+    try:
+        cfg = LLMConfig(
+            enabled=True,
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            batch_size=2,
+            max_concurrency=2,
+            cache_dir=str(tmp_path / "llm"),
+        )
+        out = enrich_research_note(note, cfg)
+        assert server.requests == 4  # market prompt + 3 ticker batches
+        assert out.llm_summary.startswith("Stub view")
+        assert out.llm_notes.tolist()[1].startswith("AAA is trending")
+
+        again = enrich_research_note(note, cfg)  # same prompt + snapshot → served from cache
+        assert server.requests == 4
+        assert again.to_model() == out.to_model()
+    finally:
+        server.shutdown()
+
+    # Deterministic notes serialize exactly as before (no LLM keys)
+    assert "llm" not in note.to_model().model_dump_json(indent=2, exclude_none=True)
+
+
+def test_llm_timeout_falls_back_to_deterministic_note(tmp_path):
+    note = _note()
+    server = start_stub_server(delay_s=1.0)
+    try:
+        cfg = LLMConfig(
+            enabled=True,
+            base_url=f"http://127.0.0.1:{server.server_port}/v1",
+            timeout_s=0.1,
+            cache_dir=str(tmp_path / "llm"),
+        )
+        with pytest.warns(UserWarning, match="deterministic"):
+            out = enrich_research_note(note, cfg)
+    finally:
+        server.shutdown()
+    assert out is note
+    assert not any((tmp_path / "llm").rglob("*.json"))  # failures are never cached
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.report.metrics import compute_metrics
+
+
+def _series():
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2015-01-01", periods=700)
+    bench = pd.Series(rng.normal(0.0004, 0.01, len(idx)), index=idx)
+    strat = 0.6 * bench + rng.normal(0.0001, 0.007, len(idx))
+    return strat, bench
+
+
+def test_metrics_match_pandas_reference():
+    strat, bench = _series()
+    m = compute_metrics(strat, bench, window=20, beta_window=63)
+
+    eq = (1 + strat).cumprod()
+    assert np.allclose(m.equity["strategy"], eq)
+    assert np.allclose(m.drawdown["strategy"], eq / eq.cummax() - 1)
+    assert np.isclose(m.summary.loc["strategy", "vol"], strat.std() * np.sqrt(252))
+
+    vol = strat.rolling(20, min_periods=20).std(ddof=0) * np.sqrt(252)
+    assert np.allclose(m.rolling_vol["strategy"], vol, equal_nan=True)
+
+    beta = strat.rolling(63).cov(bench, ddof=0) / bench.rolling(63).var(ddof=0)
+    assert np.allclose(m.rolling_beta["strategy"], beta, equal_nan=True)
+
+    monthly = (1 + strat).resample("ME").prod() - 1
+    assert np.allclose(m.monthly["strategy"], monthly)
+
+
+def test_metrics_chunking_invariant():
+    strat, bench = _series()
+    a = compute_metrics(strat, bench, chunk_size=7)
+    b = compute_metrics(strat, bench, chunk_size=10_000)
+    assert np.allclose(a.summary, b.summary)
+    for key in ["equity", "rolling_sharpe", "rolling_alpha"]:
+        assert np.allclose(getattr(a, key), getattr(b, key), equal_nan=True)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.portfolio.optimizer import (
+    OptimizerConfig,
+    optimize_weights,
+    project_capped_simplex,
+    solve_quadratic,
+    solve_risk_parity,
+)
+
+
+def _cov(n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    A = rng.normal(0, 0.01, (200, n)) @ rng.uniform(0.5, 1.5, (n, n))
+    return np.cov(A.T)
+
+
+def test_projection_respects_caps():
+    w = project_capped_simplex(np.array([0.9, 0.5, 0.1, -0.2]), cap=0.4)
+    assert np.isclose(w.sum(), 1.0) and (w >= 0).all() and (w <= 0.4 + 1e-12).all()
+
+
+def _cov_interior(n=6):
+    # Equicorrelated assets: the unconstrained minimum-variance portfolio is long-only
+    vol = np.linspace(0.1, 0.15, n)
+    return np.outer(vol, vol) * (0.3 + 0.7 * np.eye(n))
+
+
+def test_min_variance_and_risk_parity_solutions():
+    S = _cov()
+    n = len(S)
+    for cov in [S, _cov_interior(n)]:
+        w, _ = solve_quadratic(cov, None, cap=1.0, w0=np.full(n, 1 / n), max_iter=5000, tol=1e-12)
+        # KKT: marginal variance equal across held names, no lower on the zero-weight ones
+        g, held = cov @ w, w > 1e-8
+        assert np.isclose(w.sum(), 1.0) and (w >= 0).all()
+        assert np.allclose(g[held], g[held].mean(), rtol=1e-6)
+        assert (g[~held] >= g[held].mean() * (1 - 1e-6)).all()
+    # The corner case (S) has zero weights; the interior one matches the closed form
+    assert (w > 1e-8).all() and not (np.linalg.solve(S, np.ones(n)) > 0).all()
+    ref = np.linalg.solve(cov, np.ones(n))
+    assert np.allclose(w, ref / ref.sum(), atol=1e-8)
+
+    rp, _ = solve_risk_parity(S, cap=1.0, w0=np.full(n, 1 / n))
+    rc = rp * (S @ rp)
+    assert np.allclose(rc / rc.sum(), 1 / n, atol=1e-6)
+    # max_iter=0: no sweeps, the (projected) starting point comes back
+    w0, k = solve_risk_parity(S, cap=1.0, w0=np.full(n, 1 / n), max_iter=0)
+    assert k == 0 and np.isclose(w0.sum(), 1.0)
+
+
+def test_optimize_weights_blocks_and_pool_agree():
+    rng = np.random.default_rng(3)
+    idx = pd.bdate_range("2020-01-01", periods=300)
+    rets = pd.DataFrame(rng.normal(0, 0.01, (300, 5)), index=idx, columns=list("ABCDE"))
+    members = pd.DataFrame(rng.uniform(size=(300, 5)) > 0.3, index=idx, columns=rets.columns)
+    members.iloc[:5] = False
+
+    serial, info = optimize_weights(members, rets, "min_variance", 0.4, OptimizerConfig(block_size=70))
+    pooled, _ = optimize_weights(
+        members, rets, "min_variance", 0.4, OptimizerConfig(block_size=70, workers=2)
+    )
+    assert info["blocks"] == 5
+    assert np.allclose(serial, pooled)
+    live = members.any(axis=1)
+    assert np.allclose(serial[live].sum(axis=1), 1.0) and (serial[~live] == 0).all().all()
+    assert (serial[members.sum(axis=1) >= 3].to_numpy() <= 0.4 + 1e-9).all()
+    assert (serial.to_numpy()[~members.to_numpy()] == 0).all()
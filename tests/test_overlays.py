@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.agents.orchestrator import build_agent_decision
+from tradeagentlab.backtest.stream import StreamingBacktest
+from tradeagentlab.features.tech import compute_momentum_signal
+from tradeagentlab.risk.engine import GroupCap, RiskConfig, apply_risk
+
+RISK = RiskConfig(
+    target_vol_ann=0.15,
+    dd_kill=0.15,
+    ticker_vol_cap=0.22,
+    groups={"ab": GroupCap(tickers=["A", "B"], cap=0.3)},
+    max_gross=0.8,
+)
+
+
+def _prices():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2015-01-01", periods=600)
+    return pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (len(idx), 5)), axis=0)),
+        index=idx,
+        columns=["A", "B", "C", "D", "SPY"],
+    )
+
+
+def _reference(px, risk):
+    sig = compute_momentum_signal(px, lookback=20)
+    w = sig.div(sig.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0).clip(upper=0.3)
+    w = w.div(w.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
+    return apply_risk(w, px.pct_change().fillna(0.0), 2.0, risk)
+
+
+def test_overlays_bind_and_streaming_matches_in_memory():
+    px = _prices()
+    ref = _reference(px, RISK)
+    audit = ref["audit"]
+    w = ref["weights"]
+    assert audit["ticker_vol_names"].sum() > 0 and audit["group_cap_names"].sum() > 0
+    assert audit["gross_capped"].any()
+    assert (w[["A", "B"]].sum(axis=1) <= 0.3 * RISK.max_leverage + 1e-12).all()
+    assert (w.abs().sum(axis=1) <= 0.8 + 1e-12).all()
+
+    eng = StreamingBacktest(px.shape[1], 20, 0.3, 2.0, RISK, tickers=list(px.columns))
+    parts = [eng.update(px.iloc[i : i + 41].to_numpy()) for i in range(0, len(px), 41)]
+    ret = np.concatenate([p["portfolio_return"] for p in parts])
+    assert np.allclose(ret, ref["portfolio_returns"].astype(float))
+
+
+def test_agent_gate_matches_engine_weights_on_the_last_bar():
+    px = _prices()
+    rets = px.pct_change().fillna(0.0)
+    w = pd.DataFrame(0.2, index=px.index, columns=px.columns)
+    out = apply_risk(w, rets, 2.0, RISK)
+    agent = build_agent_decision(
+        px,
+        w,
+        out["audit"],
+        max_ticker_vol_ann=RISK.ticker_vol_cap,
+        group_factor=out["group_factor"],
+    )
+    ex = agent["execution"]
+    assert np.allclose(ex.executed_weight, out["weights"].iloc[-1].to_numpy())
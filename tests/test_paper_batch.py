@@ -0,0 +1,99 @@
+import multiprocessing as mp
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+import tradeagentlab.data.yf as yfmod
+from tradeagentlab.paper.batch import _account_prices, run_paper_batch
+from tradeagentlab.paper.run import (
+    _append_decision_row,
+    _read_config,
+    compute_paper_decision,
+    run_paper,
+)
+
+
+def _download(tickers, start, end, **kw):
+    # BTC trades every day, everything else on business days (yfinance returns the union)
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    full = pd.date_range("2018-01-01", "2024-01-01")
+    cols = {}
+    for t in tickers:
+        days = full if t == "BTC" else full[full.dayofweek < 5]
+        rng = np.random.default_rng(zlib.crc32(t.encode()))
+        cols[t] = pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0004, 0.015, len(days)))), index=days)
+    close = pd.DataFrame(cols)
+    close = close[(close.index >= start) & (close.index < end)].dropna(how="all").rename_axis("Date")
+    close.columns = pd.MultiIndex.from_product([["Close"], close.columns])
+    return close
+
+
+def _config(path, account, tickers, start, out_dir):
+    obj = {
+        "universe": {"tickers": tickers, "start": start, "end": "2023-06-30"},
+        "strategy": {"params": {"lookback": 20}},
+        "portfolio": {"initial_cash": 100000, "max_position_weight": 0.4},
+        "risk": {"target_vol_ann": 0.12, "stress": None},
+        "paper": {"account": account},
+        "report": {"out_dir": str(out_dir)},
+    }
+    path.write_text(yaml.safe_dump(obj))
+    return path
+
+
+def test_batch_matches_single_account_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(yfmod.yf, "download", _download)
+    accounts = {"alpha": (["SPY", "AAA", "BBB"], "2021-01-01"), "beta": (["SPY", "CCC", "BTC"], "2022-01-01")}
+
+    batch = [_config(tmp_path / f"{a}.yaml", a, t, s, tmp_path / "batch") for a, (t, s) in accounts.items()]
+    paths = run_paper_batch(batch, workers=2)
+
+    for path, (account, (tickers, start)) in zip(paths, accounts.items()):
+        single = run_paper(_config(tmp_path / f"{account}_1.yaml", account, tickers, start, tmp_path / "one"))
+        assert path.parent == tmp_path / "batch" / "daily" / account
+        assert path.read_text() == single.read_text()
+        assert (path.parent / "decisions.csv").read_text() == (single.parent / "decisions.csv").read_text()
+    # Batch accounts never touch the shared latest_* pointers
+    assert not list((tmp_path / "batch").rglob("latest_*"))
+
+    with pytest.raises(ValueError, match="Duplicate paper accounts"):
+        run_paper_batch([batch[0], _config(tmp_path / "dup.yaml", "alpha", ["SPY"], "2021-01-01", tmp_path)])
+
+
+def test_account_slice_ignores_other_accounts_calendars(tmp_path, monkeypatch):
+    monkeypatch.setattr(yfmod.yf, "download", _download)
+    stocks = _read_config(_config(tmp_path / "s.yaml", "s", ["SPY", "AAA", "BBB"], "2021-01-01", tmp_path))
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path / "single")
+    single = yfmod.load_prices(stocks.tickers, stocks.start, "2023-06-30")
+
+    # The batch union also holds BTC, which trades on weekends
+    monkeypatch.setattr(yfmod, "CACHE_DIR", tmp_path / "batch")
+    panel = yfmod.load_prices(["SPY", "AAA", "BBB", "BTC"], "2021-01-01", "2023-06-30", ffill=False)
+    sliced = _account_prices(panel, stocks)
+    assert (panel.index.dayofweek >= 5).any() and (sliced.index == single.index).all()
+
+    batch_out = compute_paper_decision(stocks, sliced)
+    single_out = compute_paper_decision(stocks, single)
+    for key in ["research", "decision", "execution"]:
+        pd.testing.assert_frame_equal(batch_out[key].to_frame(), single_out[key].to_frame())
+
+
+def _append_rows(path, worker, n):
+    for i in range(n):
+        _append_decision_row(path, [f"{worker}-{i}", "", "", "", "", ""])
+
+
+def test_decision_log_appends_are_locked(tmp_path):
+    path = tmp_path / "decisions.csv"
+    procs = [mp.Process(target=_append_rows, args=(path, w, 50)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    lines = path.read_text().splitlines()
+    assert lines[0].startswith("date,") and sum(line.startswith("date,") for line in lines) == 1
+    assert len(lines) == 1 + 4 * 50
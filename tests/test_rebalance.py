@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from tradeagentlab.backtest.ledger import run_ledger
+from tradeagentlab.features.tech import compute_momentum_signal
+from tradeagentlab.portfolio.construction import build_weights
+from tradeagentlab.portfolio.rebalance import RebalanceConfig, apply_rebalance, rebalance_mask
+from tradeagentlab.risk.engine import RiskConfig, apply_risk, apply_risk_rebalanced
+
+
+def _prices(n=300, k=6):
+    rng = np.random.default_rng(3)
+    idx = pd.bdate_range("2020-01-01", periods=n)
+    return pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (n, k)), axis=0)),
+        index=idx,
+        columns=[f"T{i}" for i in range(k)],
+    )
+
+
+def test_drifted_holdings_match_bar_by_bar_reference():
+    px = _prices()
+    rets = px.pct_change().fillna(0.0)
+    rng = np.random.default_rng(4)
+    targets = pd.DataFrame(rng.dirichlet(np.ones(6), len(px)) * 0.9, index=px.index, columns=px.columns)
+    targets.iloc[::7, 2] = 0.0  # exits always trade
+    cfg = RebalanceConfig(calendar="weekly", band=0.2, min_trade=0.01)
+    mask = rebalance_mask(px.index, cfg.calendar)
+    assert mask[0] and mask.sum() == px.index.isocalendar()[["year", "week"]].drop_duplicates().shape[0]
+
+    out = apply_rebalance(targets, rets, mask, cfg, transaction_cost_bps=5.0)
+
+    R, W = rets.to_numpy(), targets.to_numpy()
+    h = np.zeros(6)
+    for t in range(len(px)):
+        ret = h @ R[t]
+        h = h * (1 + R[t]) / (1 + ret)
+        cost = 0.0
+        if mask[t]:
+            delta = np.abs(W[t] - h)
+            keep = ((delta <= 0.2 * W[t]) | (delta < 0.01)) & (W[t] != 0)
+            new = np.where(keep, h, W[t])
+            cost = np.abs(new - h).sum() * 5e-4
+            h = new
+        assert np.allclose(out["weights"].iloc[t], h)
+        assert np.isclose(out["portfolio_returns"].iloc[t], ret - cost)
+    assert not out["trades"][~mask].to_numpy().any()
+    assert out["rebalanced"].sum() <= mask.sum()
+
+
+def test_weights_evaluated_on_schedule_and_ledger_trades_only_there():
+    px = _prices()
+    sig = compute_momentum_signal(px, lookback=20)
+    mask = rebalance_mask(px.index, "monthly")
+    full = build_weights(sig, px, 0.4, construction="min_variance")
+    held = build_weights(sig, px, 0.4, construction="min_variance", rebalance=mask)
+    # Same solutions on rebalance dates (the covariance still advances every bar) ...
+    assert np.allclose(held[mask], full[mask], atol=1e-6)
+    # ... carried unchanged in between
+    month = px.index.year * 12 + px.index.month
+    assert (held.groupby(month).nunique() <= 1).all().all()
+
+    out = apply_rebalance(held, px.pct_change().fillna(0.0), mask, RebalanceConfig("monthly"))
+    ledger = run_ledger(out["weights"], px, 1e6, lot_size=1, trade_mask=out["trades"])
+    traded_days = ledger["fills"].ne(0).any(axis=1)
+    assert traded_days.any() and not traded_days[~mask].any()
+
+
+def test_kill_switch_gates_the_drifting_book():
+    idx = pd.bdate_range("2021-01-01", "2021-03-31")
+    rng = np.random.default_rng(0)
+    rets = pd.DataFrame(rng.normal(0, 0.002, (len(idx), 2)), index=idx, columns=["A", "B"])
+    feb = np.flatnonzero(idx.month == 2)
+    rets.iloc[feb[:12], 0] = 0.06  # A rallies (and drifts overweight) ...
+    rets.iloc[feb[12:16], 0] = -0.12  # ... then crashes within the month
+    targets = pd.DataFrame(0.5, index=idx, columns=["A", "B"])
+    risk = RiskConfig(target_vol_ann=5.0, vol_lookback=5, dd_kill=0.25)
+    mask = rebalance_mask(idx, "monthly")
+
+    # Trading back to 50/50 every bar never breaches dd_kill; the held monthly book does
+    daily = apply_risk(targets, rets, 0.0, risk)
+    assert not daily["audit"]["killed"].any() and daily["audit"]["drawdown"].min() > -0.25
+    out = apply_risk_rebalanced(targets, rets, 0.0, risk, RebalanceConfig("monthly"), mask)
+    audit = out["audit"]
+    k = int(np.argmax(audit["killed"].to_numpy()))
+    assert audit["killed"].iloc[k:].all() and audit["reason"].iloc[k].startswith("KILL_SWITCH")
+    assert feb[12] < k < feb[-1] and out["trades"].iloc[k].all()  # kills trade off-schedule
+    assert (out["weights"].iloc[k:] == 0).all().all()
+
+    # Drawdown is that of the reported (held) returns, and the scale only moves on schedule
+    equity = (1 + out["portfolio_returns"].iloc[: k + 1]).cumprod()
+    assert np.allclose(equity / equity.cummax() - 1, audit["drawdown"].iloc[: k + 1])
+    scale = audit["scale"].iloc[:k]
+    assert (scale.groupby(scale.index.month).nunique() == 1).all() and scale.iloc[feb[0]] == 1.0
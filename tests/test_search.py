@@ -0,0 +1,84 @@
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradeagentlab.backtest.runner import BacktestConfig
+from tradeagentlab.backtest.search import SearchConfig, _score, apply_params, successive_halving
+from tradeagentlab.backtest.stream import StreamingBacktest
+from tradeagentlab.portfolio.rebalance import RebalanceConfig
+from tradeagentlab.report.metrics import MetricsEngine
+from tradeagentlab.risk.engine import RiskConfig
+
+
+def test_successive_halving_reuses_state_and_validates_winners():
+    rng = np.random.default_rng(3)
+    idx = pd.bdate_range("2015-01-01", periods=1500)
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, (1500, 5)), axis=0)),
+        index=idx,
+        columns=["SPY", "A", "B", "C", "D"],
+    )
+    cfg = BacktestConfig(
+        tickers=list(prices.columns),
+        start="2015-01-01",
+        end="2021-01-01",
+        lookback=20,
+        initial_cash=1.0,
+        max_position_weight=0.3,
+        transaction_cost_bps=2.0,
+        risk=RiskConfig(),
+        agent={},
+        report_out_dir="out",
+        report_name="t",
+    )
+    sc = SearchConfig(
+        params={"lookback": [5, 10, 20, 40, 60, 120], "target_vol_ann": [0.1, 0.2], "dd_kill": [0.1, 0.3]},
+        eta=3,
+        min_days=100,
+        validation_days=250,
+        folds=2,
+        top_k=2,
+    )
+    out = successive_halving(cfg, sc, prices)
+    traj = out["trajectory"]
+
+    counts = traj.groupby("rung")["candidate"].size().tolist()
+    assert counts[0] == 24 and counts == sorted(counts, reverse=True)
+    assert len(out["winners"]) == 2 and set(out["folds"]["fold"]) == {0, 1}
+    assert out["bars_simulated"] < out["bars_exhaustive"]
+
+    # A survivor's final score (built up slice by slice) equals one uninterrupted run
+    last = traj[traj["rung"] == traj["rung"].max()].iloc[0]
+    params = {k: last[k] for k in sc.params}
+    c = apply_params(cfg, {k: type(sc.params[k][0])(v) for k, v in params.items()})
+    eng = StreamingBacktest(5, c.lookback, c.max_position_weight, c.transaction_cost_bps, c.risk)
+    n = int(last["bars"])
+    ret = eng.update(prices.to_numpy()[:n])["portfolio_return"]
+    m = MetricsEngine(1)
+    m.update(ret[:, None], (idx.year * 12 + idx.month).to_numpy()[:n])
+    assert np.isclose(_score(m.summary()[0], "sharpe"), last["sharpe"])
+
+
+def test_search_rejects_settings_the_streaming_engine_does_not_model():
+    cfg = BacktestConfig(
+        tickers=["SPY", "A"],
+        start="2015-01-01",
+        end="2021-01-01",
+        lookback=20,
+        initial_cash=1.0,
+        max_position_weight=0.5,
+        transaction_cost_bps=2.0,
+        risk=RiskConfig(),
+        agent={},
+        report_out_dir="out",
+        report_name="t",
+    )
+    for bad in (
+        replace(cfg, construction="risk_parity"),
+        replace(cfg, rebalance=RebalanceConfig(calendar="weekly")),
+        replace(cfg, accounting="ledger"),
+    ):
+        with pytest.raises(ValueError, match="does not support"):
+            successive_halving(bad, SearchConfig(), pd.DataFrame())
@@ -0,0 +1,53 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradeagentlab.agents.research import build_research_note
+from tradeagentlab.features.shards import ComputeConfig, column_shards, map_shards, merge_moments
+from tradeagentlab.features.tech import compute_momentum_signal
+from tradeagentlab.portfolio.construction import equal_weight
+
+
+def test_column_shards_cover_every_ticker_once():
+    for n, k in [(10, 3), (3, 8), (1, 1), (0, 4)]:
+        cols = np.concatenate([np.arange(n)[s] for s in column_shards(n, k)]) if n else np.arange(0)
+        assert cols.tolist() == list(range(n))
+    x = np.random.default_rng(0).normal(size=101)
+    parts = [(len(c), c.mean(), ((c - c.mean()) ** 2).sum()) for c in np.array_split(x, 4)]
+    assert np.allclose(merge_moments(parts), (x.mean(), x.std()))
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_sharded_features_match_unsharded(executor):
+    rng = np.random.default_rng(1)
+    idx = pd.bdate_range("2020-01-01", periods=160)
+    cols = [f"T{i}" for i in range(22)] + ["SPY"]
+    px = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(idx), len(cols))), axis=0)), idx, cols)
+    px.iloc[:30, 3:6] = np.nan  # late listings: incomplete rows are dropped for the vol window
+    compute = ComputeConfig(shards=5, executor=executor, workers=2)
+
+    sig = compute_momentum_signal(px, 20)
+    pd.testing.assert_frame_equal(compute_momentum_signal(px, 20, compute), sig)
+    np.testing.assert_allclose(equal_weight(sig, 0.08, compute), equal_weight(sig, 0.08).astype(float), atol=1e-15)
+
+    ref, got = build_research_note(px), build_research_note(px, compute=compute)
+    np.testing.assert_array_equal(got.ret_20d, ref.ret_20d)
+    np.testing.assert_allclose(got.vol_20d_ann, ref.vol_20d_ann, rtol=1e-10)
+    assert got.regime_evidence == ref.regime_evidence and got.regime_label == ref.regime_label
+
+
+def _rendezvous_kernel(v, barrier):
+    # Every shard must be in flight at once to pass the barrier
+    barrier.wait()
+    v["out"][:] = v["x"] * 2
+    return v["x"].shape[-1]
+
+
+def test_thread_shards_run_concurrently():
+    x = np.arange(40.0).reshape(2, 20)
+    compute = ComputeConfig(shards=4, executor="thread")
+    barrier = threading.Barrier(4, timeout=10)
+    out, widths = map_shards(_rendezvous_kernel, {"x": x}, {"out": (x.shape, float)}, compute, barrier=barrier)
+    assert widths == [5, 5, 5, 5] and np.array_equal(out["out"], x * 2)
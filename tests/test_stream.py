@@ -0,0 +1,104 @@
+import copy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from tradeagentlab.backtest.stream import (
+    StreamingBacktest,
+    run_stream_backtest,
+    run_streaming_backtest,
+)
+from tradeagentlab.features.tech import compute_momentum_signal
+from tradeagentlab.risk.engine import RiskConfig, apply_risk
+
+
+def _prices():
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2015-01-01", periods=600)
+    px = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (len(idx), 5)), axis=0)),
+        index=idx,
+        columns=["A", "B", "C", "D", "SPY"],
+    )
+    px.iloc[:120, 2] = np.nan  # late listing
+    return px
+
+
+def _reference(px, risk):
+    pxf = px.ffill()
+    sig = compute_momentum_signal(pxf, lookback=20)
+    w = sig.div(sig.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0).clip(upper=0.3)
+    w = w.div(w.sum(axis=1).replace(0, pd.NA), axis=0).fillna(0.0)
+    return apply_risk(w, pxf.pct_change().fillna(0.0), 2.0, risk)
+
+
+def test_streaming_matches_in_memory_for_any_chunking():
+    px = _prices()
+    risk = RiskConfig(target_vol_ann=0.12, vol_lookback=20, dd_kill=0.08, dd_recover=0.04)
+    ref = _reference(px, risk)
+
+    for chunk in [1, 23, 1000]:
+        eng = StreamingBacktest(px.shape[1], 20, 0.3, 2.0, risk)
+        parts = [eng.update(px.iloc[i : i + chunk].to_numpy()) for i in range(0, len(px), chunk)]
+        ret = np.concatenate([p["portfolio_return"] for p in parts])
+        killed = np.concatenate([p["killed"] for p in parts])
+        assert np.allclose(ret, ref["portfolio_returns"].astype(float))
+        assert (killed == ref["audit"]["killed"].to_numpy()).all()
+
+
+def test_streaming_from_long_parquet(tmp_path):
+    px = _prices()
+    long = (
+        px.rename_axis("timestamp")
+        .reset_index()
+        .melt(id_vars="timestamp", var_name="ticker", value_name="close")
+        .dropna()
+        .sort_values(["timestamp", "ticker"])
+    )
+    long.to_parquet(tmp_path / "bars.parquet", row_group_size=97)
+
+    risk = RiskConfig()
+    out = run_streaming_backtest(
+        tmp_path / "bars.parquet",
+        list(px.columns),
+        lookback=20,
+        max_position_weight=0.3,
+        transaction_cost_bps=2.0,
+        risk=risk,
+        out_path=tmp_path / "out.parquet",
+        chunk_rows=101,  # splits timestamps across batches
+    )
+    got = pd.read_parquet(tmp_path / "out.parquet")
+    assert out["n_bars"] == len(px)
+    assert np.allclose(got["portfolio_return"], _reference(px, risk)["portfolio_returns"].astype(float))
+
+
+def test_streaming_ewma_vol_model_matches_in_memory():
+    px = _prices()
+    risk = RiskConfig(vol_model="ewma", cov_halflife=10, cov_shrinkage=0.2, dd_kill=0.1)
+    ref = _reference(px, risk)
+
+    eng = StreamingBacktest(px.shape[1], 20, 0.3, 2.0, risk)
+    parts = [eng.update(px.iloc[i : i + 37].to_numpy()) for i in range(0, len(px), 37)]
+    vol = np.concatenate([p["vol_est_ann"] for p in parts])
+    ret = np.concatenate([p["portfolio_return"] for p in parts])
+    assert np.allclose(vol, ref["audit"]["vol_est_ann"].astype(float), equal_nan=True)
+    assert np.allclose(ret, ref["portfolio_returns"].astype(float))
+
+
+def test_stream_rejects_settings_it_does_not_model(tmp_path):
+    base = yaml.safe_load((Path(__file__).parents[1] / "configs" / "backtest.example.yaml").read_text())
+    for key, value in [
+        ("construction", "min_variance"),
+        ("rebalance", {"calendar": "monthly"}),
+        ("accounting", "ledger"),
+    ]:
+        obj = copy.deepcopy(base)
+        obj["portfolio"][key] = value
+        path = tmp_path / "cfg.yaml"
+        path.write_text(yaml.safe_dump(obj))
+        with pytest.raises(ValueError, match=f"portfolio.{key}"):
+            run_stream_backtest(path, tmp_path / "missing.parquet")
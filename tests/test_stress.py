@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+import tradeagentlab.data.yf as yfmod
+from tradeagentlab.risk.engine import RiskConfig
+from tradeagentlab.risk.stress import (
+    Scenario,
+    StressConfig,
+    load_historical_scenarios,
+    stress_test,
+    synthetic_scenarios,
+)
+
+
+def _setup():
+    rng = np.random.default_rng(0)
+    cols = ["SPY", "AAA", "BBB", "CCC"]
+    history = pd.DataFrame(rng.normal(0, 0.01, (252, 4)), columns=cols)
+    history["AAA"] += 1.2 * history["SPY"]
+    scenarios = synthetic_scenarios(history, market="SPY")
+    # A historical-style window where CCC has no data (proxied by beta × SPY)
+    hist = pd.DataFrame(rng.normal(-0.01, 0.03, (40, 4)), columns=cols)
+    hist["CCC"] = np.nan
+    scenarios.append(Scenario(name="window", kind="historical", returns=hist))
+    portfolios = pd.DataFrame(
+        [[0.25, 0.25, 0.25, 0.25], [0.0, 0.5, 0.0, 0.5], [0.0, 0.0, 0.0, 0.0]],
+        index=["ew", "tilt", "cash"],
+        columns=cols,
+    )
+    return history, scenarios, portfolios
+
+
+def test_batched_stress_matches_one_at_a_time():
+    history, scenarios, portfolios = _setup()
+    for model in ["realized", "ewma"]:
+        risk = RiskConfig(target_vol_ann=0.10, vol_lookback=20, vol_model=model, dd_kill=0.05)
+        batched = stress_test(portfolios, scenarios, risk, history, scale0=0.8, transaction_cost_bps=5)
+        for sc in scenarios:
+            for p in portfolios.index:
+                one = stress_test(portfolios.loc[[p]], [sc], risk, history, scale0=0.8, transaction_cost_bps=5)
+                assert np.allclose(
+                    batched.loc[(sc.name, p)].drop(["kind", "window"]).astype(float),
+                    one.iloc[0].drop(["kind", "window"]).astype(float),
+                    equal_nan=True,
+                )
+    assert batched.loc[("window", "tilt"), "coverage"] == 0.5
+    assert batched.loc[("gap_10pct_1d", "cash"), "ret_managed"] == 0.0
+
+
+def test_crash_trips_kill_switch_and_limits_drawdown():
+    history, _, portfolios = _setup()
+    crash = pd.DataFrame(-0.03, index=range(15), columns=portfolios.columns)
+    risk = RiskConfig(target_vol_ann=0.5, vol_lookback=20, max_leverage=1.0, dd_kill=0.10)
+    out = stress_test(portfolios.loc[["ew"]], [Scenario("crash", "synthetic", crash)], risk, history)
+    row = out.loc[("crash", "ew")]
+    assert row["kill_day"] == 4  # 1 - 0.97**4 > 10%
+    assert row["mdd_static"] < -0.35
+    assert -0.12 < row["mdd_managed"] < -0.10
+
+
+def test_default_stress_is_synthetic_only(monkeypatch):
+    def offline(*a, **kw):
+        raise AssertionError("default stress config must not download prices")
+
+    monkeypatch.setattr(yfmod.yf, "download", offline)
+    cfg = StressConfig()
+    assert cfg.enabled and cfg.historical == [] and cfg.synthetic
+    assert load_historical_scenarios(["SPY", "AAA"], cfg.historical) == []
@@ -0,0 +1,88 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from tradeagentlab.backtest.sweep import WorkQueue, run_worker, run_workers, sweep_jobs
+from tradeagentlab.data.cache import PriceCache
+from tradeagentlab.results.store import RESULTS_DIR, read_runs_meta
+
+CONFIG = {
+    "universe": {"tickers": ["A", "B", "C"], "start": "2018-01-01", "end": "2020-01-01"},
+    "strategy": {"params": {"lookback": 20}},
+    "portfolio": {"initial_cash": 100_000, "max_position_weight": 0.5, "transaction_cost_bps": 2.0},
+    "risk": {"stress": None},
+    "report": {"name": "sw", "attribution": None, "results_dir": "results"},
+    "search": {"params": {"lookback": [10, 20], "target_vol_ann": [0.1, 0.2]}},
+}
+
+
+def _seed_prices(root):
+    rng = np.random.default_rng(0)
+    idx = pd.bdate_range("2018-01-01", "2019-12-31", name="Date")
+    px = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (len(idx), 4)), axis=0)), idx, ["A", "B", "C", "SPY"]
+    )
+    PriceCache(root / ".cache/marketdata").put(list(px.columns), "2018-01-01", "2020-01-01", "1d", px)
+
+
+def test_local_workers_drain_the_queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _seed_prices(tmp_path)
+    cfg = tmp_path / "sweep.yaml"
+    cfg.write_text(yaml.safe_dump(CONFIG))
+
+    q = WorkQueue(tmp_path / "q.db")
+    assert q.enqueue(sweep_jobs([cfg], grid=True)) == 4
+    assert q.enqueue(sweep_jobs([cfg], grid=True)) == 0  # idempotent
+
+    run_workers(tmp_path / "q.db", processes=3, poll_s=0.1)
+
+    jobs = q.jobs()
+    assert (jobs["status"] == "done").all() and (jobs["attempts"] == 1).all()
+    assert jobs["worker"].notna().all()
+    meta = read_runs_meta(tmp_path / "results")
+    assert sorted(meta.index) == sorted(jobs["run_id"])  # one stored run per job
+    assert q.stats()["done"] == 4 and run_worker(tmp_path / "q.db") == 0
+
+
+def test_leases_expire_and_failures_retry(tmp_path):
+    q = WorkQueue(tmp_path / "q.db")
+    q.enqueue([({"report": {"name": "ok"}}, {}), ({"report": {"name": "bad"}}, {})], max_attempts=2)
+
+    # A worker that dies holding a lease: the job goes back to the queue when it expires
+    lost = q.claim("dead", lease_s=-1.0)
+    seen = []
+
+    def runner(job):
+        seen.append(job["name"].split("-")[0])
+        if job["name"].startswith("bad"):
+            raise RuntimeError("boom")
+        return job["name"]
+
+    assert run_worker(tmp_path / "q.db", worker="w", poll_s=0.01, runner=runner) == 1
+    jobs = q.jobs().set_index("id")
+    assert jobs.loc[lost["id"], "attempts"] == 2
+    assert jobs["status"].tolist() == ["done", "failed"]
+    assert jobs["error"].iloc[1] == "RuntimeError: boom"
+    assert seen.count("bad") == 2
+    assert len(q.stats()["failures"]) == 1
+
+
+def test_unquoted_dates_and_no_results_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _seed_prices(tmp_path)
+    text = yaml.safe_dump({**CONFIG, "report": {"name": "sw", "attribution": None, "results_dir": None}})
+    cfg = tmp_path / "dates.yaml"
+    cfg.write_text(text.replace("'2018-01-01'", "2018-01-01").replace("'2020-01-01'", "2020-01-01"))
+
+    q = WorkQueue(tmp_path / "q.db")
+    jobs = sweep_jobs([cfg])
+    assert isinstance(jobs[0][0]["universe"]["start"], date)
+    assert q.enqueue(jobs) == 1
+    assert run_worker(tmp_path / "q.db", poll_s=0.1) == 1
+
+    # Sweep jobs always persist their run, here under the default results dataset
+    run_id = q.jobs()["run_id"].iloc[0]
+    assert run_id is not None and list(read_runs_meta(tmp_path / RESULTS_DIR).index) == [run_id]